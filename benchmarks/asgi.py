@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+
+# Run:
+#     python -m benchmarks.asgi
+
+import asyncio
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, List, Tuple
+
+from fiicha import FeatureFlag, FeatureFlags, FeatureFlagsContext
+from fiicha.asgi import FeatureFlagsMiddleware, Message, Receive, Scope, Send
+
+N_FLAGS = 100
+N_REQUESTS = 100_000
+
+BenchFeatureFlags: Any = type(FeatureFlags)(
+    "BenchFeatureFlags",
+    (FeatureFlags,),
+    {f"f{i}": FeatureFlag() for i in range(N_FLAGS)},
+)
+var: ContextVar[Any] = ContextVar("ff", default=BenchFeatureFlags(immutable=True))
+ff_ctx = FeatureFlagsContext(var, immutable=False)
+START = {"type": "http.response.start", "status": 200, "headers": []}
+BODY = {"type": "http.response.body", "body": b"OK"}
+
+
+async def app(scope: Scope, receive: Receive, send: Send) -> None:
+    await receive()
+    await send(START)
+    await send(BODY)
+
+
+async def receive() -> Message:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: Message) -> None:
+    pass
+
+
+async def run(asgi_app: Any, headers: List[Tuple[bytes, bytes]]) -> float:
+    started = perf_counter()
+
+    for _ in range(N_REQUESTS):
+        await asgi_app({"type": "http", "headers": headers}, receive, send)
+
+    return N_REQUESTS / (perf_counter() - started)
+
+
+def main() -> None:
+    headers = [(b"host", b"localhost"), (b"user-agent", b"bench")]
+    overrides = [*headers, (b"x-feature-flags", b"f1 f2 !f3")]
+    middleware = FeatureFlagsMiddleware(app, ff_ctx)
+
+    for name, asgi_app, request_headers in (
+        ("bare app", app, headers),
+        ("middleware", middleware, headers),
+        ("middleware + overrides", middleware, overrides),
+    ):
+        rps = asyncio.run(run(asgi_app, request_headers))
+        print(f"{name:>24}: {rps:>10,.0f} req/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+
+# Run:
+#     python -m benchmarks.copy
+
+from timeit import repeat
+from typing import Any, Dict, Type
+
+from fiicha import FeatureFlag, FeatureFlags, PackedFeatureFlags
+
+
+def make_class(base: Type[FeatureFlags], n: int, **kwargs: Any) -> Any:
+    namespace: Dict[str, Any] = {f"f{i}": FeatureFlag() for i in range(n)}
+    return type(base)(f"Bench{n}", (base,), namespace, **kwargs)
+
+
+def bench(stmt: Any, number: int) -> float:
+    """Best time of a single call in microseconds."""
+
+    return min(repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    print(f"{'flags':>6} {'generic':>10} {'generated':>10} {'packed':>10}  (us/copy)")
+
+    for n in (10, 100, 500):
+        # Generic per-flag loops, as used before code generation.
+        generic = make_class(FeatureFlags, n, generate=False)
+        generated = make_class(FeatureFlags, n, generate=True)
+        packed = make_class(PackedFeatureFlags, n)
+        values = {f"f{i}": i % 2 == 0 for i in range(n)}
+        number = 200_000 // n
+
+        results = [
+            bench(cls(values, immutable=True)._copy, number)
+            for cls in (generic, generated, packed)
+        ]
+
+        print(f"{n:>6} " + " ".join(f"{r:>10.2f}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+# Run:
+#     python -m benchmarks.sparse
+
+import tracemalloc
+from time import perf_counter
+from timeit import repeat
+from typing import Any, Callable, Tuple, Type
+
+from fiicha import FeatureFlag, FeatureFlags, PackedFeatureFlags, SparseFeatureFlags
+
+OVERRIDES = 10
+INSTANCES = 100
+
+
+def measure(fn: Callable[[], Any]) -> Tuple[Any, float, int]:
+    """Call ``fn``, return result, seconds taken and bytes allocated."""
+
+    tracemalloc.start()
+    start = perf_counter()
+
+    try:
+        result = fn()
+        elapsed = perf_counter() - start
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, elapsed, size
+
+
+def bench(stmt: Any, number: int) -> float:
+    """Best time of a single call in microseconds."""
+
+    return min(repeat(stmt, number=number, repeat=3)) / number * 1e6
+
+
+def run(base: Type[FeatureFlags], n: int) -> None:
+    names = [f"f{i}" for i in range(n)]
+    cls, class_seconds, class_bytes = measure(
+        lambda: type(base)(
+            f"Bench{n}", (base,), {name: FeatureFlag() for name in names}
+        )
+    )
+    values = {name: True for name in names[:: n // OVERRIDES][:OVERRIDES]}
+    instances, _, instance_bytes = measure(
+        lambda: [cls(values, immutable=True) for _ in range(INSTANCES)]
+    )
+    ff = instances[0]
+    number = max(10, 100_000 // n)
+
+    print(
+        f"{n:>7} {base.__name__:>18}"
+        f" {class_seconds * 1e3:>9.1f}ms {class_bytes / 2**20:>8.2f}MiB"
+        f" {instance_bytes / INSTANCES / 1024:>10.2f}KiB"
+        f" {bench(lambda: cls(values), number):>10.2f}"
+        f" {bench(lambda: ff._copy({names[1]: True}), number):>10.2f}"
+        f" {bench(lambda: ff | ff, number):>10.2f}"
+    )
+
+
+def main() -> None:
+    print(
+        f"{'flags':>7} {'class':>18} {'creation':>11} {'class mem':>11}"
+        f" {'instance':>13} {'init us':>10} {'copy us':>10} {'merge us':>10}"
+    )
+
+    for n in (1_000, 10_000, 100_000):
+        for base in (FeatureFlags, PackedFeatureFlags, SparseFeatureFlags):
+            run(base, n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+
+# Run:
+#     python -m benchmarks.targeting
+
+from random import Random
+from timeit import repeat
+from typing import Any, Dict, List
+
+from fiicha.targeting import Targeting
+
+FLAGS = 100
+TENANTS = [f"tenant{i}" for i in range(500)]
+PLANS = ["free", "pro", "team", "enterprise"]
+REGIONS = ["eu", "us", "ap", "sa"]
+
+
+def make_rules(n: int, random: Random) -> Dict[str, List[Dict[str, Any]]]:
+    rules: Dict[str, List[Dict[str, Any]]] = {f"f{i}": [] for i in range(FLAGS)}
+
+    for i in range(n):
+        kind = i % 4
+
+        if kind == 0:
+            rule: Dict[str, Any] = {"tenant": random.choice(TENANTS)}
+        elif kind == 1:
+            rule = {"tenant": random.sample(TENANTS, 5), "region": "eu"}
+        elif kind == 2:
+            rule = {"plan": random.choice(PLANS), "region": random.choice(REGIONS)}
+        else:
+            rule = {
+                "tenant": random.choice(TENANTS),
+                "app_version": {">=": (random.randrange(5), 0)},
+            }
+
+        rules[f"f{i % FLAGS}"].append(rule)
+
+    return rules
+
+
+def linear(rules: Dict[str, List[Dict[str, Any]]], attributes: Dict[str, Any]) -> Any:
+    """Evaluate every condition of every rule, as hand-rolled checks do."""
+
+    result = {}
+
+    for flag, flag_rules in rules.items():
+        for rule in flag_rules:
+            for name, condition in rule.items():
+                value = attributes.get(name)
+
+                if isinstance(condition, list):
+                    ok = value in condition
+                elif isinstance(condition, dict):
+                    ok = value is not None and value >= condition[">="]
+                else:
+                    ok = value == condition
+
+                if not ok:
+                    break
+            else:
+                result[flag] = True
+                break
+
+    return result
+
+
+def bench(stmt: Any, number: int) -> float:
+    """Best time of a single call in microseconds."""
+
+    return min(repeat(stmt, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    random = Random(42)
+    print(f"{'rules':>6} {'linear':>10} {'indexed':>10}  (us/evaluation)")
+
+    for n in (100, 1000, 10_000):
+        rules = make_rules(n, random)
+        compiled = Targeting(rules)
+        subjects = [
+            {
+                "tenant": random.choice(TENANTS),
+                "plan": random.choice(PLANS),
+                "region": random.choice(REGIONS),
+                "app_version": (random.randrange(5), random.randrange(10)),
+            }
+            for _ in range(100)
+        ]
+
+        for attributes in subjects:
+            assert compiled.evaluate(attributes) == linear(rules, attributes)
+
+        number = max(1, 100_000 // n)
+        results = [
+            bench(lambda: [fn(attributes) for attributes in subjects], number) / 100
+            for fn in (lambda a: linear(rules, a), compiled.evaluate)
+        ]
+
+        print(f"{n:>6} " + " ".join(f"{r:>10.2f}" for r in results))
+
+
+if __name__ == "__main__":
+    main()
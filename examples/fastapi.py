@@ -6,11 +6,13 @@
 # Test:
 #    curl "http://127.0.0.1:8000/?name=$(id -un)" -u test:
 #    curl "http://127.0.0.1:8000/?name=$(id -un)" -u anon:
+#    curl "http://127.0.0.1:8000/?name=$(id -un)" -u anon: \
+#        -H "X-Feature-Flags: use_new_greeting"
 
 from contextvars import ContextVar
-from typing import Awaitable, Callable, Dict
+from typing import Dict
 
-from fastapi import Depends, FastAPI, Request, Response
+from fastapi import Depends, FastAPI
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 
 from fiicha import (
@@ -19,10 +21,13 @@ from fiicha import (
     FeatureFlagsContext,
     feature_flags_from_environ,
 )
+from fiicha.asgi import FeatureFlagsMiddleware
+from fiicha.rollout import apply_rollouts
 
 
 class MyFeatureFlags(FeatureFlags):
-    use_new_greeting = FeatureFlag("Greet users better")
+    # Enable new greeting for 50% of users (see `ab_testing` below).
+    use_new_greeting = FeatureFlag("Greet users better", rollout=50)
     # ^ Add more here.
 
 
@@ -49,13 +54,14 @@ def get_feature_flags() -> MyFeatureFlags:
 def ab_testing(
     credentials: HTTPBasicCredentials = Depends(security),
     # Fetch feature flags from the context variable set by
-    # "feature_flags_scope_per_request" middleware.
+    # `FeatureFlagsMiddleware`.
     feature_flags: MyFeatureFlags = Depends(get_feature_flags),
 ) -> None:
     """Enables features for select users (a.k.a. A/B testing)."""
 
-    # Enable new greeting for "50%" of users.
-    feature_flags.use_new_greeting |= ord(credentials.username[0]) % 2 == 0
+    # Enable feature flags with rollout percentage for the user. The same
+    # user always gets the same assignment, on every host.
+    apply_rollouts(feature_flags, credentials.username)
 
     # Make sure nothing changes feature flags afterward.
     feature_flags._freeze()
@@ -64,21 +70,11 @@ def ab_testing(
 app = FastAPI(dependencies=[Depends(ab_testing)])
 
 
-@app.middleware("http")
-async def feature_flags_scope_per_request(
-    request: Request, call_next: Callable[[Request], Awaitable[Response]]
-) -> Response:
-    """Use new feature flags copy for each request."""
-
-    # Create new copy of the feature flags, as we'll be modifying them later
-    # and do not want to change our system-wide feature flags.
-    with ff_ctx as feature_flags:
-        # FastAPI provides its own dependency injection mechanism, but just
-        # in case you are using starlette directly or there any other pure
-        # ASGI middlewares.
-        request.scope["feature_flags"] = feature_flags
-
-        return await call_next(request)
+# Use new feature flags copy for each request, as we'll be modifying them later
+# and do not want to change our system-wide feature flags. Being a pure ASGI
+# middleware, it also puts feature flags into `scope["feature_flags"]` for
+# other ASGI middlewares and applies overrides from "X-Feature-Flags" header.
+app.add_middleware(FeatureFlagsMiddleware, context=ff_ctx)
 
 
 @app.get("/")
@@ -1,15 +1,22 @@
 from .context import FeatureFlagsContext
-from .core import FeatureFlag, FeatureFlags
+from .core import FeatureFlag, FeatureFlags, PackedFeatureFlags, SparseFeatureFlags
 from .doc import make_napoleon_doc, make_sphinx_doc
-from .parser import feature_flags_from_environ, parse_feature_flags_string
+from .parser import (
+    compile_feature_flags_string,
+    feature_flags_from_environ,
+    parse_feature_flags_string,
+)
 
 __version__ = "0.2.0"
 __all__ = [
     "FeatureFlag",
     "FeatureFlags",
     "FeatureFlagsContext",
+    "PackedFeatureFlags",
+    "SparseFeatureFlags",
     "make_napoleon_doc",
     "make_sphinx_doc",
+    "compile_feature_flags_string",
     "feature_flags_from_environ",
     "parse_feature_flags_string",
 ]
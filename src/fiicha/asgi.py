@@ -0,0 +1,85 @@
+from typing import Any, Awaitable, Callable, Mapping, MutableMapping, Optional
+
+from .context import FeatureFlagsContext
+from .parser import compile_feature_flags_string
+from .utils import get_cookie
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+class FeatureFlagsMiddleware:
+    """Pure ASGI middleware entering feature flags context for every request.
+
+    Feature flags of the request are stored in the ``scope``. Overrides are
+    parsed with :func:`fiicha.compile_feature_flags_string` from the header
+    or, if header is missing, from the cookie. Requests without overrides
+    get a copy-on-write copy of the current feature flags.
+
+    Args:
+        app: ASGI application to wrap.
+        context: Feature flags context to enter.
+        header: Name of the header with feature flag overrides.
+        cookie: Name of the cookie with feature flag overrides.
+        scope_key: Key of the ``scope`` to store feature flags under.
+        sep: Feature flags separator of the overrides string.
+        neg: Negation prefix of the overrides string.
+    """
+
+    __slots__ = ("app", "context", "header", "cookie", "scope_key", "sep", "neg")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        context: FeatureFlagsContext[Any],
+        header: Optional[str] = "x-feature-flags",
+        cookie: Optional[str] = None,
+        scope_key: str = "feature_flags",
+        sep: Optional[str] = None,
+        neg: str = "!",
+    ) -> None:
+        self.app = app
+        self.context = context
+        self.header = header.lower().encode("latin-1") if header else None
+        self.cookie = cookie
+        self.scope_key = scope_key
+        self.sep = sep
+        self.neg = neg
+
+    def get_overrides(self, scope: Scope) -> Optional[Mapping[str, bool]]:
+        """Get feature flag overrides of the request, if any."""
+
+        header = self.header
+        cookie = self.cookie
+        value: Optional[str] = None
+
+        for name, raw in scope.get("headers", ()):
+            if name == header:
+                value = raw.decode("latin-1")
+                break
+            # Cookies may be split across headers (HTTP/2), first match wins.
+            if cookie and value is None and name == b"cookie":
+                value = get_cookie(raw.decode("latin-1"), cookie)
+
+        if not value:
+            return None
+
+        cls = self.context.get_current().__class__
+
+        return compile_feature_flags_string(cls, value, self.sep, self.neg)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            return await self.app(scope, receive, send)
+
+        context = self.context
+
+        scope[self.scope_key] = context.push(self.get_overrides(scope))
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            context.pop()
@@ -0,0 +1,140 @@
+import logging
+from threading import Lock
+from typing import Callable, Dict, Iterator, Tuple, Type
+
+from .core import FeatureFlags, SparseFeatureFlags
+from .utils import flags_to_int
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[Dict[str, bool]], None]
+
+
+def _set_bits(bits: int) -> Iterator[int]:
+    """Iterate through positions of the set bits, lowest first."""
+
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+def diff(old: FeatureFlags, new: FeatureFlags) -> Dict[str, bool]:
+    """Get feature flags changed between two objects of the same class.
+
+    Feature flag states are compared as bitmasks (see
+    :func:`fiicha.utils.flags_to_int`) or, for sparse classes, as sets of
+    changed feature flags. For packed and sparse classes it takes time
+    proportional to the number of changes.
+
+    >>> diff(MyFeatureFlags({"a": True}), MyFeatureFlags({"b": True}))
+    {'a': False, 'b': True}
+
+    Returns:
+        Mapping of changed feature flag names to their new states.
+    """
+
+    cls = new.__class__
+
+    if old.__class__ is not cls:
+        raise TypeError("cannot diff feature flags of different classes")
+
+    if isinstance(new, SparseFeatureFlags) and isinstance(old, SparseFeatureFlags):
+        default = new._default
+        changed = new._changed
+
+        if old._default is default:
+            return {
+                name: (name in changed) is not default
+                for name in old._changed.symmetric_difference(changed)
+            }
+
+    names = cls.__all_feature_flags__
+    bits = flags_to_int(new)
+
+    return {
+        names[bit]: bool(bits >> bit & 1)
+        for bit in _set_bits(flags_to_int(old) ^ bits)
+    }
+
+
+class Subscriptions:
+    """Registry of callbacks notified when feature flags change.
+
+    Callbacks are invoked by :meth:`notify`, e.g. from the thread polling
+    a source (see :class:`fiicha.sources.FileSource`), never on reads.
+
+    Args:
+        cls: Feature flags class.
+    """
+
+    def __init__(self, cls: Type[FeatureFlags]) -> None:
+        self.cls = cls
+        self.masks = {name: 1 << bit for bit, name in enumerate(cls._flags())}
+        self.subscriptions: Tuple[Tuple[int, Callback], ...] = ()
+        self.lock = Lock()
+
+    def subscribe(self, callback: Callback, *flags: str) -> Callable[[], None]:
+        """Call ``callback`` with changes whenever any of ``flags`` changes.
+
+        Callback gets only changes of the ``flags`` it has subscribed to.
+        Without ``flags`` it is subscribed to all feature flags.
+
+        Returns:
+            Function cancelling the subscription.
+        """
+
+        mask = 0
+
+        for name in flags:
+            if name not in self.masks:
+                raise ValueError(f"unknown feature flag: {name}")
+            mask |= self.masks[name]
+
+        subscription = (mask or -1, callback)
+
+        with self.lock:
+            self.subscriptions += (subscription,)
+
+        def unsubscribe() -> None:
+            with self.lock:
+                self.subscriptions = tuple(
+                    s for s in self.subscriptions if s is not subscription
+                )
+
+        return unsubscribe
+
+    def notify(self, old: FeatureFlags, new: FeatureFlags) -> Dict[str, bool]:
+        """Call callbacks subscribed to the feature flags changed from ``old``
+        to ``new``.
+
+        Returns:
+            All changes, see :func:`diff`.
+        """
+
+        changes = diff(old, new)
+
+        if not changes:
+            return changes
+
+        changed = 0
+
+        for name in changes:
+            changed |= self.masks[name]
+
+        for mask, callback in self.subscriptions:
+            if mask & changed:
+                try:
+                    callback(
+                        changes
+                        if mask == -1
+                        else {
+                            name: value
+                            for name, value in changes.items()
+                            if mask & self.masks[name]
+                        }
+                    )
+                except Exception:
+                    logger.exception("Feature flags change callback failed")
+
+        return changes
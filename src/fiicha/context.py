@@ -1,48 +1,250 @@
 from contextlib import ContextDecorator
 from contextvars import ContextVar, Token
-from typing import Any, Generic, List, Optional
+from functools import wraps
+from importlib import import_module
+from inspect import iscoroutinefunction
+from typing import Any, Callable, Generic, Mapping, Optional, Tuple, TypeVar
+from weakref import WeakValueDictionary
 
 from .core import FeatureFlags_T
+from .parser import FlagOverrides
+from .tracking import track
+
+F = TypeVar("F", bound=Callable[..., Any])
+# Linked list of reset tokens: (token, previous entry or None).
+TokenStack = Optional[Tuple["Token[Any]", Any]]
+# Contexts by their registration names, to be found after unpickling.
+_contexts: "WeakValueDictionary[str, FeatureFlagsContext[Any]]" = (
+    WeakValueDictionary()
+)
+
+
+def _get_context(name: str) -> "FeatureFlagsContext[Any]":
+    context = _contexts.get(name)
+
+    if context is None:
+        # Module-qualified name: import the module registering the context.
+        module = name.rpartition(".")[0]
+
+        if module:
+            try:
+                import_module(module)
+            except ImportError:
+                pass
+
+        context = _contexts.get(name)
+
+    if context is None:
+        raise LookupError(f"no feature flags context named {name!r}")
+
+    return context
 
 
 class FeatureFlagsContext(ContextDecorator, Generic[FeatureFlags_T]):
     """A context manager wrapper around ``ContextVar[FeatureFlags]``.
 
+    Reset tokens are kept in a context variable too, so a single instance can
+    be shared between threads and asyncio tasks and entered recursively.
+
     Args:
         var: Context variable with default flags set.
         immutable: Defines value of the immutable flag when copying feature
             flags. When unset, preserves existing value.
+        source: Callable returning feature flags to use when the context
+            variable is not set (e.g. :meth:`fiicha.sources.FileSource.get`).
+            Takes precedence over the default of the context variable.
+        track: Set feature flags recording their reads (see
+            :func:`fiicha.tracking.track`) as the new context variable.
+        name: Unique name to pickle the context by, required for pickling.
+            Module-qualified name of the context (e.g.
+            ``f"{__name__}.ff_ctx"``) lets other processes import the module
+            defining it.
     """
 
-    __slots__ = ("tokens", "var", "immutable")
-    tokens: List["Token[FeatureFlags_T]"]
+    __slots__ = ("tokens", "var", "immutable", "source", "track", "name")
+    tokens: ContextVar[TokenStack]
     var: ContextVar[FeatureFlags_T]
     immutable: Optional[bool]
+    source: Optional[Callable[[], FeatureFlags_T]]
+    track: bool
+    name: Optional[str]
 
     def __init__(
-        self, var: ContextVar[FeatureFlags_T], immutable: Optional[bool] = None
+        self,
+        var: ContextVar[FeatureFlags_T],
+        immutable: Optional[bool] = None,
+        source: Optional[Callable[[], FeatureFlags_T]] = None,
+        track: bool = False,
+        name: Optional[str] = None,
     ) -> None:
-        self.tokens = []
+        if name is not None:
+            if name in _contexts:
+                raise ValueError(f"feature flags context already exists: {name}")
+
+            _contexts[name] = self
+
+        self.tokens = ContextVar(f"{var.name}_tokens", default=None)
         self.var = var
         self.immutable = immutable
+        self.source = source
+        self.track = track
+        self.name = name
 
-    def __enter__(self) -> FeatureFlags_T:
-        """Set copy of the feature flags as the new context variable."""
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle by the registration name.
+
+        Unpickled in other process, refers to the context registered with
+        the same name (e.g. the same module-level context).
+        """
+
+        if self.name is None:
+            raise TypeError("cannot pickle feature flags context without name")
+
+        return _get_context, (self.name,)
 
-        feature_flags = self.var.get()._copy(immutable=self.immutable)
+    def push(self, overrides: Optional[Mapping[str, bool]] = None) -> FeatureFlags_T:
+        """Set copy of the feature flags as the new context variable.
 
-        self.tokens.append(self.var.set(feature_flags))
+        Must be paired with :meth:`pop` within the same thread or task.
+
+        Args:
+            overrides: Feature flag states to override. Prefer
+                :class:`fiicha.parser.FlagOverrides`, which are applied in
+                one step.
+        """
+
+        current = self.get_current()
+
+        if isinstance(overrides, FlagOverrides):
+            feature_flags = overrides.apply(current, immutable=self.immutable)
+        elif overrides:
+            feature_flags = current._copy(overrides, immutable=self.immutable)
+        else:
+            feature_flags = current._overlay(immutable=self.immutable)
+
+        if self.track:
+            feature_flags = track(feature_flags)
+
+        self.tokens.set((self.var.set(feature_flags), self.tokens.get()))
 
         return feature_flags
 
+    def pop(self) -> None:
+        """Restore previous value of the context variable."""
+
+        stack = self.tokens.get()
+
+        if stack is None:
+            raise RuntimeError("context is not entered")
+
+        token, previous = stack
+
+        self.tokens.set(previous)
+        self.var.reset(token)
+
+    def __enter__(self) -> FeatureFlags_T:
+        """Set copy-on-write copy of the feature flags as the new context
+        variable.
+        """
+
+        return self.push()
+
     def __exit__(self, *exc: Any) -> None:
         """Restore previous value of the context variable."""
 
-        self.var.reset(self.tokens.pop())
+        self.pop()
+
+    async def __aenter__(self) -> FeatureFlags_T:
+        return self.__enter__()
+
+    async def __aexit__(self, *exc: Any) -> None:
+        self.__exit__(*exc)
+
+    def __call__(self, func: F) -> F:
+        """Decorate function to run within the context.
+
+        Coroutine functions are supported as well.
+        """
+
+        if not iscoroutinefunction(func):
+            return super().__call__(func)
+
+        @wraps(func)
+        async def inner(*args: Any, **kwargs: Any) -> Any:
+            with self:
+                return await func(*args, **kwargs)
+
+        return inner  # type: ignore
+
+    def wrap(self, func: Callable[..., Any]) -> "FlagsCall[FeatureFlags_T]":
+        """Bind function to the current feature flags.
+
+        The result runs ``func`` with the current feature flags of the
+        caller set in the context variable, e.g. when submitted to thread or
+        process pool executor. Unlike :func:`contextvars.copy_context`, only
+        the feature flags are carried over.
+
+        >>> executor.submit(ff_ctx.wrap(compute), x)
+        """
+
+        current = self.get_current()
+
+        if not current._immutable:
+            current = current._copy(immutable=True)
+
+        return FlagsCall(func, self, current)
 
     def get_current(self) -> FeatureFlags_T:
         """Get feature flags from the current context."""
 
-        return self.var.get()
+        if self.source is None:
+            return self.var.get()
+
+        current = self.var.get(None)
+
+        if current is None:
+            return self.source()
+
+        return current
 
     current = property(get_current)
+
+
+class FlagsCall(Generic[FeatureFlags_T]):
+    """A callable running function with the given feature flags set in the
+    context variable.
+
+    Picklable if the function is and the context has a name, feature flags
+    are pickled compactly (see :meth:`fiicha.FeatureFlags.__reduce__`).
+
+    Args:
+        func: Function to call.
+        context: Feature flags context.
+        feature_flags: Feature flags to set during the call.
+    """
+
+    __slots__ = ("func", "context", "feature_flags")
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        context: FeatureFlagsContext[FeatureFlags_T],
+        feature_flags: FeatureFlags_T,
+    ) -> None:
+        self.func = func
+        self.context = context
+        self.feature_flags = feature_flags
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        var = self.context.var
+        token = var.set(self.feature_flags)
+
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            var.reset(token)
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        # Function goes first, so its module (likely defining the context)
+        # is imported before the context is looked up.
+        return self.__class__, (self.func, self.context, self.feature_flags)
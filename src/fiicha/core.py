@@ -1,14 +1,22 @@
+from collections import OrderedDict
+from datetime import datetime
+from operator import attrgetter
+from threading import Lock
 from typing import (
     Any,
     Callable,
     Dict,
+    FrozenSet,
     Iterable,
     Mapping,
     NoReturn,
     Optional,
+    Sequence,
     Tuple,
     Type,
     TypeVar,
+    Union,
+    cast,
 )
 
 
@@ -17,10 +25,39 @@ class FeatureFlag:
 
     Args:
         description: Human-readable description of the feature flag.
+        rollout: Percentage of subjects (0-100) to enable the feature flag
+            for. See :mod:`fiicha.rollout`.
+        rules: Targeting rules setting the feature flag by subject
+            attributes. See :mod:`fiicha.targeting`.
+        active_from: Time (UNIX timestamp or aware datetime) the feature flag
+            is enabled at. See :mod:`fiicha.schedule`.
+        active_until: Time (UNIX timestamp or aware datetime) the feature
+            flag is disabled at.
     """
 
-    def __init__(self, description: str = "") -> None:
+    def __init__(
+        self,
+        description: str = "",
+        rollout: Optional[float] = None,
+        rules: Sequence[Any] = (),
+        active_from: Union[float, datetime, None] = None,
+        active_until: Union[float, datetime, None] = None,
+    ) -> None:
+        active_from = _timestamp("active_from", active_from)
+        active_until = _timestamp("active_until", active_until)
+
+        if (
+            active_from is not None
+            and active_until is not None
+            and active_from >= active_until
+        ):
+            raise ValueError("active_from must be before active_until")
+
         self.description = description
+        self.rollout = rollout
+        self.rules = tuple(rules)
+        self.active_from = active_from
+        self.active_until = active_until
 
     def __set_name__(self, owner: Any, name: str) -> None:
         self.name = name
@@ -32,17 +69,186 @@ class FeatureFlag:
         setattr(obj, f"_{self.name}", value)
 
 
+def _timestamp(name: str, value: Union[float, datetime, None]) -> Optional[float]:
+    """Convert aware datetime to UNIX timestamp."""
+
+    if not isinstance(value, datetime):
+        return value
+
+    # Naive datetimes would be silently read as local time.
+    if value.utcoffset() is None:
+        raise ValueError(f"{name} must be timezone-aware")
+
+    return value.timestamp()
+
+
 FeatureFlags_T = TypeVar("FeatureFlags_T", bound="FeatureFlags")
 
 
+class PackedFeatureFlag:
+    """A descriptor reading feature flag state from the packed bitmask.
+
+    Args:
+        name: Feature flag name.
+        bit: Bit position of the feature flag within ``_bits``.
+    """
+
+    __slots__ = ("name", "bit")
+
+    def __init__(self, name: str, bit: int) -> None:
+        self.name = name
+        self.bit = bit
+
+    def __get__(self, obj: Any, cls: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return obj._bits >> self.bit & 1 == 1
+
+
+class SparseFeatureFlag:
+    """A descriptor reading feature flag state from the sparse storage.
+
+    Args:
+        name: Feature flag name.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, cls: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+        return (self.name in obj._changed) is not obj._default
+
+
+class OverlayFeatureFlag:
+    """A descriptor reading feature flag state from the overlay source.
+
+    Reads are forwarded to the ``_source`` object until the first write,
+    which copies all feature flag states into the overlay's own slots.
+
+    Args:
+        name: Feature flag name.
+        member: Slot descriptor of the feature flag.
+    """
+
+    __slots__ = ("name", "member")
+
+    def __init__(self, name: str, member: Any) -> None:
+        self.name = name
+        self.member = member
+
+    def __get__(self, obj: Any, cls: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+
+        source = obj._source
+
+        if source is None:
+            return self.member.__get__(obj, cls)
+
+        return getattr(source, self.name)
+
+    def __set__(self, obj: Any, value: bool) -> None:
+        source = obj._source
+
+        if source is not None:
+            _materialize(obj, source)
+
+        self.member.__set__(obj, value)
+
+
+class InternCache:
+    """LRU cache of canonical immutable feature flags objects.
+
+    Objects are keyed by their feature flag states, so equal immutable
+    objects can be replaced by a single shared one.
+
+    Args:
+        maxsize: Maximum number of objects to keep.
+        key: Function returning hashable state of the object.
+    """
+
+    __slots__ = ("maxsize", "key", "objects", "lock")
+
+    def __init__(self, maxsize: int, key: Callable[[Any], Any]) -> None:
+        self.maxsize = maxsize
+        self.key = key
+        self.objects: "OrderedDict[Any, Any]" = OrderedDict()
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def get(self, key: Any) -> Any:
+        """Get canonical object with the given state, if any."""
+
+        with self.lock:
+            obj = self.objects.get(key)
+
+            if obj is not None:
+                self.objects.move_to_end(key)
+
+        return obj
+
+    def intern(self, obj: Any) -> Any:
+        """Get canonical object with the same state as the immutable ``obj``.
+
+        The ``obj`` itself becomes canonical if there is none yet.
+        """
+
+        key = self.key(obj)
+
+        with self.lock:
+            canonical = self.objects.get(key)
+
+            if canonical is not None:
+                self.objects.move_to_end(key)
+                return canonical
+
+            self.objects[key] = obj
+
+            if len(self.objects) > self.maxsize:
+                self.objects.popitem(last=False)
+
+        return obj
+
+    def clear(self) -> None:
+        """Drop all canonical objects."""
+
+        with self.lock:
+            self.objects.clear()
+
+
 class FeatureFlagsMeta(type):
     """Metaclass for the feature flags.
 
     Args:
         make_doc: If provided, used to generate docstring for the resulting class.
+        packed: Store all feature flag states in a single integer instead of
+            individual slots. Inherited from the base classes when unset.
+        sparse: Store only feature flags differing from the default state
+            instead of individual slots. Inherited from the base classes
+            when unset.
+        interned: Maximum number of canonical immutable objects to keep (see
+            :class:`InternCache`), ``0`` disables interning. Inherited from
+            the base classes when unset.
+        generate: Generate methods specialized for the feature flags of the
+            class (slot storage only). When unset, methods are generated for
+            up to :data:`MAX_GENERATED_FLAGS` feature flags.
     """
 
     __feature_flags__: Tuple[str, ...]
+    __all_feature_flags__: Tuple[str, ...]
+    __definitions__: Dict[str, FeatureFlag]
+    __packed__: bool
+    __sparse__: bool
+    __flag_positions__: Dict[str, int]
+    __all_flags_mask__: int
+    __overlay_fields__: Tuple[OverlayFeatureFlag, ...]
+    __interned__: Optional[InternCache]
 
     def __new__(
         cls: Type[type],
@@ -51,12 +257,17 @@ class FeatureFlagsMeta(type):
         namespace: Dict[str, Any],
         make_doc: Optional[Callable[[Mapping[str, FeatureFlag]], str]] = None,
         aliases: Optional[Mapping[str, str]] = None,
+        packed: Optional[bool] = None,
+        sparse: Optional[bool] = None,
+        interned: Optional[int] = None,
+        generate: Optional[bool] = None,
     ) -> type:
         feature_flags: Dict[str, FeatureFlag] = {}
         annotations: Dict[str, type] = namespace.pop("__annotations__", {})
 
         for ns_name, ns_attr in list(namespace.items()):
             if isinstance(ns_attr, FeatureFlag):
+                ns_attr.name = ns_name
                 feature_flags[ns_name] = ns_attr
                 annotations[ns_name] = bool
 
@@ -66,25 +277,465 @@ class FeatureFlagsMeta(type):
             namespace["__doc__"] = make_doc(feature_flags)
 
         if aliases:
-            for name, alias in aliases.items():
-                namespace[alias] = namespace[name]
+            for attr, alias in aliases.items():
+                namespace[alias] = namespace[attr]
+
+        packed_bases = any(getattr(base, "__packed__", False) for base in bases)
+
+        if packed is None:
+            packed = packed_bases
+        elif not packed and packed_bases:
+            raise TypeError("cannot disable packed storage inherited from bases")
+
+        sparse_bases = any(getattr(base, "__sparse__", False) for base in bases)
+
+        if sparse is None:
+            sparse = sparse_bases
+        elif not sparse and sparse_bases:
+            raise TypeError("cannot disable sparse storage inherited from bases")
+
+        if packed and sparse:
+            raise TypeError("cannot combine packed and sparse storage")
 
         namespace["__feature_flags__"] = tuple(feature_flags)
-        namespace["__slots__"] = (*namespace.get("__slots__", ()), *feature_flags)
+        namespace["__packed__"] = packed
+        namespace["__sparse__"] = sparse
+        namespace["__slots__"] = (
+            *namespace.get("__slots__", ()),
+            *(() if packed or sparse else feature_flags),
+        )
         namespace["__annotations__"] = annotations
 
         # https://github.com/python/mypy/issues/9282
-        return super().__new__(cls, name, bases, namespace)  # type: ignore
+        new_cls = super().__new__(cls, name, bases, namespace)  # type: ignore
+        new_cls.__definitions__ = _collect_definitions(new_cls, feature_flags)
+        new_cls.__all_feature_flags__ = tuple(new_cls.__definitions__)
+
+        if interned is None:
+            interned = max(
+                (
+                    cache.maxsize
+                    for cache in map(_intern_cache, bases)
+                    if cache is not None
+                ),
+                default=0,
+            )
+
+        new_cls.__interned__ = (
+            InternCache(interned, _intern_key(new_cls)) if interned else None
+        )
 
-    def _flags(cls: type) -> Iterable[str]:
+        if packed:
+            _assign_bits(new_cls)
+        elif sparse:
+            for flag_name in new_cls.__all_feature_flags__:
+                setattr(new_cls, flag_name, SparseFeatureFlag(flag_name))
+        elif new_cls.__all_feature_flags__:
+            if generate is None:
+                generate = len(new_cls.__all_feature_flags__) <= MAX_GENERATED_FLAGS
+
+            if generate:
+                _generate_methods(new_cls)
+            else:
+                _reset_methods(new_cls)
+
+        return new_cls
+
+    def _flags(cls: "FeatureFlagsMeta") -> Iterable[str]:
         """Iterate through all defined feature flag names."""
 
-        for xcls in cls.mro():
-            if isinstance(xcls, FeatureFlagsMeta):
-                yield from xcls.__feature_flags__  # TODO: avoid duplicates
+        return cls.__all_feature_flags__
+
+    def _overlay_class(cls: "FeatureFlagsMeta") -> "FeatureFlagsMeta":
+        """Get class of the copy-on-write overlays of this class.
+
+        The overlay class is a subclass pretending to be the original class
+        (via ``__class__``), created once on first use.
+        """
+
+        overlay = cls.__dict__.get("__overlay__")
+
+        if overlay is None:
+            fields = tuple(
+                OverlayFeatureFlag(name, getattr(cls, name))
+                for name in cls.__all_feature_flags__
+            )
+            namespace: Dict[str, Any] = {
+                "__slots__": ("_source",),
+                "__module__": cls.__module__,
+                "__qualname__": cls.__qualname__,
+                "__class__": property(lambda self: cls),
+                "__overlay_fields__": fields,
+                "_dict": _overlay_dict,
+                "_copy": _overlay_copy,
+                "__copy__": _overlay_copy,
+                **{field.name: field for field in fields},
+            }
+            overlay = type.__new__(type(cls), cls.__name__, (cls,), namespace)
+            setattr(cls, "__overlay__", overlay)
+
+        return overlay
+
+
+def _intern_cache(cls: type) -> Optional[InternCache]:
+    return getattr(cls, "__interned__", None)
+
+
+def _intern_key(cls: FeatureFlagsMeta) -> Callable[[Any], Any]:
+    """Get function returning hashable feature flag states of the object."""
+
+    if cls.__packed__:
+        return attrgetter("_bits")
+    if cls.__sparse__:
+        return attrgetter("_default", "_changed")
+
+    flags = cls.__all_feature_flags__
+
+    return attrgetter(*flags) if flags else lambda obj: ()
+
+
+def _intern(obj: Any) -> Any:
+    """Get canonical object for the immutable ``obj`` if interning is on."""
+
+    cache = obj.__interned__
+
+    if cache is None or not obj._immutable:
+        return obj
+
+    return cache.intern(obj)
+
+
+def _unpickle(
+    cls: FeatureFlagsMeta,
+    bits: int,
+    immutable: bool,
+    fingerprint: Optional[int] = None,
+) -> Any:
+    """Create feature flags object from the state made by ``__reduce__``.
+
+    Bits are positions in the class schema, so they are rejected if the
+    class has changed since pickling. Fingerprint is missing in the data
+    pickled by older versions.
+    """
+
+    if fingerprint is not None and fingerprint != _fingerprint(cls):
+        raise ValueError("feature flags schema mismatch")
+
+    if cls.__packed__:
+        return cls._from_bits(bits, immutable)  # type: ignore
+
+    names = cls.__all_feature_flags__
+    values = {}
+
+    while bits:
+        low = bits & -bits
+        values[names[low.bit_length() - 1]] = True
+        bits ^= low
+
+    return _intern(cls(values, immutable=immutable))
+
+
+def _fingerprint(cls: FeatureFlagsMeta) -> int:
+    """Get fingerprint of the class, see :func:`fiicha.utils.flags_fingerprint`."""
+
+    from .utils import flags_fingerprint  # circular import
+
+    return flags_fingerprint(cls)
+
+
+def _collect_definitions(
+    cls: type, feature_flags: Mapping[str, FeatureFlag]
+) -> Dict[str, FeatureFlag]:
+    """Get definitions of all feature flags of the class, base classes first.
+
+    Args:
+        cls: Feature flags class.
+        feature_flags: Feature flags defined by the class itself.
+    """
+
+    definitions: Dict[str, FeatureFlag] = {}
+
+    for xcls in reversed(cls.mro()[1:]):
+        if isinstance(xcls, FeatureFlagsMeta):
+            definitions.update(xcls.__definitions__)
+
+    definitions.update(feature_flags)
+
+    return definitions
+
+
+def _assign_bits(cls: FeatureFlagsMeta) -> None:
+    """Assign bit position to every feature flag of the packed class."""
+
+    positions: Dict[str, int] = {}
+
+    # Positions rather than masks: a mask per flag would take memory
+    # quadratic in the number of feature flags.
+    for bit, name in enumerate(cls.__all_feature_flags__):
+        positions[name] = bit
+        setattr(cls, name, PackedFeatureFlag(name, bit))
+
+    cls.__flag_positions__ = positions
+    cls.__all_flags_mask__ = (1 << len(positions)) - 1
+
+
+def _apply_bits(
+    positions: Mapping[str, int], bits: int, values: Mapping[str, bool]
+) -> int:
+    """Set or clear bits of ``bits`` according to ``values``.
+
+    Unknown feature flags are ignored.
+    """
+
+    for name, value in values.items():
+        bit = positions.get(name)
+
+        if bit is not None:
+            bits = bits | 1 << bit if value else bits & ~(1 << bit)
+
+    return bits
 
 
 object_setattr = object.__setattr__
+object_new = object.__new__
+
+# Classes with more feature flags use generic methods looping over them.
+MAX_GENERATED_FLAGS = 512
+GENERATED_METHODS = ("__init__", "_dict", "_copy", "__copy__", "__repr__")
+
+
+def _create_fn(cls: type, name: str, lines: Iterable[str], doc: Optional[str]) -> Any:
+    """Compile function from source lines and prepare it to be a method of
+    the ``cls``.
+    """
+
+    namespace: Dict[str, Any] = {}
+    exec(  # nosec
+        "\n".join(lines),
+        {
+            "cls": cls,
+            "FeatureFlags": FeatureFlags,
+            "object_setattr": object_setattr,
+            "object_new": object_new,
+        },
+        namespace,
+    )
+    fn = namespace[name]
+    fn.__qualname__ = f"{cls.__qualname__}.{name}"
+    fn.__doc__ = doc
+    fn.__generated__ = True
+    return fn
+
+
+def _make_init(cls: FeatureFlagsMeta) -> Any:
+    """Generate ``__init__`` setting every feature flag slot directly.
+
+    Subclasses with their own ``__init__`` may still call this one via
+    :func:`super`, so it falls back to the generic one for them.
+    """
+
+    flags = cls.__all_feature_flags__
+
+    return _create_fn(
+        cls,
+        "__init__",
+        [
+            "def __init__(self, values=None, default=False, default_key='',"
+            " immutable=False):",
+            "    if self.__class__ is not cls:",
+            "        return FeatureFlags.__init__(self, values, default, default_key,"
+            " immutable)",
+            "    if values:",
+            "        if default_key:",
+            "            default = values.get(default_key, default)",
+            "        get = values.get",
+            *(
+                f"        object_setattr(self, {n!r}, get({n!r}, default))"
+                for n in flags
+            ),
+            "    else:",
+            *(f"        object_setattr(self, {n!r}, default)" for n in flags),
+            "    object_setattr(self, '_immutable', immutable)",
+        ],
+        FeatureFlags.__init__.__doc__,
+    )
+
+
+def _make_dict(cls: FeatureFlagsMeta) -> Any:
+    """Generate ``_dict`` building the dictionary with a single display."""
+
+    return _create_fn(
+        cls,
+        "_dict",
+        [
+            "def _dict(self):",
+            "    return {",
+            *(f"        {n!r}: self.{n}," for n in cls.__all_feature_flags__),
+            "    }",
+        ],
+        FeatureFlags._dict.__doc__,
+    )
+
+
+def _make_copy(cls: FeatureFlagsMeta) -> Any:
+    """Generate ``_copy`` copying slots without intermediate dictionary."""
+
+    flags = cls.__all_feature_flags__
+
+    return _create_fn(
+        cls,
+        "_copy",
+        [
+            "def _copy(self, overrides=None, immutable=None):",
+            "    if immutable is None:",
+            "        immutable = self._immutable",
+            "    if overrides:",
+            "        values = self._dict()",
+            "        values.update(overrides)",
+            "        obj = self.__class__(values, immutable=immutable)",
+            *(
+                [
+                    "        if immutable:",
+                    "            return self.__interned__.intern(obj)",
+                    "        return obj",
+                    "    if immutable:",
+                    "        cache = self.__interned__",
+                    "        obj = cache.get(cache.key(self))",
+                    "        if obj is not None:",
+                    "            return obj",
+                ]
+                if cls.__interned__ is not None
+                else ["        return obj"]
+            ),
+            "    obj = object_new(self.__class__)",
+            *(f"    object_setattr(obj, {n!r}, self.{n})" for n in flags),
+            "    object_setattr(obj, '_immutable', immutable)",
+            *(
+                [
+                    "    if immutable:",
+                    "        return cache.intern(obj)",
+                ]
+                if cls.__interned__ is not None
+                else []
+            ),
+            "    return obj",
+        ],
+        FeatureFlags._copy.__doc__,
+    )
+
+
+def _make_repr(cls: FeatureFlagsMeta) -> Any:
+    """Generate ``__repr__`` with feature flags listed in alphabetical order."""
+
+    params = ", ".join(
+        f"{n}={{self.{n}!r}}" for n in sorted(cls.__all_feature_flags__)
+    )
+
+    return _create_fn(
+        cls,
+        "__repr__",
+        [
+            "def __repr__(self):",
+            f"    return f'{{self.__class__.__name__}}({params})'",
+        ],
+        FeatureFlags.__repr__.__doc__,
+    )
+
+
+def _materialize(obj: Any, source: "FeatureFlags") -> None:
+    """Copy feature flag states from the ``source`` into the overlay."""
+
+    values = source._dict()
+
+    for field in type(obj).__overlay_fields__:
+        field.member.__set__(obj, values[field.name])
+
+    object_setattr(obj, "_source", None)
+
+
+def _overlay_dict(self: Any) -> Dict[str, bool]:
+    """Get copy of the feature flags in a form of dictionary."""
+
+    source = self._source
+
+    if source is None:
+        return super(type(self), self)._dict()
+
+    return source._dict()
+
+
+def _overlay_copy(
+    self: Any,
+    overrides: Optional[Mapping[str, bool]] = None,
+    immutable: Optional[bool] = None,
+) -> Any:
+    """Get copy of the feature flags object.
+
+    Args:
+        overrides: Feature flag states to override.
+        immutable: Set immutable flag for new copy. If unset, value is
+            carried over from the current object.
+    """
+
+    source = self._source
+
+    if immutable is None:
+        immutable = self._immutable
+
+    if source is None:
+        return super(type(self), self)._copy(overrides, immutable)
+
+    return source._copy(overrides, immutable)
+
+
+def _is_replaceable(cls: FeatureFlagsMeta, name: str) -> bool:
+    """Check whether ``name`` attribute of the ``cls`` is not user-defined."""
+
+    attr = getattr(cls, name, None)
+
+    return attr is FeatureFlags.__dict__.get(name) or getattr(
+        attr, "__generated__", False
+    )
+
+
+def _reset_methods(cls: FeatureFlagsMeta) -> None:
+    """Replace methods generated for the base classes with the generic ones."""
+
+    for name in GENERATED_METHODS:
+        if getattr(getattr(cls, name, None), "__generated__", False):
+            setattr(cls, name, FeatureFlags.__dict__[name])
+
+
+def _generate_methods(cls: FeatureFlagsMeta) -> None:
+    """Install methods specialized for the feature flags of the ``cls``.
+
+    Methods explicitly defined by the user are left untouched. Same as
+    :mod:`dataclasses`, straight-line code is generated instead of looping over
+    the feature flags. Compiling it takes time growing faster than the number
+    of feature flags, hence :data:`MAX_GENERATED_FLAGS`.
+    """
+
+    for name, make in (
+        ("__init__", _make_init),
+        ("_dict", _make_dict),
+        ("__repr__", _make_repr),
+    ):
+        if _is_replaceable(cls, name):
+            setattr(cls, name, make(cls))
+
+    # Copying bypasses __init__, so custom constructors get the generic one.
+    if _is_replaceable(cls, "__init__") and _is_replaceable(cls, "_copy"):
+        copy_fn = _make_copy(cls)
+
+        if _is_replaceable(cls, "__copy__"):
+            setattr(cls, "__copy__", copy_fn)
+
+        setattr(cls, "_copy", copy_fn)
+    else:
+        # Inherited ones copy only the feature flags of the base class.
+        for name in ("_copy", "__copy__"):
+            if getattr(getattr(cls, name, None), "__generated__", False):
+                setattr(cls, name, FeatureFlags.__dict__[name])
 
 
 class FeatureFlags(
@@ -111,7 +762,7 @@ class FeatureFlags(
             default_key: Key from ``values`` with default value for unset flags.
         """
 
-        names = set(self.__class__._flags())
+        names = self.__class__._flags()
 
         if values:
             if default_key:
@@ -125,11 +776,41 @@ class FeatureFlags(
 
         object_setattr(self, "_immutable", immutable)
 
-    def _freeze(self) -> None:
-        """Make this feature flags immutable."""
+    def _freeze(self: FeatureFlags_T) -> FeatureFlags_T:
+        """Make this feature flags immutable.
+
+        Returns:
+            Canonical object with the same feature flag states if the class
+            is interned, this object otherwise.
+        """
 
         object_setattr(self, "_immutable", True)
 
+        return _intern(self)
+
+    def _overlay(
+        self: FeatureFlags_T, immutable: Optional[bool] = None
+    ) -> FeatureFlags_T:
+        """Get copy-on-write copy of the feature flags object.
+
+        Immutable objects are not copied: the overlay reads through to this
+        object and gets its own state on the first change. Mutable objects
+        may change later, so they are copied right away.
+
+        Args:
+            immutable: Set immutable flag for new copy. If unset, value is
+                carried over from the current object.
+        """
+
+        if not self._immutable:
+            return self._copy(immutable=immutable)
+
+        overlay: Any = object_new(cast(type, self.__class__._overlay_class()))
+        object_setattr(overlay, "_source", getattr(self, "_source", None) or self)
+        object_setattr(overlay, "_immutable", immutable is not False)
+
+        return overlay
+
     def _set(self, name: str, value: bool) -> None:
         """Set feature flag value.
 
@@ -166,20 +847,24 @@ class FeatureFlags(
         if overrides:
             values.update(overrides)
 
-        return self.__class__(
-            values,
-            immutable=self._immutable if immutable is None else immutable,
+        return _intern(
+            self.__class__(
+                values,
+                immutable=self._immutable if immutable is None else immutable,
+            )
         )
 
     def __or__(self: FeatureFlags_T, other: FeatureFlags_T) -> FeatureFlags_T:
         """Merge feature flags."""
 
-        return self.__class__(
-            {
-                name: getattr(self, name) or getattr(other, name)
-                for name in self.__class__._flags()
-            },
-            immutable=self._immutable,
+        return _intern(
+            self.__class__(
+                {
+                    name: getattr(self, name) or getattr(other, name)
+                    for name in self.__class__._flags()
+                },
+                immutable=self._immutable,
+            )
         )
 
     def __ior__(self: FeatureFlags_T, other: FeatureFlags_T) -> FeatureFlags_T:
@@ -197,11 +882,492 @@ class FeatureFlags(
     def __delattr__(self, name: str) -> NoReturn:
         raise TypeError("feature flags are not deletable")
 
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle as the class and feature flag states packed into an integer."""
+
+        cls = self.__class__
+        bits = 0
+
+        for bit, name in enumerate(cls._flags()):
+            if getattr(self, name):
+                bits |= 1 << bit
+
+        return _unpickle, (cls, bits, self._immutable, _fingerprint(cls))
+
     def __repr__(self) -> str:
         """Return string representation of the feature flags object."""
 
         cls = self.__class__
         params = ", ".join(
-            f"{name}={repr(getattr(self, name))}" for name in sorted(set(cls._flags()))
+            f"{name}={repr(getattr(self, name))}" for name in sorted(cls._flags())
         )
         return f"{cls.__name__}({params})"
+
+
+PackedFeatureFlags_T = TypeVar("PackedFeatureFlags_T", bound="PackedFeatureFlags")
+
+
+class PackedFeatureFlags(
+    FeatureFlags,
+    aliases={"_copy": "__copy__", "_set": "__setattr__"},
+    packed=True,
+):
+    """Feature flags with all states packed into a single integer.
+
+    Every feature flag gets a fixed bit position assigned by the metaclass,
+    so copying, merging, comparison and hashing are plain integer operations.
+    Reading a single feature flag goes through a Python-level descriptor and
+    is several times slower than reading a slot of :class:`FeatureFlags`.
+    """
+
+    __slots__: Tuple[str, ...] = ("_bits",)
+    _bits: int
+
+    def __init__(
+        self,
+        values: Optional[Mapping[str, bool]] = None,
+        default: bool = False,
+        default_key: str = "",
+        immutable: bool = False,
+    ) -> None:
+        """Initialize feature flags.
+
+        Unknown feature flags are ignored.
+
+        Args:
+            values: Feature flag states.
+            default: Default state for unset feature flags.
+            default_key: Key from ``values`` with default value for unset flags.
+        """
+
+        cls = self.__class__
+
+        if values and default_key:
+            default = values.get(default_key, default)
+
+        bits = cls.__all_flags_mask__ if default else 0
+
+        if values:
+            bits = _apply_bits(cls.__flag_positions__, bits, values)
+
+        object_setattr(self, "_bits", bits)
+        object_setattr(self, "_immutable", immutable)
+
+    @classmethod
+    def _from_bits(
+        cls: Type[PackedFeatureFlags_T], bits: int, immutable: bool = False
+    ) -> PackedFeatureFlags_T:
+        """Create feature flags object directly from the bitmask.
+
+        Args:
+            bits: Packed feature flag states.
+            immutable: Immutable flag of the new object.
+        """
+
+        bits &= cls.__all_flags_mask__
+        cache = cls.__interned__
+
+        if immutable and cache is not None:
+            obj = cache.get(bits)
+
+            if obj is not None:
+                return obj
+
+        obj = object_new(cls)
+        object_setattr(obj, "_bits", bits)
+        object_setattr(obj, "_immutable", immutable)
+
+        if immutable and cache is not None:
+            return cache.intern(obj)
+
+        return obj
+
+    def _overlay(
+        self: PackedFeatureFlags_T, immutable: Optional[bool] = None
+    ) -> PackedFeatureFlags_T:
+        """Get copy of the feature flags object.
+
+        Packed state is a single integer, so a plain copy is as cheap as
+        an overlay would be.
+
+        Args:
+            immutable: Set immutable flag for new copy. If unset, value is
+                carried over from the current object.
+        """
+
+        return self._copy(immutable=immutable)
+
+    def _set(self, name: str, value: bool) -> None:
+        """Set feature flag value.
+
+        Args:
+            name: Feature flag name.
+            value: Feature flag state.
+        """
+
+        if self._immutable:
+            raise RuntimeError("this instance is immutable")
+
+        bit = self.__class__.__flag_positions__.get(name)
+
+        if bit is None:
+            object_setattr(self, name, value)
+        elif value:
+            object_setattr(self, "_bits", self._bits | 1 << bit)
+        else:
+            object_setattr(self, "_bits", self._bits & ~(1 << bit))
+
+    def _dict(self) -> Dict[str, bool]:
+        """Get copy of the feature flags in a form of dictionary."""
+
+        bits = self._bits
+
+        return {
+            name: bits >> bit & 1 == 1
+            for name, bit in self.__class__.__flag_positions__.items()
+        }
+
+    def _copy(
+        self: PackedFeatureFlags_T,
+        overrides: Optional[Mapping[str, bool]] = None,
+        immutable: Optional[bool] = None,
+    ) -> PackedFeatureFlags_T:
+        """Get copy of the feature flags object.
+
+        Args:
+            overrides: Feature flag states to override.
+            immutable: Set immutable flag for new copy. If unset, value is
+                carried over from the current object.
+        """
+
+        cls = self.__class__
+        bits = self._bits
+
+        if overrides:
+            bits = _apply_bits(cls.__flag_positions__, bits, overrides)
+
+        return cls._from_bits(
+            bits,
+            immutable=self._immutable if immutable is None else immutable,
+        )
+
+    def __or__(
+        self: PackedFeatureFlags_T, other: PackedFeatureFlags_T
+    ) -> PackedFeatureFlags_T:
+        """Merge feature flags."""
+
+        cls = self.__class__
+
+        if other.__class__ is not cls:
+            return super().__or__(other)
+
+        return cls._from_bits(self._bits | other._bits, immutable=self._immutable)
+
+    def __ior__(
+        self: PackedFeatureFlags_T, other: PackedFeatureFlags_T
+    ) -> PackedFeatureFlags_T:
+        """Merge feature flags in-place."""
+
+        if self._immutable:
+            return self.__or__(other)
+
+        cls = self.__class__
+
+        if other.__class__ is cls:
+            bits = self._bits | other._bits
+        else:
+            bits = _apply_bits(
+                cls.__flag_positions__,
+                self._bits,
+                {name: True for name in cls._flags() if getattr(other, name)},
+            )
+
+        object_setattr(self, "_bits", bits)
+
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PackedFeatureFlags):
+            return NotImplemented
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._bits == other._bits
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        cls = self.__class__
+        return _unpickle, (cls, self._bits, self._immutable, _fingerprint(cls))
+
+    def __hash__(self) -> int:
+        if not self._immutable:
+            raise TypeError("unhashable type: mutable feature flags")
+        return hash((self.__class__, self._bits))
+
+
+SparseFeatureFlags_T = TypeVar("SparseFeatureFlags_T", bound="SparseFeatureFlags")
+
+
+class SparseFeatureFlags(
+    FeatureFlags,
+    aliases={"_copy": "__copy__", "_set": "__setattr__"},
+    sparse=True,
+):
+    """Feature flags storing only the states differing from the default.
+
+    Intended for very large catalogs with most feature flags left at the
+    default state. Lookups are set membership tests; construction, copying,
+    merging, comparison and hashing take time proportional to the number of
+    changed feature flags rather than to the size of the class. Whichever
+    of ``False`` and ``True`` leaves fewer changed feature flags is stored as
+    the default, so equal objects have equal storage.
+    """
+
+    __slots__: Tuple[str, ...] = ("_default", "_changed")
+    _default: bool
+    _changed: FrozenSet[str]
+
+    def __init__(
+        self,
+        values: Optional[Mapping[str, bool]] = None,
+        default: bool = False,
+        default_key: str = "",
+        immutable: bool = False,
+    ) -> None:
+        """Initialize feature flags.
+
+        Unknown feature flags are ignored.
+
+        Args:
+            values: Feature flag states.
+            default: Default state for unset feature flags.
+            default_key: Key from ``values`` with default value for unset flags.
+        """
+
+        default = bool(default)
+        changed: FrozenSet[str] = frozenset()
+
+        if values:
+            if default_key:
+                default = bool(values.get(default_key, default))
+
+            definitions = self.__class__.__definitions__
+            changed = frozenset(
+                name
+                for name, value in values.items()
+                if name in definitions and bool(value) is not default
+            )
+
+        _set_sparse(self, *_normalize_sparse(self.__class__, default, changed))
+        object_setattr(self, "_immutable", immutable)
+
+    @classmethod
+    def _from_changes(
+        cls: Type[SparseFeatureFlags_T],
+        default: bool,
+        changed: FrozenSet[str],
+        immutable: bool = False,
+    ) -> SparseFeatureFlags_T:
+        """Create feature flags object directly from the sparse storage.
+
+        Args:
+            default: Default state.
+            changed: Names of the feature flags in the opposite state.
+            immutable: Immutable flag of the new object.
+        """
+
+        default, changed = _normalize_sparse(cls, default, changed)
+        cache = cls.__interned__
+
+        if immutable and cache is not None:
+            obj = cache.get((default, changed))
+
+            if obj is not None:
+                return obj
+
+        obj = object_new(cls)
+        _set_sparse(obj, default, changed)
+        object_setattr(obj, "_immutable", immutable)
+
+        if immutable and cache is not None:
+            return cache.intern(obj)
+
+        return obj
+
+    def _overlay(
+        self: SparseFeatureFlags_T, immutable: Optional[bool] = None
+    ) -> SparseFeatureFlags_T:
+        """Get copy of the feature flags object.
+
+        Sparse storage is immutable and shared between copies, so a plain
+        copy is as cheap as an overlay would be.
+
+        Args:
+            immutable: Set immutable flag for new copy. If unset, value is
+                carried over from the current object.
+        """
+
+        return self._copy(immutable=immutable)
+
+    def _set(self, name: str, value: bool) -> None:
+        """Set feature flag value.
+
+        Args:
+            name: Feature flag name.
+            value: Feature flag state.
+        """
+
+        if self._immutable:
+            raise RuntimeError("this instance is immutable")
+
+        cls = self.__class__
+        default = self._default
+
+        if name not in cls.__definitions__:
+            object_setattr(self, name, value)
+        elif bool(value) is default:
+            _set_sparse(self, default, self._changed - {name})
+        else:
+            _set_sparse(self, *_normalize_sparse(cls, default, self._changed | {name}))
+
+    def _dict(self) -> Dict[str, bool]:
+        """Get copy of the feature flags in a form of dictionary."""
+
+        default = self._default
+        values = dict.fromkeys(self.__class__.__all_feature_flags__, default)
+        values.update(dict.fromkeys(self._changed, not default))
+        return values
+
+    def _copy(
+        self: SparseFeatureFlags_T,
+        overrides: Optional[Mapping[str, bool]] = None,
+        immutable: Optional[bool] = None,
+    ) -> SparseFeatureFlags_T:
+        """Get copy of the feature flags object.
+
+        Args:
+            overrides: Feature flag states to override.
+            immutable: Set immutable flag for new copy. If unset, value is
+                carried over from the current object.
+        """
+
+        cls = self.__class__
+        default = self._default
+        changed = self._changed
+
+        if overrides:
+            definitions = cls.__definitions__
+            changed = changed.union(
+                name
+                for name, value in overrides.items()
+                if name in definitions and bool(value) is not default
+            ).difference(
+                name for name, value in overrides.items() if bool(value) is default
+            )
+
+        return cls._from_changes(
+            default,
+            changed,
+            immutable=self._immutable if immutable is None else immutable,
+        )
+
+    def _merged(self, other: "SparseFeatureFlags") -> Tuple[bool, FrozenSet[str]]:
+        """Get sparse storage of the merge with ``other`` of the same class."""
+
+        a = self._changed
+        b = other._changed
+
+        if self._default:
+            if other._default:
+                return True, a & b  # both enabled unless disabled in both
+            return True, a - b
+        if other._default:
+            return True, b - a
+        return False, a | b
+
+    def __or__(
+        self: SparseFeatureFlags_T, other: SparseFeatureFlags_T
+    ) -> SparseFeatureFlags_T:
+        """Merge feature flags."""
+
+        cls = self.__class__
+
+        if other.__class__ is not cls:
+            return super().__or__(other)
+
+        return cls._from_changes(*self._merged(other), immutable=self._immutable)
+
+    def __ior__(
+        self: SparseFeatureFlags_T, other: SparseFeatureFlags_T
+    ) -> SparseFeatureFlags_T:
+        """Merge feature flags in-place."""
+
+        if self._immutable:
+            return self.__or__(other)
+
+        cls = self.__class__
+
+        if other.__class__ is cls:
+            _set_sparse(self, *_normalize_sparse(cls, *self._merged(other)))
+        else:
+            for name in cls._flags():
+                if getattr(other, name):
+                    self._set(name, True)
+
+        return self
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SparseFeatureFlags):
+            return NotImplemented
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._default is other._default and self._changed == other._changed
+
+    def __hash__(self) -> int:
+        if not self._immutable:
+            raise TypeError("unhashable type: mutable feature flags")
+        return hash((self.__class__, self._default, self._changed))
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        return _unpickle_sparse, (
+            self.__class__,
+            self._default,
+            tuple(self._changed),
+            self._immutable,
+        )
+
+    def __repr__(self) -> str:
+        """Return string representation with the changed feature flags only."""
+
+        default = self._default
+        params = ", ".join(f"{n!r}: {not default}" for n in sorted(self._changed))
+        return f"{self.__class__.__name__}({{{params}}}, default={default})"
+
+
+def _normalize_sparse(
+    cls: FeatureFlagsMeta, default: bool, changed: FrozenSet[str]
+) -> Tuple[bool, FrozenSet[str]]:
+    """Get sparse state with fewer changed feature flags (``False`` default
+    on a tie), so equal objects have equal storage.
+    """
+
+    size = len(cls.__all_feature_flags__)
+
+    if len(changed) * 2 > size or (default and len(changed) * 2 == size):
+        return not default, frozenset(cls.__all_feature_flags__).difference(changed)
+
+    return default, changed
+
+
+def _set_sparse(obj: Any, default: bool, changed: FrozenSet[str]) -> None:
+    object_setattr(obj, "_default", default)
+    object_setattr(obj, "_changed", changed)
+
+
+def _unpickle_sparse(
+    cls: Type[SparseFeatureFlags],
+    default: bool,
+    changed: Tuple[str, ...],
+    immutable: bool,
+) -> SparseFeatureFlags:
+    """Create feature flags object from the state made by ``__reduce__``."""
+
+    return cls._from_changes(default, frozenset(changed), immutable)
@@ -0,0 +1,86 @@
+from typing import Any, Generic, Optional, Tuple, TypeVar
+
+from .context import FeatureFlagsContext
+
+T = TypeVar("T")
+
+MISSING = object()
+
+
+def _snapshot(feature_flags: Any) -> Optional[Any]:
+    """Get immutable object the feature flags read from, ``None`` if mutable."""
+
+    if not feature_flags._immutable:
+        return None
+
+    source = getattr(feature_flags, "_source", None)
+
+    return feature_flags if source is None else source
+
+
+class Dispatch(Generic[T]):
+    """Select one of two implementations by the feature flag state.
+
+    The implementation is selected using the current feature flags of the
+    ``context``. For immutable feature flags the selection is cached until
+    the context has another snapshot, so repeated calls cost an identity
+    check. Immutable copy-on-write overlays (e.g. created by the context
+    for every request) share the cache entry of the snapshot they read
+    from, so concurrent requests do not evict each other's entries.
+
+    >>> greet = Dispatch(ff_ctx, "use_new_greeter", new_greet, old_greet)
+    >>> greet("world")
+
+    Args:
+        context: Feature flags context to get current feature flags from.
+        flag: Feature flag name.
+        enabled: Implementation to use when the feature flag is enabled.
+        disabled: Implementation to use when the feature flag is disabled.
+    """
+
+    __slots__ = ("context", "flag", "enabled", "disabled", "_cache")
+
+    def __init__(
+        self,
+        context: FeatureFlagsContext[Any],
+        flag: str,
+        enabled: T,
+        disabled: T,
+    ) -> None:
+        self.context = context
+        self.flag = flag
+        self.enabled = enabled
+        self.disabled = disabled
+        # Snapshot and the implementation selected for it, swapped at once.
+        self._cache: Tuple[Any, Optional[T]] = (MISSING, None)
+
+    def _select(self, feature_flags: Any) -> T:
+        key = _snapshot(feature_flags)
+        target = self.enabled if getattr(feature_flags, self.flag) else self.disabled
+
+        if key is not None:
+            self._cache = (key, target)
+
+        return target
+
+    def resolve(self) -> T:
+        """Get implementation selected by the current feature flags."""
+
+        feature_flags = self.context.get_current()
+        snapshot, target = self._cache
+
+        if feature_flags is snapshot or _snapshot(feature_flags) is snapshot:
+            return target  # type: ignore
+
+        return self._select(feature_flags)
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        """Call implementation selected by the current feature flags."""
+
+        feature_flags = self.context.get_current()
+        snapshot, target = self._cache
+
+        if feature_flags is not snapshot and _snapshot(feature_flags) is not snapshot:
+            target = self._select(feature_flags)
+
+        return target(*args, **kwargs)  # type: ignore
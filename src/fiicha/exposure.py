@@ -0,0 +1,268 @@
+import asyncio
+import json
+import logging
+import os
+from collections import OrderedDict, deque
+from threading import Event, Lock, Thread
+from time import monotonic, time
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Hashable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .core import FeatureFlags
+from .tracking import reads
+
+logger = logging.getLogger(__name__)
+
+DROP_NEW = "drop_new"
+DROP_OLD = "drop_old"
+
+
+class Exposure(NamedTuple):
+    """Exposure of the subject to the feature flag state."""
+
+    subject: Hashable
+    flag: str
+    value: bool
+    timestamp: float
+
+
+Sink = Callable[[Sequence[Exposure]], None]
+
+
+class JSONLinesSink:
+    """Sink appending exposures to the file, one JSON object per line.
+
+    Args:
+        path: Path to the file.
+    """
+
+    def __init__(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        self.path = path
+
+    def __call__(self, exposures: Sequence[Exposure]) -> None:
+        lines = "".join(
+            json.dumps(exposure._asdict(), default=str) + "\n" for exposure in exposures
+        )
+
+        with open(self.path, "a") as f:
+            f.write(lines)
+
+
+class ExposureLogger:
+    """Logger of exposures to feature flags, flushed to the sink in batches.
+
+    Logging never blocks: exposures are deduplicated and put into a bounded
+    in-memory queue, which is flushed to the ``sink`` by :meth:`flush`, in a
+    background thread started by :meth:`start` or in an asyncio task running
+    :meth:`watch`. When the queue is full (e.g. the sink is slow), either
+    the new exposure (``drop_new``) or the oldest queued one (``drop_old``)
+    is dropped.
+
+    Exposures can be logged where feature flags are evaluated by passing
+    ``functools.partial(logger.log, subject)`` as ``expose`` to
+    :func:`fiicha.rollout.apply_rollouts` or
+    :func:`fiicha.targeting.apply_targeting`.
+
+    Args:
+        sink: Function writing a batch of exposures.
+        window: Time in seconds during which identical exposures (subject,
+            feature flag and its state) are logged once.
+        maxsize: Maximum number of queued exposures.
+        batch_size: Maximum number of exposures passed to the sink at once.
+        interval: Flush interval of the background thread, in seconds.
+        policy: What to drop when the queue is full: ``drop_new`` or
+            ``drop_old``.
+        dedupe_size: Maximum number of remembered recent exposures.
+        clock: Function returning current time in seconds, for the window.
+
+    Attributes:
+        dropped: Number of exposures dropped because the queue was full.
+        errors: Number of batches the sink has failed to write.
+    """
+
+    thread_name = "fiicha-exposure-logger"
+
+    def __init__(
+        self,
+        sink: Sink,
+        window: float = 60.0,
+        maxsize: int = 10_000,
+        batch_size: int = 500,
+        interval: float = 1.0,
+        policy: str = DROP_NEW,
+        dedupe_size: int = 100_000,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if policy not in (DROP_NEW, DROP_OLD):
+            raise ValueError(f"unknown policy: {policy}")
+
+        self.sink = sink
+        self.window = window
+        self.batch_size = batch_size
+        self.interval = interval
+        self.policy = policy
+        self.dedupe_size = dedupe_size
+        self.clock = clock
+        self.queue: Deque[Exposure] = deque(maxlen=maxsize)
+        # (subject, feature flag, state) -> time it was last queued.
+        self.recent: "OrderedDict[Tuple[Hashable, str, bool], float]" = OrderedDict()
+        self.dropped = 0
+        self.errors = 0
+        self.lock = Lock()
+        self._flush_lock = Lock()
+        self._wakeup = Event()
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.queue)
+
+    def log(self, subject: Hashable, flag: str, value: bool) -> bool:
+        """Queue exposure of the subject to the feature flag state.
+
+        Returns:
+            Whether the exposure was queued (neither a duplicate nor
+            dropped).
+        """
+
+        key = (subject, flag, value)
+        now = self.clock()
+        queue = self.queue
+
+        with self.lock:
+            last = self.recent.get(key)
+
+            if last is not None and now - last < self.window:
+                return False
+
+            if len(queue) == queue.maxlen:
+                self.dropped += 1
+
+                if self.policy == DROP_NEW:
+                    return False
+
+                # Oldest exposure is never logged, so it must not be
+                # deduplicated either.
+                evicted = queue[0]
+                self.recent.pop((evicted.subject, evicted.flag, evicted.value), None)
+
+            self.recent[key] = now
+            self.recent.move_to_end(key)
+
+            if len(self.recent) > self.dedupe_size:
+                self.recent.popitem(last=False)
+
+            queue.append(Exposure(subject, flag, value, time()))
+
+        if len(queue) >= self.batch_size:
+            self._wakeup.set()
+
+        return True
+
+    def get(self, feature_flags: FeatureFlags, flag: str, subject: Hashable) -> bool:
+        """Get feature flag state and log the subject's exposure to it."""
+
+        value: bool = getattr(feature_flags, flag)
+        self.log(subject, flag, value)
+        return value
+
+    def log_reads(self, feature_flags: FeatureFlags, subject: Hashable) -> None:
+        """Log exposures to the feature flags read through the tracking view.
+
+        See :func:`fiicha.tracking.track`.
+        """
+
+        for flag, value in reads(feature_flags).items():
+            self.log(subject, flag, value)
+
+    def _take(self) -> List[Exposure]:
+        queue = self.queue
+
+        with self.lock:
+            return [queue.popleft() for _ in range(min(self.batch_size, len(queue)))]
+
+    def flush(self) -> int:
+        """Write all queued exposures to the sink.
+
+        Batches the sink has failed to write are logged and dropped.
+
+        Returns:
+            Number of exposures written.
+        """
+
+        written = 0
+
+        with self._flush_lock:
+            batch = self._take()
+
+            while batch:
+                try:
+                    self.sink(batch)
+                except Exception:
+                    self.errors += 1
+                    logger.exception("Failed to write %d exposures", len(batch))
+                else:
+                    written += len(batch)
+
+                batch = self._take()
+
+        return written
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self) -> None:
+        """Start flushing in a background thread."""
+
+        if self._thread is not None:
+            raise RuntimeError("already started")
+
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread, flushing remaining exposures."""
+
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join()
+        self._thread = None
+        self.flush()
+
+    async def watch(self) -> None:
+        """Flush within the running event loop until cancelled.
+
+        Flushes are run in the default executor, so the event loop is never
+        blocked by the sink. Call :meth:`flush` after cancelling it to write
+        remaining exposures.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(self.interval)
+            await loop.run_in_executor(None, self.flush)
+
+    def __enter__(self) -> "ExposureLogger":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
@@ -0,0 +1,123 @@
+from collections import OrderedDict
+from itertools import count
+from threading import Lock
+from types import MappingProxyType
+from typing import Any, Dict, Generic, Mapping, Optional, Sequence, Tuple, Type
+
+from .core import FeatureFlags_T
+from .parser import FlagOverrides
+
+_versions = count(1)
+
+
+class Layer:
+    """Feature flag overrides of a single resolution layer (e.g. a tenant).
+
+    Every change gets a new version, so resolved feature flags cached by
+    :class:`LayeredResolver` are not reused after the layer has changed.
+
+    Args:
+        values: Feature flag states to override.
+        name: Name of the layer, for debugging.
+    """
+
+    __slots__ = ("name", "values", "version")
+
+    def __init__(
+        self, values: Optional[Mapping[str, bool]] = None, name: str = ""
+    ) -> None:
+        self.name = name
+        self.values: Mapping[str, bool] = MappingProxyType(dict(values or {}))
+        self.version = next(_versions)
+
+    def __repr__(self) -> str:
+        return f"Layer({dict(self.values)!r}, name={self.name!r})"
+
+    def update(self, values: Mapping[str, bool]) -> None:
+        """Replace feature flag overrides of the layer.
+
+        Overrides are read-only otherwise, so the version always changes
+        along with them.
+        """
+
+        self.values = MappingProxyType(dict(values))
+        self.version = next(_versions)
+
+
+class LayeredResolver(Generic[FeatureFlags_T]):
+    """Resolver of feature flags from an ordered stack of layers.
+
+    Layers are applied in order, later ones take precedence. Resolved
+    immutable feature flags are cached by the layer stack (identities and
+    versions of the layers), so a stack seen repeatedly (e.g. the same
+    environment and tenant) is merged only once.
+
+    Args:
+        cls: Feature flags class.
+        maxsize: Maximum number of cached layer stacks.
+        default_key: Key with default value for unset flags.
+    """
+
+    def __init__(
+        self, cls: Type[FeatureFlags_T], maxsize: int = 1024, default_key: str = ""
+    ) -> None:
+        self.cls = cls
+        self.maxsize = maxsize
+        self.default_key = default_key
+        self.cache: "OrderedDict[Tuple[Any, ...], FeatureFlags_T]" = OrderedDict()
+        self.lock = Lock()
+
+    def merge(self, layers: Sequence[Layer]) -> FeatureFlags_T:
+        """Merge layers into new immutable feature flags, bypassing cache."""
+
+        values: Dict[str, bool] = {}
+
+        for layer in layers:
+            values.update(layer.values)
+
+        return self.cls(values, default_key=self.default_key, immutable=True)
+
+    def resolve(
+        self,
+        layers: Sequence[Layer],
+        overrides: Optional[Mapping[str, bool]] = None,
+    ) -> FeatureFlags_T:
+        """Get immutable feature flags resolved from the ``layers``.
+
+        Args:
+            layers: Layers, from the lowest precedence to the highest.
+            overrides: Uncached per-call overrides applied on top of the
+                layers (e.g. request headers).
+        """
+
+        # Versions are read before values, so a concurrent update may only
+        # cache newer values under an outdated key, which is never reused.
+        key = tuple((layer, layer.version) for layer in layers)
+
+        with self.lock:
+            feature_flags = self.cache.get(key)
+
+            if feature_flags is not None:
+                self.cache.move_to_end(key)
+
+        if feature_flags is None:
+            feature_flags = self.merge(layers)
+
+            with self.lock:
+                self.cache[key] = feature_flags
+
+                if len(self.cache) > self.maxsize:
+                    self.cache.popitem(last=False)
+
+        if isinstance(overrides, FlagOverrides):
+            return overrides.apply(feature_flags)
+        if overrides:
+            return feature_flags._copy(overrides)
+
+        return feature_flags
+
+    def clear(self) -> None:
+        """Drop all cached feature flags."""
+
+        with self.lock:
+            self.cache.clear()
@@ -0,0 +1,212 @@
+import os
+from os import environ as os_environ
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from .core import FeatureFlags, FeatureFlags_T, FeatureFlagsMeta
+from .parser import BOOLS, parse_feature_flags_string
+from .sources import _strip_comments
+
+Route = Tuple[FeatureFlagsMeta, str]
+
+
+class Source(NamedTuple):
+    """Key-value pairs to load feature flags from.
+
+    Attributes:
+        items: Pairs of keys and values (bools or strings, see
+            :func:`fiicha.parser.parse_bool`).
+        prefixed: Whether keys are prefixed (e.g. environment variables)
+            or are bare feature flag names.
+        name: Name of the source, for reporting.
+    """
+
+    items: Iterable[Tuple[str, Any]]
+    prefixed: bool
+    name: str
+
+
+def from_environ(environ: Mapping[str, str] = os_environ) -> Source:
+    """Get source of the environment variables, keys must be prefixed."""
+
+    return Source(environ.items(), True, "environ")
+
+
+def from_mapping(values: Mapping[str, Any], prefixed: bool = False) -> Source:
+    """Get source of the mapping (e.g. parsed config)."""
+
+    return Source(values.items(), prefixed, "mapping")
+
+
+def from_string(s: Optional[str], sep: Optional[str] = None, neg: str = "!") -> Source:
+    """Get source of the feature flags string (e.g. command line argument).
+
+    See :func:`fiicha.parse_feature_flags_string`.
+    """
+
+    return Source(parse_feature_flags_string(s, sep, neg).items(), False, "string")
+
+
+def from_file(
+    path: Union[str, "os.PathLike[str]"], sep: Optional[str] = None, neg: str = "!"
+) -> Source:
+    """Get source of the file with feature flags string.
+
+    Text after ``#`` up to the end of the line is ignored.
+    """
+
+    with open(path) as f:
+        text = _strip_comments(f.read())
+
+    return Source(parse_feature_flags_string(text, sep, neg).items(), False, str(path))
+
+
+class LoadResult:
+    """Feature flags loaded by :class:`Loader`.
+
+    Get immutable feature flags of the class by indexing:
+
+    >>> result[MyFeatureFlags]
+
+    Attributes:
+        feature_flags: Mapping of classes to their feature flags.
+        unknown: Keys matching no feature flag, as ``source:key``.
+        invalid: Keys with values that are not booleans, as ``source:key``.
+    """
+
+    def __init__(
+        self,
+        feature_flags: Dict[FeatureFlagsMeta, FeatureFlags],
+        unknown: List[str],
+        invalid: List[str],
+    ) -> None:
+        self.feature_flags = feature_flags
+        self.unknown = unknown
+        self.invalid = invalid
+
+    def __getitem__(self, cls: Type[FeatureFlags_T]) -> FeatureFlags_T:
+        return self.feature_flags[cls]  # type: ignore
+
+
+class Loader:
+    """Loader of several feature flags classes from several sources at once.
+
+    Every source is read exactly once. Keys are routed to classes through
+    indexes built on creation: prefixed keys by the exact key (e.g.
+    ``MYPROJ_FEATURE_RELEASE_X``), falling back to the class prefix, bare
+    names by the name (a name shared by several classes sets all of them).
+    Prefixed keys matching no prefix are ignored, unknown names under a
+    known prefix are reported. Later sources take precedence.
+
+    >>> loader = Loader({"MYPROJ_FEATURE_": MyFeatureFlags, "BILLING_": Billing})
+    >>> result = loader.load(from_environ(), from_file("features.txt"))
+    >>> result[MyFeatureFlags]
+
+    Args:
+        classes: Mapping of key prefixes to feature flags classes.
+        default_key: Key with default value for unset flags.
+    """
+
+    def __init__(
+        self, classes: Mapping[str, FeatureFlagsMeta], default_key: str = ""
+    ) -> None:
+        self.classes = dict(classes)
+        self.default_key = default_key
+        self.keys: Dict[str, Route] = {}
+        self.names: Dict[str, List[Route]] = {}
+        self.prefixes: Dict[str, FeatureFlagsMeta] = {}
+
+        for prefix, cls in self.classes.items():
+            self.prefixes[prefix] = cls
+
+            for name in cls.__definitions__:
+                self.keys[prefix + name.upper()] = (cls, name)
+                self.names.setdefault(name, []).append((cls, name))
+
+            if default_key:
+                self.keys[prefix + default_key.upper()] = (cls, default_key)
+                self.names.setdefault(default_key, []).append((cls, default_key))
+
+        # Longest prefixes first, so nested prefixes route to the closest.
+        self.prefix_lengths = sorted({len(p) for p in self.prefixes}, reverse=True)
+
+    def _route_prefixed(self, key: str) -> Optional[List[Route]]:
+        """Get routes of the prefixed key, ``None`` if it has no known prefix.
+
+        Keys with a known prefix, but an unknown name have no routes.
+        """
+
+        route = self.keys.get(key)
+
+        if route is not None:
+            return [route]
+
+        for length in self.prefix_lengths:
+            cls = self.prefixes.get(key[:length])
+
+            if cls is not None:
+                name = key[length:].lower()
+
+                if name in cls.__definitions__ or (name and name == self.default_key):
+                    return [(cls, name)]
+
+                return []
+
+        return None
+
+    def load(self, *sources: Source) -> LoadResult:
+        """Load immutable feature flags of all classes from the sources."""
+
+        values: Dict[FeatureFlagsMeta, Dict[str, bool]] = {
+            cls: {} for cls in self.classes.values()
+        }
+        unknown: List[str] = []
+        invalid: List[str] = []
+        names = self.names
+
+        for source in sources:
+            for key, value in source.items:
+                if source.prefixed:
+                    routes = self._route_prefixed(key)
+
+                    if routes is None:
+                        continue
+                else:
+                    routes = names.get(key, [])
+
+                if not routes:
+                    unknown.append(f"{source.name}:{key}")
+                    continue
+
+                if isinstance(value, str):
+                    value = BOOLS.get(value.strip().lower())
+                elif not isinstance(value, bool):
+                    value = None
+
+                if value is None:
+                    invalid.append(f"{source.name}:{key}")
+                    continue
+
+                for cls, name in routes:
+                    values[cls][name] = value
+
+        return LoadResult(
+            {
+                cls: cls(
+                    cls_values, default_key=self.default_key, immutable=True
+                )._freeze()
+                for cls, cls_values in values.items()
+            },
+            unknown,
+            invalid,
+        )
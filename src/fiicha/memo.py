@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from functools import wraps
+from inspect import iscoroutinefunction
+from operator import attrgetter
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Optional, Tuple, TypeVar
+
+from .context import FeatureFlagsContext
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def memoize(
+    context: FeatureFlagsContext[Any],
+    *flags: str,
+    maxsize: int = 128,
+    ttl: Optional[float] = None,
+    clock: Callable[[], float] = monotonic,
+) -> Callable[[F], F]:
+    """Memoize function whose result depends on the given feature flags.
+
+    States of the ``flags`` in the current feature flags of the ``context``
+    are part of the cache key along with the arguments, so results computed
+    for one combination of states are never returned for another.
+
+    >>> @memoize(ff_ctx, "use_new_algorithm", maxsize=32)
+    ... def compute(x): ...
+
+    Args:
+        context: Feature flags context to get current feature flags from.
+        flags: Names of the feature flags the function depends on.
+        maxsize: Maximum number of cached results, least recently used
+            ones are evicted first.
+        ttl: Time in seconds after which cached results expire.
+        clock: Function returning current time in seconds.
+    """
+
+    if not flags:
+        raise ValueError("at least one feature flag is required")
+    if maxsize < 1:
+        raise ValueError("maxsize must be positive")
+
+    get_states = attrgetter(*flags)
+
+    def decorator(func: F) -> F:
+        if iscoroutinefunction(func):
+            raise TypeError("coroutine functions are not supported")
+
+        cache: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        lock = Lock()
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            key: Tuple[Any, ...] = (get_states(context.get_current()), args)
+
+            if kwargs:
+                key += tuple(sorted(kwargs.items()))
+
+            now = clock() if ttl is not None else 0.0
+
+            with lock:
+                entry = cache.get(key)
+
+                if entry is not None:
+                    if ttl is None or now < entry[0]:
+                        cache.move_to_end(key)
+                        return entry[1]
+
+                    del cache[key]
+
+            result = func(*args, **kwargs)
+
+            with lock:
+                cache[key] = (now + ttl if ttl is not None else 0.0, result)
+                cache.move_to_end(key)
+
+                if len(cache) > maxsize:
+                    cache.popitem(last=False)
+
+            return result
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.cache = cache  # type: ignore
+        wrapper.cache_clear = cache_clear  # type: ignore
+
+        return wrapper  # type: ignore
+
+    return decorator
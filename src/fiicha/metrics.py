@@ -0,0 +1,283 @@
+from collections import defaultdict
+from functools import wraps
+from threading import Lock, local
+from typing import Any, Callable, DefaultDict, Dict, Optional
+from weakref import WeakSet, finalize
+
+from .core import FeatureFlagsMeta
+
+# Methods reading all feature flags at once (setting a flag of copy-on-write
+# overlay copies the rest). Reads made by them are not counted.
+BULK_METHODS = (
+    "_dict",
+    "_freeze",
+    "_copy",
+    "__copy__",
+    "__repr__",
+    "__or__",
+    "__ior__",
+    "__reduce__",
+    "_set",
+    "__setattr__",
+)
+
+
+class ThreadCounters:
+    """Read counters of a single thread.
+
+    Keys are :class:`CountingFeatureFlag` descriptors.
+    """
+
+    __slots__ = ("paused", "trues", "falses", "__weakref__")
+
+    def __init__(self) -> None:
+        self.paused = 0
+        self.trues: DefaultDict[Any, int] = defaultdict(int)
+        self.falses: DefaultDict[Any, int] = defaultdict(int)
+
+
+class CountingFeatureFlag:
+    """A descriptor counting reads of the wrapped feature flag descriptor.
+
+    Args:
+        metrics: Metrics to record reads to.
+        owner: Feature flags class the descriptor is installed to.
+        name: Feature flag name.
+        wrapped: Original descriptor of the feature flag.
+    """
+
+    __slots__ = ("metrics", "owner", "name", "wrapped", "get")
+
+    def __init__(
+        self, metrics: "FlagMetrics", owner: type, name: str, wrapped: Any
+    ) -> None:
+        self.metrics = metrics
+        self.owner = owner
+        self.name = name
+        self.wrapped = wrapped
+        self.get = wrapped.__get__
+
+    def __get__(self, obj: Any, cls: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+
+        value = self.get(obj, cls)
+        metrics = self.metrics
+
+        # Shared between threads: a race only shifts the sampled read.
+        if metrics.skip:
+            metrics.skip -= 1
+            return value
+
+        metrics.skip = metrics.sample - 1
+
+        try:
+            counters = metrics.local.counters
+        except AttributeError:
+            counters = metrics.register_thread()
+
+        if not counters.paused:
+            if value:
+                counters.trues[self] += 1
+            else:
+                counters.falses[self] += 1
+
+        return value
+
+    def __set__(self, obj: Any, value: bool) -> None:
+        self.wrapped.__set__(obj, value)
+
+
+class FlagMetrics:
+    """Feature flag read counters.
+
+    Counting is enabled per class with :meth:`instrument`, which replaces
+    feature flag descriptors with counting ones. Classes that are not
+    instrumented are not affected in any way. Every thread counts into its
+    own counters, merged only when :meth:`snapshot` is taken. Counters are
+    owned by the thread-local storage: once a thread exits, its counts are
+    folded into the shared totals and its counters are dropped.
+
+    Args:
+        sample: Count only every ``sample``-th read and scale the result
+            accordingly.
+    """
+
+    def __init__(self, sample: int = 1) -> None:
+        if sample < 1:
+            raise ValueError("sample must be positive")
+
+        self.sample = sample
+        self.skip = 0
+        self.local = local()
+        self.threads: "WeakSet[ThreadCounters]" = WeakSet()
+        # Counts of exited threads.
+        self.trues: DefaultDict[Any, int] = defaultdict(int)
+        self.falses: DefaultDict[Any, int] = defaultdict(int)
+        self.flags: Dict[FeatureFlagsMeta, Dict[str, Any]] = {}
+        self.lock = Lock()
+
+    def register_thread(self) -> ThreadCounters:
+        """Create counters of the current thread."""
+
+        counters = self.local.counters = ThreadCounters()
+
+        with self.lock:
+            self.threads.add(counters)
+
+        # Pass the dicts, not the counters, so they can be collected.
+        finalize(counters, self._fold, counters.trues, counters.falses)
+
+        return counters
+
+    def _fold(self, trues: Dict[Any, int], falses: Dict[Any, int]) -> None:
+        """Add counts of an exited thread to the shared totals."""
+
+        with self.lock:
+            for key, count in trues.items():
+                self.trues[key] += count
+            for key, count in falses.items():
+                self.falses[key] += count
+
+    def pausing(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Wrap method, so feature flag reads made by it are not counted."""
+
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            try:
+                counters = self.local.counters
+            except AttributeError:
+                counters = self.register_thread()
+
+            counters.paused += 1
+
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                counters.paused -= 1
+
+        return wrapper
+
+    def instrument(self, cls: FeatureFlagsMeta) -> None:
+        """Start counting reads of the feature flags of the class."""
+
+        if cls in self.flags:
+            return
+
+        originals: Dict[str, Any] = {}
+
+        for name in cls._flags():
+            originals[name] = cls.__dict__.get(name)
+            wrapped = getattr(cls, name)
+            setattr(cls, name, CountingFeatureFlag(self, cls, name, wrapped))
+
+        for name in BULK_METHODS:
+            if hasattr(cls, name):
+                originals[name] = cls.__dict__.get(name)
+                setattr(cls, name, self.pausing(getattr(cls, name)))
+
+        self.flags[cls] = originals
+        _reset_overlay_class(cls)
+
+    def uninstrument(self, cls: FeatureFlagsMeta) -> None:
+        """Stop counting reads of the feature flags of the class.
+
+        Collected counts are preserved.
+        """
+
+        originals = self.flags.pop(cls, None)
+
+        if originals is None:
+            return
+
+        for name, original in originals.items():
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+
+        _reset_overlay_class(cls)
+
+    def reset(self) -> None:
+        """Reset all counters."""
+
+        with self.lock:
+            self.trues.clear()
+            self.falses.clear()
+
+            for counters in self.threads:
+                counters.trues.clear()
+                counters.falses.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict[str, int]]]:
+        """Get read counts: class name -> flag name -> counts.
+
+        Counts are ``reads``, ``true`` and ``false`` (number of reads
+        returning the respective value). Flags never read are included
+        with zero counts.
+        """
+
+        with self.lock:
+            trues = self.trues.copy()
+            falses = self.falses.copy()
+            threads = list(self.threads)
+
+        for counters in threads:
+            for key, count in counters.trues.copy().items():
+                trues[key] += count
+            for key, count in counters.falses.copy().items():
+                falses[key] += count
+
+        result: Dict[str, Dict[str, Dict[str, int]]] = {}
+        sample = self.sample
+
+        for cls in list(self.flags):
+            flags = result.setdefault(_class_name(cls), {})
+
+            for name in cls._flags():
+                flags[name] = {"reads": 0, "true": 0, "false": 0}
+
+        for key in {*trues, *falses}:
+            true = trues[key] * sample
+            false = falses[key] * sample
+            result.setdefault(_class_name(key.owner), {})[key.name] = {
+                "reads": true + false,
+                "true": true,
+                "false": false,
+            }
+
+        return result
+
+    def to_prometheus(self, prefix: str = "fiicha") -> str:
+        """Get read counts in Prometheus text exposition format."""
+
+        name = f"{prefix}_feature_flag_reads_total"
+        lines = [
+            f"# HELP {name} Number of feature flag reads by returned value.",
+            f"# TYPE {name} counter",
+        ]
+
+        for cls_name, flags in sorted(self.snapshot().items()):
+            for flag, counts in sorted(flags.items()):
+                labels = f'class="{_escape(cls_name)}",flag="{_escape(flag)}"'
+
+                for value in ("true", "false"):
+                    sample = f'{name}{{{labels},value="{value}"}}'
+                    lines.append(f"{sample} {counts[value]}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _class_name(cls: type) -> str:
+    return f"{cls.__module__}.{cls.__qualname__}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _reset_overlay_class(cls: type) -> None:
+    """Drop overlay class, so it's re-created with the current descriptors."""
+
+    if "__overlay__" in cls.__dict__:
+        delattr(cls, "__overlay__")
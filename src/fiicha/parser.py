@@ -1,5 +1,9 @@
+from functools import lru_cache
 from os import environ
-from typing import Iterable, Mapping, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Iterable, Iterator, Mapping, Optional, Tuple
+
+from .core import FeatureFlags_T, FeatureFlagsMeta, object_setattr
 
 
 def parse_feature_flags_string(
@@ -16,6 +20,110 @@ def parse_feature_flags_string(
     return {flag.lstrip(neg): not flag.startswith(neg) for flag in s.split(sep)}
 
 
+class FlagOverrides(Mapping[str, bool]):
+    """Immutable feature flag overrides prevalidated against the class.
+
+    Unknown feature flags are dropped on creation. For packed classes
+    overrides are also compiled into set and clear bit masks.
+
+    Args:
+        cls: Feature flags class.
+        values: Feature flag states to override.
+    """
+
+    __slots__ = ("cls", "overrides", "set_mask", "clear_mask")
+
+    cls: FeatureFlagsMeta
+    overrides: Mapping[str, bool]
+    set_mask: int
+    clear_mask: int
+
+    def __init__(self, cls: FeatureFlagsMeta, values: Mapping[str, bool]) -> None:
+        definitions = cls.__definitions__
+        values = {
+            name: bool(value) for name, value in values.items() if name in definitions
+        }
+        set_mask = 0
+        clear_mask = 0
+
+        if cls.__packed__:
+            for name, value in values.items():
+                if value:
+                    set_mask |= 1 << cls.__flag_positions__[name]
+                else:
+                    clear_mask |= 1 << cls.__flag_positions__[name]
+
+        # Instances are shared by the cache of compile_feature_flags_string.
+        object_setattr(self, "cls", cls)
+        object_setattr(self, "overrides", MappingProxyType(values))
+        object_setattr(self, "set_mask", set_mask)
+        object_setattr(self, "clear_mask", clear_mask)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise RuntimeError("this instance is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise RuntimeError("this instance is immutable")
+
+    def __getitem__(self, name: str) -> bool:
+        return self.overrides[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.overrides)
+
+    def __len__(self) -> int:
+        return len(self.overrides)
+
+    def __repr__(self) -> str:
+        return f"FlagOverrides({self.cls.__name__}, {self.overrides!r})"
+
+    def apply(
+        self, feature_flags: FeatureFlags_T, immutable: Optional[bool] = None
+    ) -> FeatureFlags_T:
+        """Get copy of the feature flags object with overrides applied.
+
+        Args:
+            feature_flags: Instance of the class overrides were created for.
+            immutable: Set immutable flag for new copy. If unset, value is
+                carried over from ``feature_flags``.
+        """
+
+        if immutable is None:
+            immutable = feature_flags._immutable
+
+        if self.cls.__packed__ and feature_flags.__class__ is self.cls:
+            bits: int = feature_flags._bits  # type: ignore
+            bits = bits & ~self.clear_mask | self.set_mask
+            return self.cls._from_bits(bits, immutable)  # type: ignore
+
+        return feature_flags._copy(self.overrides, immutable=immutable)
+
+
+@lru_cache(maxsize=1024)
+def compile_feature_flags_string(
+    cls: FeatureFlagsMeta, s: Optional[str], sep: Optional[str] = None, neg: str = "!"
+) -> FlagOverrides:
+    """Parse feature flags string into overrides of the class.
+
+    Results are cached, so strings seen repeatedly (e.g. override headers
+    sent by the same clients) are parsed only once.
+
+    Args:
+        cls: Feature flags class.
+        s: Feature flags string, see :func:`parse_feature_flags_string`.
+        sep: Feature flags separator.
+        neg: Negation prefix.
+    """
+
+    return FlagOverrides(cls, parse_feature_flags_string(s, sep, neg))
+
+
+BOOLS: Mapping[str, bool] = {
+    **dict.fromkeys(("1", "true", "t", "yes", "y", "on"), True),
+    **dict.fromkeys(("0", "false", "f", "no", "n", "off", ""), False),
+}
+
+
 def parse_bool(s: str) -> Optional[bool]:
     """Parse string as boolean.
 
@@ -26,13 +134,7 @@ def parse_bool(s: str) -> Optional[bool]:
     before performing the match.
     """
 
-    s = s.strip().lower()
-
-    if s in {"1", "true", "t", "yes", "y", "on"}:
-        return True
-    if s in {"0", "false", "f", "no", "n", "off", ""}:
-        return False
-    return None
+    return BOOLS.get(s.strip().lower())
 
 
 def _feature_flags_from_environ(
@@ -0,0 +1,172 @@
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from .core import FeatureFlags, FeatureFlagsMeta
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None  # type: ignore
+
+Key = Union[int, str]
+Expose = Callable[[str, bool], Any]
+
+BUCKETS = 10_000
+MASK64 = (1 << 64) - 1
+MIX1 = 0xBF58476D1CE4E5B9
+MIX2 = 0x94D049BB133111EB
+
+
+def hash_str(s: str) -> int:
+    """Get stable 64-bit hash of the string."""
+
+    return int.from_bytes(blake2b(s.encode(), digest_size=8).digest(), "little")
+
+
+hash_name = lru_cache(maxsize=1024)(hash_str)
+
+
+def hash_key(key: Key) -> int:
+    """Get stable 64-bit hash of the subject key.
+
+    Integers are used as is (modulo 2**64), strings are hashed with BLAKE2b.
+    """
+
+    if isinstance(key, int):
+        return key & MASK64
+
+    return hash_str(key)
+
+
+def _mix(z: int) -> int:
+    """SplitMix64 finalizer."""
+
+    z = ((z ^ (z >> 30)) * MIX1) & MASK64
+    z = ((z ^ (z >> 27)) * MIX2) & MASK64
+    return z ^ (z >> 31)
+
+
+def threshold(percentage: float) -> int:
+    """Get number of buckets covered by the rollout ``percentage``."""
+
+    return round(min(max(percentage, 0.0), 100.0) * BUCKETS / 100)
+
+
+def bucket(name: str, key: Key) -> int:
+    """Get bucket of the subject ``key`` for the feature flag ``name``.
+
+    Bucket depends only on the feature flag name and the subject key, so it
+    is the same across processes and hosts.
+    """
+
+    return _mix(hash_key(key) ^ hash_name(name)) % BUCKETS
+
+
+def in_rollout(name: str, key: Key, percentage: float) -> bool:
+    """Check whether feature flag ``name`` is rolled out for the subject."""
+
+    return bucket(name, key) < threshold(percentage)
+
+
+def _hash_keys(keys: Any) -> Any:
+    """Convert array-like of subject keys to array of 64-bit hashes."""
+
+    array = np.asarray(keys if hasattr(keys, "__len__") else list(keys))
+
+    if array.dtype.kind == "u":
+        return array.astype(np.uint64)
+    if array.dtype.kind == "i":
+        return array.astype(np.int64).view(np.uint64)
+
+    return np.fromiter(map(hash_key, array.tolist()), np.uint64, len(array))
+
+
+def buckets(name: str, keys: Iterable[Key]) -> Sequence[int]:
+    """Get buckets of all subject ``keys`` for the feature flag ``name``.
+
+    Returns NumPy array if NumPy is available, list otherwise.
+    """
+
+    seed = hash_name(name)
+
+    if np is None:
+        return [_mix(hash_key(key) ^ seed) % BUCKETS for key in keys]
+
+    z = _hash_keys(keys) ^ np.uint64(seed)
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(MIX1)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(MIX2)
+    z ^= z >> np.uint64(31)
+
+    return (z % np.uint64(BUCKETS)).astype(np.int64)
+
+
+def assignments(name: str, keys: Iterable[Key], percentage: float) -> Sequence[bool]:
+    """Check for all subject ``keys`` whether feature flag is rolled out.
+
+    Returns NumPy array if NumPy is available, list otherwise.
+    """
+
+    limit = threshold(percentage)
+    result = buckets(name, keys)
+
+    if np is None:
+        return [b < limit for b in result]
+
+    return result < limit  # type: ignore
+
+
+def rollouts(cls: FeatureFlagsMeta) -> Dict[str, float]:
+    """Get rollout percentages of the feature flags class (name -> value).
+
+    Computed once per class.
+    """
+
+    result: Dict[str, float] = cls.__dict__.get("__rollouts__")  # type: ignore
+
+    if result is None:
+        result = {
+            name: flag.rollout
+            for name, flag in cls.__definitions__.items()
+            if flag.rollout is not None
+        }
+        setattr(cls, "__rollouts__", result)
+
+    return result
+
+
+def rolled_out(cls: FeatureFlagsMeta, key: Key) -> List[str]:
+    """Get names of the feature flags rolled out for the subject ``key``."""
+
+    return [
+        name
+        for name, percentage in rollouts(cls).items()
+        if in_rollout(name, key, percentage)
+    ]
+
+
+def apply_rollouts(
+    feature_flags: FeatureFlags, key: Key, expose: Optional[Expose] = None
+) -> None:
+    """Enable feature flags rolled out for the subject ``key``.
+
+    Feature flags already enabled stay enabled.
+
+    Args:
+        feature_flags: Feature flags to update.
+        key: Subject key.
+        expose: Function called with name and resulting state of every
+            feature flag with rollout (e.g. ``partial(exposures.log, key)``,
+            see :class:`fiicha.exposure.ExposureLogger`).
+    """
+
+    if expose is None:
+        for name in rolled_out(feature_flags.__class__, key):
+            feature_flags._set(name, True)
+        return
+
+    for name, percentage in rollouts(feature_flags.__class__).items():
+        if in_rollout(name, key, percentage):
+            feature_flags._set(name, True)
+
+        expose(name, getattr(feature_flags, name))
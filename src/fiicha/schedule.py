@@ -0,0 +1,127 @@
+from bisect import bisect_right
+from math import inf, isfinite
+from threading import Lock
+from time import time
+from typing import Callable, Dict, Generic, Mapping, Optional, Tuple, Type
+
+from .core import FeatureFlags_T, FeatureFlagsMeta
+
+
+class Schedule:
+    """Activation windows of the scheduled feature flags.
+
+    Scheduled feature flag is enabled from its activation time (inclusive)
+    until its expiry time (exclusive) and disabled otherwise. Missing bound
+    means the window is open on that side.
+
+    Args:
+        windows: Mapping of feature flag names to pairs of activation and
+            expiry times (UNIX timestamps).
+    """
+
+    def __init__(self, windows: Mapping[str, Tuple[float, float]]) -> None:
+        self.windows = dict(windows)
+        self.transitions = sorted(
+            {t for window in self.windows.values() for t in window if isfinite(t)}
+        )
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def states(self, now: float) -> Dict[str, bool]:
+        """Get states of the scheduled feature flags at the given time."""
+
+        return {
+            name: start <= now < end for name, (start, end) in self.windows.items()
+        }
+
+    def next_transition(self, now: float) -> float:
+        """Get time of the first state change after the given time.
+
+        Returns:
+            UNIX timestamp, or infinity if no feature flag changes anymore.
+        """
+
+        i = bisect_right(self.transitions, now)
+
+        return self.transitions[i] if i < len(self.transitions) else inf
+
+
+def schedule(cls: FeatureFlagsMeta) -> Schedule:
+    """Get schedule of the feature flags class, computed once."""
+
+    result: Schedule = cls.__dict__.get("__schedule__")  # type: ignore
+
+    if result is None:
+        result = Schedule(
+            {
+                name: (
+                    -inf if flag.active_from is None else flag.active_from,
+                    inf if flag.active_until is None else flag.active_until,
+                )
+                for name, flag in cls.__definitions__.items()
+                if flag.active_from is not None or flag.active_until is not None
+            }
+        )
+        setattr(cls, "__schedule__", result)
+
+    return result
+
+
+class ScheduledSource(Generic[FeatureFlags_T]):
+    """Immutable feature flags snapshot with scheduled feature flags applied.
+
+    The snapshot is rebuilt only when the next state transition of the
+    scheduled feature flags is due or the base snapshot is replaced, so
+    getting it costs a clock call and a comparison, and reads of feature
+    flags never call the clock. Scheduled states take precedence over the
+    base snapshot. Pass :meth:`get` as ``source`` to
+    :class:`fiicha.FeatureFlagsContext`.
+
+    Args:
+        cls: Feature flags class.
+        source: Callable returning the base snapshot (e.g.
+            :meth:`fiicha.sources.FileSource.get`). Defaults to feature
+            flags with default states.
+        clock: Function returning current UNIX time.
+    """
+
+    def __init__(
+        self,
+        cls: Type[FeatureFlags_T],
+        source: Optional[Callable[[], FeatureFlags_T]] = None,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        if source is None:
+            default = cls(immutable=True)
+            source = lambda: default  # noqa: E731
+
+        self.schedule = schedule(cls)
+        self.source = source
+        self.clock = clock
+        self.lock = Lock()
+        # Base snapshot, time of the next transition and the snapshot.
+        self.state: Tuple[Optional[FeatureFlags_T], float, Optional[FeatureFlags_T]]
+        self.state = (None, -inf, None)
+
+    def get(self) -> FeatureFlags_T:
+        """Get current feature flags snapshot."""
+
+        base = self.source()
+        state = self.state
+
+        if state[0] is base and self.clock() < state[1]:
+            return state[2]  # type: ignore
+
+        return self.rebuild(base)
+
+    def rebuild(self, base: FeatureFlags_T) -> FeatureFlags_T:
+        """Apply scheduled states at the current time to the base snapshot."""
+
+        with self.lock:
+            now = self.clock()
+            states = self.schedule.states(now)
+            snapshot = base._copy(states, immutable=True) if states else base
+            self.state = (base, self.schedule.next_transition(now), snapshot)
+
+        return snapshot
@@ -0,0 +1,227 @@
+import logging
+import mmap
+import os
+from struct import Struct
+from time import sleep
+from typing import Any, Generic, Optional, Tuple, Type, Union
+
+from .core import FeatureFlags_T
+from .utils import flags_fingerprint, flags_from_int, flags_to_int
+
+MAGIC = b"FIIC"
+LAYOUT_VERSION = 1
+# magic, layout version, reserved, schema fingerprint, bitmap size, reserved
+HEADER = Struct("<4sHHQII")
+# sequence number of the seqlock: odd while the writer is updating the bitmap
+SEQUENCE = Struct("<Q")
+SEQUENCE_OFFSET = HEADER.size
+BITMAP_OFFSET = SEQUENCE_OFFSET + SEQUENCE.size
+# attempts to read the bitmap before giving up on the writer
+MAX_RETRIES = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFeatureFlags(Generic[FeatureFlags_T]):
+    """Feature flag states shared between processes via mmap'd file.
+
+    Intended for prefork servers: one process (the writer) publishes feature
+    flags, all workers on the host read them without locks or polling and
+    see changes immediately. Every worker keeps only the latest immutable
+    snapshot, re-created only after the writer has published a new state.
+
+    File layout (little-endian)::
+
+        magic "FIIC" | layout version u16 | reserved u16 |
+        schema fingerprint u64 | bitmap size u32 | reserved u32 |
+        sequence u64 | bitmap
+
+    The header and the bitmap are protected by a seqlock: the writer makes
+    sequence odd, updates them and makes sequence even again. Readers retry
+    (at most :data:`MAX_RETRIES` times) until they see the same even
+    sequence before and after copying them. There must be a single writer
+    at a time.
+
+    Readers keep the last good snapshot when the writer does not finish an
+    update (e.g. it was killed in the middle) or when the file has been
+    reset by a writer with a different set of feature flags.
+
+    Args:
+        path: Path to the file, preferably on tmpfs (e.g. ``/dev/shm``).
+        cls: Feature flags class.
+        writer: Create the file if needed and allow :meth:`publish`.
+            Feature flag states published by the previous writer are kept
+            if its feature flags schema is the same.
+        initial: Feature flags for the writer to publish on opening, instead
+            of keeping the previous states (or using the default ones).
+    """
+
+    def __init__(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        cls: Type[FeatureFlags_T],
+        writer: bool = False,
+        initial: Optional[FeatureFlags_T] = None,
+    ) -> None:
+        self.cls = cls
+        self.writer = writer
+        self.fingerprint = flags_fingerprint(cls)
+        self.size = (len(tuple(cls._flags())) + 7) // 8
+        self._cache: Tuple[int, Optional[FeatureFlags_T]] = (-1, None)
+
+        length = BITMAP_OFFSET + self.size
+
+        if writer:
+            fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        else:
+            fd = os.open(path, os.O_RDONLY)
+
+        try:
+            if writer:
+                # Never shrink the file: readers may have mapped more of it.
+                os.ftruncate(fd, max(length, os.fstat(fd).st_size))
+            elif os.fstat(fd).st_size < length:
+                raise ValueError("shared feature flags file is too small")
+
+            self.mmap = mmap.mmap(
+                fd,
+                length,
+                access=mmap.ACCESS_WRITE if writer else mmap.ACCESS_READ,
+            )
+        finally:
+            os.close(fd)
+
+        if writer:
+            self._reset(initial)
+        else:
+            self._check_header(HEADER.unpack_from(self.mmap))
+
+    def _reset(self, initial: Optional[FeatureFlags_T]) -> None:
+        """Write header of the writer, keeping states of the same schema."""
+
+        buf = self.mmap
+        end = BITMAP_OFFSET + self.size
+        header = HEADER.pack(MAGIC, LAYOUT_VERSION, 0, self.fingerprint, self.size, 0)
+        odd = 1
+
+        if buf[:4] == MAGIC:
+            # Keep sequence growing, so readers of the previous writer do not
+            # mistake new states for the cached ones.
+            odd = (self.sequence + 1) | 1
+
+        if initial is not None:
+            bitmap = flags_to_int(initial).to_bytes(self.size, "little")
+        elif buf[: HEADER.size] == header:
+            # There is no other writer, so the bitmap is read as is. If the
+            # previous writer was killed while publishing, it is a mix of the
+            # old and the new states, but never the reset ones.
+            bitmap = buf[BITMAP_OFFSET:end]
+        else:
+            bitmap = bytes(self.size)
+
+        SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, odd)
+        buf[: HEADER.size] = header
+        buf[BITMAP_OFFSET:end] = bitmap
+        SEQUENCE.pack_into(buf, SEQUENCE_OFFSET, odd + 1)
+
+    def _check_header(self, header: Tuple[Any, ...]) -> None:
+        magic, version, _, fingerprint, size, _ = header
+
+        if magic != MAGIC:
+            raise ValueError("not a shared feature flags file")
+        if version != LAYOUT_VERSION:
+            raise ValueError(f"unsupported layout version: {version}")
+        if fingerprint != self.fingerprint or size != self.size:
+            raise ValueError("feature flags schema mismatch")
+
+    @property
+    def sequence(self) -> int:
+        """Sequence number, incremented by 2 on every publish and writer reset."""
+
+        return SEQUENCE.unpack_from(self.mmap, SEQUENCE_OFFSET)[0]
+
+    def publish(self, feature_flags: FeatureFlags_T) -> None:
+        """Write feature flag states for all readers.
+
+        Args:
+            feature_flags: Instance of the class given to the constructor.
+        """
+
+        if not self.writer:
+            raise RuntimeError("opened in read-only mode")
+
+        bitmap = flags_to_int(feature_flags).to_bytes(self.size, "little")
+        sequence = self.sequence
+
+        SEQUENCE.pack_into(self.mmap, SEQUENCE_OFFSET, sequence + 1)
+        self.mmap[BITMAP_OFFSET : BITMAP_OFFSET + self.size] = bitmap
+        SEQUENCE.pack_into(self.mmap, SEQUENCE_OFFSET, sequence + 2)
+
+    def read(self) -> Tuple[int, int]:
+        """Read consistent pair of the sequence number and the bitmap.
+
+        Raises:
+            RuntimeError: The writer has not finished the update after
+                :data:`MAX_RETRIES` attempts.
+            ValueError: The file was reset by a writer with a different
+                feature flags schema.
+        """
+
+        buf = self.mmap
+        unpack_from = SEQUENCE.unpack_from
+        end = BITMAP_OFFSET + self.size
+
+        for _ in range(MAX_RETRIES):
+            before = unpack_from(buf, SEQUENCE_OFFSET)[0]
+
+            if before & 1:
+                sleep(0)
+                continue
+
+            header = HEADER.unpack_from(buf)
+            bitmap = buf[BITMAP_OFFSET:end]
+
+            if unpack_from(buf, SEQUENCE_OFFSET)[0] == before:
+                self._check_header(header)
+                return before, int.from_bytes(bitmap, "little")
+
+        raise RuntimeError("shared feature flags are being updated")
+
+    def get(self) -> FeatureFlags_T:
+        """Get immutable snapshot of the shared feature flags.
+
+        The snapshot is cached until the writer publishes new states, so
+        the common path is a single read of the sequence number. If the new
+        states cannot be read, the last good snapshot is returned (errors
+        are raised only if there is none).
+        """
+
+        sequence, snapshot = self._cache
+        current = self.sequence
+
+        if snapshot is None or current != sequence:
+            try:
+                sequence, bits = self.read()
+            except (RuntimeError, ValueError) as e:
+                if snapshot is None:
+                    raise
+
+                logger.warning("Keeping last good shared feature flags: %s", e)
+                self._cache = (current, snapshot)
+                return snapshot
+
+            snapshot = flags_from_int(self.cls, bits, immutable=True)
+            self._cache = (sequence, snapshot)
+
+        return snapshot
+
+    def close(self) -> None:
+        """Unmap the file."""
+
+        self.mmap.close()
+
+    def __enter__(self) -> "SharedFeatureFlags[FeatureFlags_T]":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
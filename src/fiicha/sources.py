@@ -0,0 +1,363 @@
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from threading import Event, Thread
+from time import monotonic
+from typing import Any, Dict, Generic, List, Mapping, Optional, Tuple, Type, Union
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from .changes import Subscriptions
+from .core import FeatureFlags_T
+from .parser import parse_bool, parse_feature_flags_string
+
+logger = logging.getLogger(__name__)
+
+
+def _strip_comments(text: str) -> str:
+    return "\n".join(line.partition("#")[0] for line in text.splitlines())
+
+
+class PollingSource(ABC, Generic[FeatureFlags_T]):
+    """Base class of the immutable feature flags snapshots updated by polling.
+
+    Polling is done either by calling :meth:`poll`, in a background thread
+    started by :meth:`start` or in an asyncio task running :meth:`watch`.
+
+    New snapshot replaces the old one with a single attribute assignment,
+    so readers never need a lock and never wait for polling. Pass
+    :meth:`get` as ``source`` to :class:`fiicha.FeatureFlagsContext` to give
+    every scope a consistent snapshot.
+
+    Args:
+        cls: Feature flags class.
+        interval: Polling interval, in seconds.
+        default_key: Key with default value for unset flags.
+        subscriptions: Subscriptions to notify about changed feature flags
+            after the snapshot is replaced.
+    """
+
+    snapshot: FeatureFlags_T
+    thread_name = "fiicha-source"
+
+    def __init__(
+        self,
+        cls: Type[FeatureFlags_T],
+        interval: float = 1.0,
+        default_key: str = "",
+        subscriptions: Optional[Subscriptions] = None,
+    ) -> None:
+        self.cls = cls
+        self.interval = interval
+        self.default_key = default_key
+        self.subscriptions = subscriptions
+        self.snapshot = cls(immutable=True)
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def get(self) -> FeatureFlags_T:
+        """Get current feature flags snapshot."""
+
+        return self.snapshot
+
+    def make_snapshot(self, values: Mapping[str, bool]) -> FeatureFlags_T:
+        """Create new immutable snapshot from the feature flag states."""
+
+        return self.cls(values, default_key=self.default_key, immutable=True)
+
+    def replace(self, snapshot: FeatureFlags_T) -> None:
+        """Replace the current snapshot and notify subscriptions."""
+
+        previous = self.snapshot
+        self.snapshot = snapshot
+
+        if self.subscriptions is not None:
+            self.subscriptions.notify(previous, snapshot)
+
+    @abstractmethod
+    def poll(self) -> bool:
+        """Reload the snapshot if it has changed.
+
+        Returns:
+            Whether the snapshot was replaced.
+        """
+
+    def _poll_logged(self) -> None:
+        try:
+            self.poll()
+        except Exception:
+            logger.exception("Failed to reload feature flags from %s", self)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._poll_logged()
+
+    def start(self) -> None:
+        """Start polling in a background thread."""
+
+        if self._thread is not None:
+            raise RuntimeError("already started")
+
+        self._stopped.clear()
+        self._thread = Thread(target=self._run, name=self.thread_name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+
+        if self._thread is None:
+            return
+
+        self._stopped.set()
+        self._thread.join()
+        self._thread = None
+
+    async def watch(self) -> None:
+        """Poll within the running event loop until cancelled.
+
+        Polls are run in the default executor, so the event loop is never
+        blocked by I/O.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(self.interval)
+            await loop.run_in_executor(None, self._poll_logged)
+
+    def __enter__(self) -> "PollingSource[FeatureFlags_T]":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class FileSource(PollingSource[FeatureFlags_T]):
+    """Immutable feature flags snapshot reloaded when the file changes.
+
+    The file contains a feature flags string (see
+    :func:`fiicha.parse_feature_flags_string`), text after ``#`` up to the
+    end of the line is ignored. Changes are detected by polling file
+    metadata (inode, size and modification time), the file itself is read
+    only when it has changed. See :class:`PollingSource` for details.
+
+    Args:
+        path: Path to the file.
+        cls: Feature flags class.
+        interval: Polling interval of the background thread, in seconds.
+        default_key: Key with default value for unset flags.
+        sep: Feature flags separator.
+        neg: Negation prefix.
+        subscriptions: Subscriptions to notify about changed feature flags
+            after the snapshot is replaced.
+    """
+
+    thread_name = "fiicha-file-source"
+
+    def __init__(
+        self,
+        path: Union[str, "os.PathLike[str]"],
+        cls: Type[FeatureFlags_T],
+        interval: float = 1.0,
+        default_key: str = "",
+        sep: Optional[str] = None,
+        neg: str = "!",
+        subscriptions: Optional[Subscriptions] = None,
+    ) -> None:
+        super().__init__(cls, interval, default_key, subscriptions)
+        self.path = path
+        self.sep = sep
+        self.neg = neg
+        self.stat: Optional[Tuple[int, ...]] = None
+
+        self.poll()
+
+    def __str__(self) -> str:
+        return str(self.path)
+
+    def load(self) -> FeatureFlags_T:
+        """Read and parse the file into a new immutable snapshot."""
+
+        with open(self.path) as f:
+            text = _strip_comments(f.read())
+
+        return self.make_snapshot(parse_feature_flags_string(text, self.sep, self.neg))
+
+    def poll(self) -> bool:
+        """Reload the snapshot if the file has changed.
+
+        Missing file keeps the current snapshot.
+
+        Returns:
+            Whether the snapshot was replaced.
+        """
+
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+
+        stat = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+        if stat == self.stat:
+            return False
+
+        snapshot = self.load()
+        self.stat = stat
+        self.replace(snapshot)
+
+        return True
+
+
+class HTTPSource(PollingSource[FeatureFlags_T]):
+    """Immutable feature flags snapshot fetched from a remote flag service.
+
+    Every poll is a conditional ``GET`` request (``If-None-Match`` with the
+    last received ``ETag``), so unchanged states cost a ``304`` response.
+    JSON object responses map names to booleans or strings parsed by
+    :func:`fiicha.parser.parse_bool`, other values are logged and ignored.
+    Any other content is parsed as a feature flags string (see
+    :func:`fiicha.parse_feature_flags_string`).
+
+    The last good snapshot is served while revalidating and after failures.
+    Nothing is fetched on creation: call :meth:`poll` or start polling in
+    the background (see :class:`PollingSource`), which polls right away.
+
+    Args:
+        url: URL of the feature flags.
+        cls: Feature flags class.
+        interval: Polling interval, in seconds.
+        timeout: Request timeout, in seconds.
+        headers: Additional request headers (e.g. authorization).
+        default_key: Key with default value for unset flags.
+        subscriptions: Subscriptions to notify about changed feature flags
+            after the snapshot is replaced.
+
+    Attributes:
+        etag: ``ETag`` of the current snapshot.
+        latency: Duration of the last request, in seconds.
+        fetched_at: :func:`time.monotonic` time of the last successful
+            request (either changed or not), ``None`` if there was none.
+        errors: Number of failed requests.
+    """
+
+    thread_name = "fiicha-http-source"
+
+    def __init__(
+        self,
+        url: str,
+        cls: Type[FeatureFlags_T],
+        interval: float = 10.0,
+        timeout: float = 5.0,
+        headers: Optional[Mapping[str, str]] = None,
+        default_key: str = "",
+        subscriptions: Optional[Subscriptions] = None,
+    ) -> None:
+        super().__init__(cls, interval, default_key, subscriptions)
+        self.url = url
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self.etag: Optional[str] = None
+        self.latency: Optional[float] = None
+        self.fetched_at: Optional[float] = None
+        self.errors = 0
+
+    def __str__(self) -> str:
+        return self.url
+
+    @property
+    def staleness(self) -> Optional[float]:
+        """Seconds since the snapshot was last known to be up to date."""
+
+        if self.fetched_at is None:
+            return None
+
+        return monotonic() - self.fetched_at
+
+    def parse(self, body: bytes, content_type: str) -> FeatureFlags_T:
+        """Parse response body into a new immutable snapshot."""
+
+        if content_type.partition(";")[0].strip() == "application/json":
+            values = json.loads(body)
+
+            if not isinstance(values, dict):
+                raise ValueError("feature flags must be a JSON object")
+
+            flags: Dict[str, bool] = {}
+            invalid: List[str] = []
+
+            for key, value in values.items():
+                if isinstance(value, str):
+                    value = parse_bool(value)
+                elif not isinstance(value, bool):
+                    value = None
+
+                if value is None:
+                    invalid.append(key)
+                else:
+                    flags[key] = value
+
+            if invalid:
+                logger.warning(
+                    "Ignoring invalid feature flag values from %s: %s",
+                    self,
+                    ", ".join(invalid),
+                )
+
+            return self.make_snapshot(flags)
+
+        text = _strip_comments(body.decode())
+
+        return self.make_snapshot(parse_feature_flags_string(text))
+
+    def poll(self) -> bool:
+        """Fetch feature flags and replace the snapshot if they have changed.
+
+        Returns:
+            Whether the snapshot was replaced.
+        """
+
+        headers = dict(self.headers)
+
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+
+        request = Request(self.url, headers=headers)
+        start = monotonic()
+
+        try:
+            try:
+                with urlopen(request, timeout=self.timeout) as response:  # nosec
+                    body = response.read()
+                    etag = response.headers.get("ETag")
+                    content_type = response.headers.get("Content-Type", "")
+            except HTTPError as e:
+                if e.code != 304:
+                    raise
+
+                self.fetched_at = monotonic()
+                return False
+
+            snapshot = self.parse(body, content_type)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.latency = monotonic() - start
+
+        self.etag = etag
+        self.fetched_at = monotonic()
+        self.replace(snapshot)
+
+        return True
+
+    def _run(self) -> None:
+        self._poll_logged()
+        super()._run()
+
+    async def watch(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._poll_logged)
+        await super().watch()
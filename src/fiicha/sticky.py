@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import Any, Awaitable, Callable, Generic, Hashable, Optional, Tuple
+
+from .core import FeatureFlags_T
+
+
+class AssignmentCache(Generic[FeatureFlags_T]):
+    """Cache of feature flags resolved per subject (e.g. user or session).
+
+    Keeps subjects' assignments sticky and saves expensive resolution (e.g.
+    targeting against a user attribute store). Mutable feature flags are
+    cached as immutable copies, so they can be shared by concurrent requests
+    of the subject.
+
+    Entries are tagged with the generation of the cache. :meth:`invalidate`
+    starts a new generation in constant time: entries of older generations
+    are treated as missing and replaced on access or evicted as least
+    recently used. Subscribe it to changes of the global feature flags to
+    reassign subjects after them (see :class:`fiicha.changes.Subscriptions`).
+
+    The lock is never held while resolving, so the cache is safe to use from
+    threads and asyncio tasks alike.
+
+    Args:
+        maxsize: Maximum number of cached subjects, least recently used ones
+            are evicted first.
+        ttl: Time in seconds after which cached assignments expire.
+        clock: Function returning current time in seconds.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 10_000,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.generation = 0
+        # Key -> (generation, expiration time, feature flags).
+        self.cache: "OrderedDict[Hashable, Tuple[int, float, FeatureFlags_T]]" = (
+            OrderedDict()
+        )
+        self.lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def _now(self) -> float:
+        return self.clock() if self.ttl is not None else 0.0
+
+    def get(self, key: Hashable) -> Optional[FeatureFlags_T]:
+        """Get cached feature flags of the subject, ``None`` if missing."""
+
+        now = self._now()
+
+        with self.lock:
+            entry = self.cache.get(key)
+
+            if entry is None:
+                return None
+
+            generation, expires, feature_flags = entry
+
+            if generation != self.generation or (
+                self.ttl is not None and expires <= now
+            ):
+                del self.cache[key]
+                return None
+
+            self.cache.move_to_end(key)
+
+        return feature_flags
+
+    def set(
+        self,
+        key: Hashable,
+        feature_flags: FeatureFlags_T,
+        generation: Optional[int] = None,
+    ) -> FeatureFlags_T:
+        """Cache immutable feature flags of the subject.
+
+        Args:
+            key: Subject key.
+            feature_flags: Feature flags resolved for the subject.
+            generation: Generation the feature flags were resolved in, so
+                ones resolved before :meth:`invalidate` are never reused.
+                Defaults to the current one.
+
+        Returns:
+            Cached feature flags: ``feature_flags`` if immutable, otherwise
+            an immutable copy of them.
+        """
+
+        if not feature_flags._immutable:
+            feature_flags = feature_flags._copy(immutable=True)
+        expires = self._now() + self.ttl if self.ttl is not None else 0.0
+
+        with self.lock:
+            if generation is None:
+                generation = self.generation
+
+            self.cache[key] = (generation, expires, feature_flags)
+            self.cache.move_to_end(key)
+
+            if len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+
+        return feature_flags
+
+    def resolve(
+        self, key: Hashable, resolve: Callable[[Any], FeatureFlags_T]
+    ) -> FeatureFlags_T:
+        """Get cached feature flags of the subject, resolving them if missing.
+
+        Args:
+            key: Subject key.
+            resolve: Function resolving feature flags for the subject key.
+        """
+
+        feature_flags = self.get(key)
+
+        if feature_flags is None:
+            generation = self.generation
+            feature_flags = self.set(key, resolve(key), generation)
+
+        return feature_flags
+
+    async def resolve_async(
+        self, key: Hashable, resolve: Callable[[Any], Awaitable[FeatureFlags_T]]
+    ) -> FeatureFlags_T:
+        """Asynchronous version of :meth:`resolve`.
+
+        Args:
+            key: Subject key.
+            resolve: Coroutine function resolving feature flags for the
+                subject key.
+        """
+
+        feature_flags = self.get(key)
+
+        if feature_flags is None:
+            generation = self.generation
+            feature_flags = self.set(key, await resolve(key), generation)
+
+        return feature_flags
+
+    def discard(self, key: Hashable) -> None:
+        """Drop cached feature flags of the subject."""
+
+        with self.lock:
+            self.cache.pop(key, None)
+
+    def invalidate(self, *args: Any) -> None:
+        """Invalidate all cached feature flags without scanning the cache.
+
+        Accepts and ignores any arguments, so it can be used as a callback.
+        """
+
+        with self.lock:
+            self.generation += 1
+
+    def clear(self) -> None:
+        """Drop all cached feature flags."""
+
+        with self.lock:
+            self.cache.clear()
@@ -0,0 +1,259 @@
+import operator
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .core import FeatureFlags, FeatureFlagsMeta
+
+Attributes = Mapping[str, Any]
+Check = Callable[[Attributes], bool]
+
+MISSING = object()
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "!=": operator.ne,
+    "not in": lambda value, operand: value not in operand,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+INDEXED = ("==", "in")
+
+
+class Rule:
+    """Targeting rule setting the feature flag for the matching subjects.
+
+    Rule matches when all of its conditions hold. Condition is either a
+    value (equality), a set, list or tuple of values (membership) or a
+    mapping of operators to operands: ``==``, ``!=``, ``in``, ``not in``,
+    ``<``, ``<=``, ``>``, ``>=``. Conditions on attributes the subject does
+    not have never hold.
+
+    >>> Rule({"plan": ["pro", "enterprise"], "app_version": {">=": (2, 3)}})
+
+    Args:
+        conditions: Mapping of attribute names to conditions.
+        enabled: Feature flag state for the matching subjects.
+    """
+
+    __slots__ = ("conditions", "enabled")
+
+    def __init__(self, conditions: Attributes, enabled: bool = True) -> None:
+        self.conditions = dict(conditions)
+        self.enabled = enabled
+
+    def __repr__(self) -> str:
+        return f"Rule({self.conditions!r}, enabled={self.enabled!r})"
+
+
+def _split(condition: Any) -> Iterable[Tuple[str, Any]]:
+    """Convert condition to pairs of operators and operands."""
+
+    if isinstance(condition, Mapping):
+        return condition.items()
+    if isinstance(condition, (set, frozenset, list, tuple)):
+        return [("in", condition)]
+    return [("==", condition)]
+
+
+def _compile_check(name: str, op: str, operand: Any) -> Check:
+    try:
+        compare = COMPARISONS[op]
+    except KeyError:
+        raise ValueError(f"unknown operator: {op}") from None
+
+    if op == "not in":
+        operand = frozenset(operand)
+
+    def check(attributes: Attributes) -> bool:
+        value = attributes.get(name, MISSING)
+        return value is not MISSING and compare(value, operand)
+
+    return check
+
+
+def _compile_membership(name: str, values: FrozenSet[Any]) -> Check:
+    def check(attributes: Attributes) -> bool:
+        return attributes.get(name, MISSING) in values
+
+    return check
+
+
+def _parse(rule: Rule) -> Tuple[List[Tuple[str, FrozenSet[Any]]], List[Check]]:
+    """Split conditions of the rule into indexable ones and compiled checks.
+
+    Returns:
+        Pairs of attribute names and values of equality and membership
+        conditions (at most one per attribute), and checks of the rest.
+    """
+
+    indexable = []
+    checks = []
+
+    for name, condition in rule.conditions.items():
+        values = None
+
+        for op, operand in _split(condition):
+            if op in INDEXED:
+                operand = frozenset([operand] if op == "==" else operand)
+
+                if values is None:
+                    values = operand
+                else:
+                    checks.append(_compile_membership(name, operand))
+            else:
+                checks.append(_compile_check(name, op, operand))
+
+        if values is not None:
+            indexable.append((name, values))
+
+    return indexable, checks
+
+
+def _combine(checks: Sequence[Check]) -> Optional[Check]:
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+
+    def check(attributes: Attributes) -> bool:
+        return all(check(attributes) for check in checks)
+
+    return check
+
+
+class Targeting:
+    """Targeting rules compiled for evaluation against subject attributes.
+
+    Every rule is indexed (attribute -> value -> rules) by one of its
+    equality or membership conditions, on the attribute with the most
+    distinct values among all rules. Remaining conditions are compiled
+    into closures checked only for the rules found in the index. Evaluation
+    thus costs time close to the number of matching rules plus the number
+    of rules without equality or membership conditions.
+
+    Rules of the feature flag are evaluated in order, the first matching
+    one sets it. Attribute values must be hashable.
+
+    Args:
+        rules: Mapping of feature flag names to their rules, either
+            :class:`Rule` objects or mappings of conditions of the rules
+            enabling the feature flag.
+    """
+
+    def __init__(self, rules: Mapping[str, Iterable[Any]]) -> None:
+        # Rule id -> (feature flag, state, checks of non-indexed conditions).
+        self.rules: List[Tuple[str, bool, Optional[Check]]] = []
+        self.index: Dict[str, Dict[Any, List[int]]] = {}
+        self.unindexed: List[int] = []
+
+        parsed = []
+        distinct: Dict[str, Set[Any]] = {}
+
+        for flag, flag_rules in rules.items():
+            for rule in flag_rules:
+                if not isinstance(rule, Rule):
+                    rule = Rule(rule)
+
+                indexable, checks = _parse(rule)
+                parsed.append((flag, rule.enabled, indexable, checks))
+
+                for name, values in indexable:
+                    distinct.setdefault(name, set()).update(values)
+
+        for rule_id, (flag, enabled, indexable, checks) in enumerate(parsed):
+            if indexable:
+                anchor = max(
+                    indexable, key=lambda c: (len(distinct[c[0]]), -len(c[1]))
+                )
+
+                for name, values in indexable:
+                    if name == anchor[0]:
+                        postings = self.index.setdefault(name, {})
+
+                        for value in values:
+                            postings.setdefault(value, []).append(rule_id)
+                    else:
+                        checks.append(_compile_membership(name, values))
+            else:
+                self.unindexed.append(rule_id)
+
+            self.rules.append((flag, enabled, _combine(checks)))
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def evaluate(self, attributes: Attributes) -> Dict[str, bool]:
+        """Get states of the feature flags set by rules matching the subject.
+
+        Returns:
+            Mapping of feature flag names to their states. Feature flags
+            without matching rules are missing.
+        """
+
+        index = self.index
+        candidates = list(self.unindexed)
+
+        for name, value in attributes.items():
+            postings = index.get(name)
+
+            if postings is not None:
+                candidates.extend(postings.get(value, ()))
+
+        candidates.sort()
+        rules = self.rules
+        result: Dict[str, bool] = {}
+
+        for rule_id in candidates:
+            flag, enabled, check = rules[rule_id]
+
+            if flag not in result and (check is None or check(attributes)):
+                result[flag] = enabled
+
+        return result
+
+
+def targeting(cls: FeatureFlagsMeta) -> Targeting:
+    """Get targeting rules of the feature flags class, compiled once."""
+
+    result: Targeting = cls.__dict__.get("__targeting__")  # type: ignore
+
+    if result is None:
+        result = Targeting(
+            {name: flag.rules for name, flag in cls.__definitions__.items()}
+        )
+        setattr(cls, "__targeting__", result)
+
+    return result
+
+
+def apply_targeting(
+    feature_flags: FeatureFlags,
+    attributes: Attributes,
+    expose: Optional[Callable[[str, bool], Any]] = None,
+) -> None:
+    """Set feature flags by the rules matching the subject ``attributes``.
+
+    Args:
+        feature_flags: Feature flags to update.
+        attributes: Subject attributes.
+        expose: Function called with name and state of every feature flag
+            set by a rule (e.g. ``partial(exposures.log, user_id)``, see
+            :class:`fiicha.exposure.ExposureLogger`).
+    """
+
+    for name, value in targeting(feature_flags.__class__).evaluate(attributes).items():
+        feature_flags._set(name, value)
+
+        if expose is not None:
+            expose(name, value)
@@ -0,0 +1,142 @@
+from typing import Any, Dict, Optional, cast
+
+from .core import (
+    FeatureFlags,
+    FeatureFlags_T,
+    FeatureFlagsMeta,
+    object_new,
+    object_setattr,
+)
+
+
+class TrackingFeatureFlag:
+    """A descriptor reading feature flag state from the tracked object and
+    recording the read.
+
+    Args:
+        name: Feature flag name.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, cls: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+
+        value = getattr(obj._tracked, self.name)
+        obj._reads[self.name] = value
+        return value
+
+    def __set__(self, obj: Any, value: bool) -> None:
+        setattr(obj._tracked, self.name, value)
+
+
+def _tracking_dict(self: Any) -> Dict[str, bool]:
+    return self._tracked._dict()
+
+
+def _tracking_copy(self: Any, *args: Any, **kwargs: Any) -> Any:
+    return self._tracked._copy(*args, **kwargs)
+
+
+def _tracking_repr(self: Any) -> str:
+    return repr(self._tracked)
+
+
+def _tracking_or(self: Any, other: Any) -> Any:
+    return self._tracked | other
+
+
+def _tracking_ior(self: Any, other: Any) -> Any:
+    tracked = self._tracked
+    result = tracked.__ior__(other)
+    return self if result is tracked else result
+
+
+def _tracking_set(self: Any, name: str, value: bool) -> None:
+    self._tracked._set(name, value)
+
+
+def _tracking_freeze(self: Any) -> Any:
+    self._tracked._freeze()
+    object_setattr(self, "_immutable", True)
+    return self
+
+
+def _tracking_class(cls: FeatureFlagsMeta) -> FeatureFlagsMeta:
+    """Get class of the tracking views of this class, created once."""
+
+    tracking = cls.__dict__.get("__tracking__")
+
+    if tracking is None:
+        namespace: Dict[str, Any] = {
+            "__slots__": ("_tracked", "_reads"),
+            "__module__": cls.__module__,
+            "__qualname__": cls.__qualname__,
+            "__class__": property(lambda self: cls),
+            "_dict": _tracking_dict,
+            "_copy": _tracking_copy,
+            "__copy__": _tracking_copy,
+            "__repr__": _tracking_repr,
+            "__or__": _tracking_or,
+            "__ior__": _tracking_ior,
+            "_set": _tracking_set,
+            "__setattr__": _tracking_set,
+            "_freeze": _tracking_freeze,
+            **{name: TrackingFeatureFlag(name) for name in cls._flags()},
+        }
+
+        if cls.__packed__:
+            namespace["_bits"] = property(lambda self: self._tracked._bits)
+        if cls.__sparse__:
+            namespace["_default"] = property(lambda self: self._tracked._default)
+            namespace["_changed"] = property(lambda self: self._tracked._changed)
+
+        tracking = type.__new__(type(cls), cls.__name__, (cls,), namespace)
+        setattr(cls, "__tracking__", tracking)
+
+    return tracking
+
+
+def track(feature_flags: FeatureFlags_T) -> FeatureFlags_T:
+    """Get view of the feature flags recording which feature flags are read.
+
+    The view behaves as the original object: reads and writes of feature
+    flags go through to it. Reads made by methods processing all feature
+    flags at once (``_dict``, ``_copy``, ``repr``, merging) are not
+    recorded.
+    """
+
+    view: Any = object_new(cast(type, _tracking_class(feature_flags.__class__)))
+    object_setattr(view, "_tracked", feature_flags)
+    object_setattr(view, "_reads", {})
+    object_setattr(view, "_immutable", feature_flags._immutable)
+    return view
+
+
+def reads(feature_flags: FeatureFlags) -> Dict[str, bool]:
+    """Get feature flags read through the view made by :func:`track`."""
+
+    try:
+        return dict(feature_flags._reads)  # type: ignore
+    except AttributeError:
+        raise TypeError("feature flags are not tracked") from None
+
+
+def cache_key(feature_flags: FeatureFlags) -> str:
+    """Get cache key fragment from the feature flags read through the view.
+
+    Fragment lists read feature flags in the feature flags string format
+    (see :func:`fiicha.parse_feature_flags_string`), sorted by name.
+
+    >>> cache_key(ff)
+    'a !b'
+    """
+
+    return " ".join(
+        name if value else f"!{name}"
+        for name, value in sorted(reads(feature_flags).items())
+    )
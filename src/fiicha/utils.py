@@ -0,0 +1,130 @@
+from hashlib import blake2b
+from typing import Dict, Iterable, Optional, Type
+
+from .core import (
+    FeatureFlags,
+    FeatureFlags_T,
+    FeatureFlagsMeta,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+
+
+def get_cookie(header: str, name: str) -> Optional[str]:
+    """Get value of the cookie ``name`` from the ``Cookie`` header.
+
+    >>> get_cookie('a=1; flags="x !y"', "flags")
+    'x !y'
+    """
+
+    for pair in header.split(";"):
+        key, sep, value = pair.partition("=")
+
+        if sep and key.strip() == name:
+            value = value.strip()
+
+            if len(value) > 1 and value[0] == value[-1] == '"':
+                return value[1:-1]
+
+            return value
+
+    return None
+
+
+def names_fingerprint(names: Iterable[str]) -> int:
+    """Get 64-bit fingerprint of the feature flag names sequence."""
+
+    digest = blake2b("\0".join(names).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def flags_fingerprint(cls: FeatureFlagsMeta) -> int:
+    """Get 64-bit fingerprint of the feature flags class schema.
+
+    Fingerprint is derived from the names and the order of the feature flags,
+    i.e. classes with the same fingerprint share bit layout of
+    :func:`flags_to_int`. Computed once per class.
+    """
+
+    fingerprint: Optional[int] = cls.__dict__.get("__fingerprint__")
+
+    if fingerprint is None:
+        fingerprint = names_fingerprint(cls._flags())
+        setattr(cls, "__fingerprint__", fingerprint)
+
+    return fingerprint
+
+
+def flags_positions(cls: FeatureFlagsMeta) -> Dict[str, int]:
+    """Get bit positions of the feature flags (see :func:`flags_to_int`).
+
+    Computed once per class.
+    """
+
+    positions: Optional[Dict[str, int]] = cls.__dict__.get("__positions__")
+
+    if positions is None:
+        positions = {name: bit for bit, name in enumerate(cls._flags())}
+        setattr(cls, "__positions__", positions)
+
+    return positions
+
+
+def flags_to_int(feature_flags: FeatureFlags) -> int:
+    """Pack feature flag states into an integer, one bit per feature flag."""
+
+    if isinstance(feature_flags, PackedFeatureFlags):
+        return feature_flags._bits
+
+    if isinstance(feature_flags, SparseFeatureFlags):
+        cls = feature_flags.__class__
+        positions = flags_positions(cls)
+        bits = 0
+
+        for name in feature_flags._changed:
+            bits |= 1 << positions[name]
+
+        if feature_flags._default:
+            bits ^= (1 << len(positions)) - 1
+
+        return bits
+
+    bits = 0
+
+    for bit, name in enumerate(feature_flags.__class__._flags()):
+        if getattr(feature_flags, name):
+            bits |= 1 << bit
+
+    return bits
+
+
+def flags_from_int(
+    cls: Type[FeatureFlags_T], bits: int, immutable: bool = False
+) -> FeatureFlags_T:
+    """Create feature flags object from the integer made by :func:`flags_to_int`.
+
+    Args:
+        cls: Feature flags class.
+        bits: Packed feature flag states.
+        immutable: Immutable flag of the new object.
+    """
+
+    if issubclass(cls, PackedFeatureFlags):
+        return cls._from_bits(bits, immutable=immutable)
+
+    if issubclass(cls, SparseFeatureFlags):
+        names = cls.__all_feature_flags__
+        changed = []
+        bits &= (1 << len(names)) - 1
+
+        while bits:
+            low = bits & -bits
+            changed.append(names[low.bit_length() - 1])
+            bits ^= low
+
+        return cls._from_changes(False, frozenset(changed), immutable=immutable)
+
+    return cls(
+        {name: bool(bits >> bit & 1) for bit, name in enumerate(cls._flags())},
+        immutable=immutable,
+    )
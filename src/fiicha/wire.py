@@ -0,0 +1,123 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from functools import lru_cache
+from struct import Struct
+from typing import Dict, Iterable, Sequence, Tuple, Type
+
+from .core import FeatureFlags, FeatureFlags_T, FeatureFlagsMeta
+from .utils import flags_fingerprint, flags_from_int, flags_to_int, names_fingerprint
+
+WIRE_VERSION = 1
+# format version, schema fingerprint
+HEADER = Struct("<BQ")
+
+
+@lru_cache(maxsize=None)
+def _layout(cls: FeatureFlagsMeta) -> Tuple[bytes, int]:
+    """Get encoded header and bitmap size of the class."""
+
+    size = (len(tuple(cls._flags())) + 7) // 8
+    return HEADER.pack(WIRE_VERSION, flags_fingerprint(cls)), size
+
+
+@lru_cache(maxsize=128)
+def _schemas(schemas: Tuple[Tuple[str, ...], ...]) -> Dict[int, Tuple[str, ...]]:
+    """Map fingerprints of the feature flag names sequences to them."""
+
+    return {names_fingerprint(names): names for names in schemas}
+
+
+def pack(feature_flags: FeatureFlags) -> bytes:
+    """Encode feature flag states into bytes.
+
+    Layout (little-endian)::
+
+        version u8 | schema fingerprint u64 | bitmap
+
+    Bitmap has one bit per feature flag, see :func:`fiicha.utils.flags_to_int`.
+    """
+
+    header, size = _layout(feature_flags.__class__)
+    return header + flags_to_int(feature_flags).to_bytes(size, "little")
+
+
+def unpack(
+    cls: Type[FeatureFlags_T],
+    data: bytes,
+    immutable: bool = True,
+    schemas: Iterable[Sequence[str]] = (),
+) -> FeatureFlags_T:
+    """Decode feature flag states encoded by :func:`pack`.
+
+    Data encoded by a class with a different set of feature flags is
+    rejected, unless its flag names are listed in ``schemas``. In that case
+    feature flags are matched by name: flags unknown to ``cls`` are dropped,
+    missing ones are unset.
+
+    Args:
+        cls: Feature flags class.
+        data: Encoded feature flags.
+        immutable: Immutable flag of the new object.
+        schemas: Feature flag names (in the definition order) of other
+            versions of the class.
+
+    Raises:
+        ValueError: Data is malformed or the schema is unknown.
+    """
+
+    if len(data) < HEADER.size:
+        raise ValueError("truncated feature flags data")
+
+    version, fingerprint = HEADER.unpack_from(data)
+
+    if version != WIRE_VERSION:
+        raise ValueError(f"unsupported wire format version: {version}")
+
+    _, size = _layout(cls)
+    bits = int.from_bytes(data[HEADER.size :], "little")
+
+    if fingerprint == flags_fingerprint(cls):
+        if len(data) - HEADER.size != size:
+            raise ValueError("feature flags bitmap size mismatch")
+        if bits >> len(cls.__all_feature_flags__):
+            raise ValueError("feature flags bitmap padding is not zero")
+
+        return flags_from_int(cls, bits, immutable=immutable)
+
+    names = _schemas(tuple(map(tuple, schemas))).get(fingerprint)
+
+    if names is None:
+        raise ValueError("feature flags schema mismatch")
+
+    if len(data) - HEADER.size != (len(names) + 7) // 8:
+        raise ValueError("feature flags bitmap size mismatch")
+    if bits >> len(names):
+        raise ValueError("feature flags bitmap padding is not zero")
+
+    return cls(
+        {name: bool(bits >> bit & 1) for bit, name in enumerate(names)},
+        immutable=immutable,
+    )
+
+
+def encode(feature_flags: FeatureFlags) -> str:
+    """Encode feature flag states into URL-safe base64 string.
+
+    See :func:`pack` for the layout.
+    """
+
+    return urlsafe_b64encode(pack(feature_flags)).rstrip(b"=").decode("ascii")
+
+
+def decode(
+    cls: Type[FeatureFlags_T],
+    s: str,
+    immutable: bool = True,
+    schemas: Iterable[Sequence[str]] = (),
+) -> FeatureFlags_T:
+    """Decode feature flag states encoded by :func:`encode`.
+
+    See :func:`unpack` for arguments.
+    """
+
+    data = urlsafe_b64decode(s + "=" * (-len(s) % 4))
+    return unpack(cls, data, immutable=immutable, schemas=schemas)
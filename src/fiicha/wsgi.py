@@ -0,0 +1,129 @@
+from contextvars import Context, copy_context
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Mapping,
+    MutableMapping,
+    Optional,
+)
+
+from .context import FeatureFlagsContext
+from .parser import compile_feature_flags_string
+from .utils import get_cookie
+
+Environ = MutableMapping[str, Any]
+StartResponse = Callable[..., Any]
+WSGIApp = Callable[[Environ, StartResponse], Iterable[bytes]]
+
+
+class ContextIterable:
+    """Response iterable producing items within the given context.
+
+    Args:
+        iterable: Response of the wrapped WSGI application.
+        context: Context to run the ``iterable`` in.
+    """
+
+    __slots__ = ("iterable", "context")
+
+    def __init__(self, iterable: Iterable[bytes], context: Context) -> None:
+        self.iterable = iterable
+        self.context = context
+
+    def __iter__(self) -> Iterator[bytes]:
+        run = self.context.run
+        iterator = run(iter, self.iterable)
+
+        while True:
+            try:
+                yield run(next, iterator)
+            except StopIteration:
+                return
+
+    def close(self) -> None:
+        close = getattr(self.iterable, "close", None)
+
+        if close is not None:
+            self.context.run(close)
+
+
+class FeatureFlagsMiddleware:
+    """WSGI middleware entering feature flags context for every request.
+
+    Feature flags of the request are stored in the ``environ``. Overrides
+    are parsed with :func:`fiicha.compile_feature_flags_string` from the header
+    or, if header is missing, from the cookie. Requests without overrides
+    get a copy-on-write copy of the current feature flags.
+
+    Streamed responses are produced within the request context as well.
+
+    Args:
+        app: WSGI application to wrap.
+        context: Feature flags context to enter.
+        header: Name of the header with feature flag overrides.
+        cookie: Name of the cookie with feature flag overrides.
+        environ_key: Key of the ``environ`` to store feature flags under.
+        sep: Feature flags separator of the overrides string.
+        neg: Negation prefix of the overrides string.
+    """
+
+    __slots__ = ("app", "context", "header", "cookie", "environ_key", "sep", "neg")
+
+    def __init__(
+        self,
+        app: WSGIApp,
+        context: FeatureFlagsContext[Any],
+        header: Optional[str] = "X-Feature-Flags",
+        cookie: Optional[str] = None,
+        environ_key: str = "fiicha.feature_flags",
+        sep: Optional[str] = None,
+        neg: str = "!",
+    ) -> None:
+        self.app = app
+        self.context = context
+        self.header = f"HTTP_{header.upper().replace('-', '_')}" if header else None
+        self.cookie = cookie
+        self.environ_key = environ_key
+        self.sep = sep
+        self.neg = neg
+
+    def get_overrides(self, environ: Environ) -> Optional[Mapping[str, bool]]:
+        """Get feature flag overrides of the request, if any."""
+
+        value: Optional[str] = None
+
+        if self.header:
+            value = environ.get(self.header)
+
+        if not value and self.cookie:
+            cookies = environ.get("HTTP_COOKIE")
+
+            if cookies:
+                value = get_cookie(cookies, self.cookie)
+
+        if not value:
+            return None
+
+        cls = self.context.get_current().__class__
+
+        return compile_feature_flags_string(cls, value, self.sep, self.neg)
+
+    def __call__(
+        self, environ: Environ, start_response: StartResponse
+    ) -> Iterable[bytes]:
+        context = self.context
+
+        environ[self.environ_key] = context.push(self.get_overrides(environ))
+
+        try:
+            response = self.app(environ, start_response)
+            request_context = copy_context()
+        finally:
+            context.pop()
+
+        if isinstance(response, (list, tuple)):
+            return response
+
+        return ContextIterable(response, request_context)
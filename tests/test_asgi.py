@@ -0,0 +1,77 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, List, Optional, Tuple
+
+from pytest import fixture, mark
+
+from fiicha.asgi import FeatureFlagsMiddleware, Message, Receive, Scope, Send
+from fiicha.context import FeatureFlagsContext
+from fiicha.core import FeatureFlag, FeatureFlags
+
+
+class MyFeatureFlags(FeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+@fixture
+def ff_ctx() -> FeatureFlagsContext[MyFeatureFlags]:
+    root = MyFeatureFlags({"tset": True}, immutable=True)
+    var: ContextVar[MyFeatureFlags] = ContextVar("test", default=root)
+    return FeatureFlagsContext(var)
+
+
+def call(
+    app: Any, scope_type: str = "http", headers: Optional[List[Any]] = None
+) -> Tuple[Scope, List[Any]]:
+    seen: List[Any] = []
+    scope: Scope = {"type": scope_type, "headers": headers or []}
+
+    async def receive() -> Message:
+        return {"type": "http.request"}
+
+    async def send(message: Message) -> None:
+        pass
+
+    async def inner(scope: Scope, receive: Receive, send: Send) -> None:
+        seen.append(scope.get("feature_flags"))
+
+    asyncio.run(app(inner)(scope, receive, send))
+
+    return scope, seen
+
+
+def test_no_overrides(ff_ctx: FeatureFlagsContext[MyFeatureFlags]) -> None:
+    scope, seen = call(lambda app: FeatureFlagsMiddleware(app, ff_ctx))
+
+    assert seen == [scope["feature_flags"]]
+    assert seen[0]._dict() == {"test": False, "tset": True}
+    assert seen[0]._source is ff_ctx.current
+
+
+@mark.parametrize(
+    "headers",
+    [
+        [(b"x-feature-flags", b"test !tset xxx")],
+        [(b"cookie", b'a=b; ff="test !tset"')],
+        [(b"x-feature-flags", b"test !tset"), (b"cookie", b"ff=!test")],
+        [(b"cookie", b'ff="test !tset"'), (b"cookie", b"a=b")],
+    ],
+    ids=["header", "cookie", "header-first", "split-cookie"],
+)
+def test_overrides(
+    ff_ctx: FeatureFlagsContext[MyFeatureFlags], headers: List[Any]
+) -> None:
+    _, seen = call(
+        lambda app: FeatureFlagsMiddleware(app, ff_ctx, cookie="ff"), headers=headers
+    )
+
+    assert seen[0]._dict() == {"test": True, "tset": False}
+    assert seen[0]._immutable
+
+
+def test_lifespan(ff_ctx: FeatureFlagsContext[MyFeatureFlags]) -> None:
+    scope, seen = call(lambda app: FeatureFlagsMiddleware(app, ff_ctx), "lifespan")
+
+    assert seen == [None]
+    assert "feature_flags" not in scope
@@ -0,0 +1,76 @@
+from typing import Dict, List, Type
+
+from pytest import mark, raises
+
+from fiicha.changes import Subscriptions, diff
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+
+
+class SlottedFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class BitsFeatureFlags(PackedFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class SparseBitsFeatureFlags(SparseFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+@mark.parametrize(
+    "cls", [SlottedFeatureFlags, BitsFeatureFlags, SparseBitsFeatureFlags]
+)
+def test_diff(cls: Type[FeatureFlags]) -> None:
+    old = cls({"a": True, "c": True}, immutable=True)
+
+    assert diff(old, old._copy()) == {}
+    assert diff(old, old._overlay()) == {}
+    assert diff(old, cls({"b": True, "c": True})) == {"a": False, "b": True}
+
+
+def test_diff_different_classes() -> None:
+    with raises(TypeError, match="different classes"):
+        diff(SlottedFeatureFlags(), BitsFeatureFlags())
+
+
+def test_subscriptions() -> None:
+    subscriptions = Subscriptions(BitsFeatureFlags)
+    a_changes: List[Dict[str, bool]] = []
+    all_changes: List[Dict[str, bool]] = []
+
+    def fail(changes: Dict[str, bool]) -> None:
+        raise RuntimeError("callback failed")
+
+    subscriptions.subscribe(fail, "b")
+    unsubscribe = subscriptions.subscribe(a_changes.append, "a", "c")
+    subscriptions.subscribe(all_changes.append)
+
+    old = BitsFeatureFlags()
+    new = BitsFeatureFlags({"a": True, "b": True})
+
+    assert subscriptions.notify(old, new) == {"a": True, "b": True}
+    assert subscriptions.notify(new, BitsFeatureFlags({"a": True})) == {"b": False}
+    assert subscriptions.notify(old, old) == {}
+    assert a_changes == [{"a": True}]
+    assert all_changes == [{"a": True, "b": True}, {"b": False}]
+
+    unsubscribe()
+    subscriptions.notify(new, old)
+
+    assert a_changes == [{"a": True}]
+    assert len(all_changes) == 3
+
+    with raises(ValueError, match="unknown feature flag: x"):
+        subscriptions.subscribe(fail, "x")
@@ -1,4 +1,13 @@
+import asyncio
+import gc
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from contextvars import ContextVar
+from functools import partial
+from multiprocessing import get_context
+from typing import Callable, Dict, List, Tuple
+
+from pytest import mark, raises
 
 from fiicha.context import FeatureFlagsContext
 from fiicha.core import FeatureFlag, FeatureFlags
@@ -42,3 +51,168 @@ def test_ctx() -> None:
 
     assert root is ff_ctx.current
     assert root._dict() == {"test": False, "tset": False}
+
+
+def test_ctx_copy_on_write() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    root = TestFeatureFlags(immutable=True)
+    var: ContextVar[TestFeatureFlags] = ContextVar("test", default=root)
+    ff_ctx = FeatureFlagsContext(var)
+
+    with ff_ctx as ff:
+        assert ff is not root
+        assert ff._source is root
+        assert ff._immutable
+
+        with raises(RuntimeError, match="this instance is immutable"):
+            ff.test = True
+
+
+def test_ctx_not_entered() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    var: ContextVar[TestFeatureFlags] = ContextVar("test")
+    ff_ctx = FeatureFlagsContext(var)
+
+    with raises(RuntimeError, match="context is not entered"):
+        ff_ctx.__exit__(None, None, None)
+
+
+def test_ctx_decorator() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    root = TestFeatureFlags(immutable=True)
+    var: ContextVar[TestFeatureFlags] = ContextVar("test", default=root)
+    ff_ctx = FeatureFlagsContext(var, immutable=False)
+
+    @ff_ctx
+    def sync() -> bool:
+        var.get().test = True
+        return var.get().test
+
+    @ff_ctx
+    async def async_() -> bool:
+        var.get().test = True
+        return var.get().test
+
+    assert sync()
+    assert asyncio.run(async_())
+    assert not ff_ctx.current.test
+
+
+def test_ctx_async_stress() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    root = TestFeatureFlags(immutable=True)
+    var: ContextVar[TestFeatureFlags] = ContextVar("test", default=root)
+    ff_ctx = FeatureFlagsContext(var, immutable=False)
+
+    async def task(i: int) -> bool:
+        async with ff_ctx as outer:
+            outer.test = i % 2 == 0
+            await asyncio.sleep(0)
+
+            with ff_ctx as inner:
+                inner.tset = i % 3 == 0
+                await asyncio.sleep(0)
+
+                assert ff_ctx.current is inner
+                assert inner.test == (i % 2 == 0)
+
+            await asyncio.sleep(0)
+
+            assert ff_ctx.current is outer
+            assert outer.tset is False
+
+        return ff_ctx.current is root
+
+    async def main() -> List[bool]:
+        return await asyncio.gather(*(task(i) for i in range(10_000)))
+
+    assert all(asyncio.run(main()))
+    assert ff_ctx.current is root
+
+
+def test_ctx_push_overrides() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    root = TestFeatureFlags(immutable=True)
+    var: ContextVar[TestFeatureFlags] = ContextVar("test", default=root)
+    ff_ctx = FeatureFlagsContext(var)
+
+    ff = ff_ctx.push({"test": True})
+
+    assert ff is ff_ctx.current
+    assert ff.test
+    assert ff._immutable
+
+    ff_ctx.pop()
+
+    assert ff_ctx.current is root
+
+
+class PickledFeatureFlags(FeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+
+
+pickled_ctx = FeatureFlagsContext(
+    ContextVar("pickled_ff", default=PickledFeatureFlags(immutable=True)),
+    immutable=False,
+    name=f"{__name__}.pickled_ctx",
+)
+
+
+def get_pickled_flags(x: int) -> Tuple[int, Dict[str, bool]]:
+    return x, pickled_ctx.current._dict()
+
+
+@mark.parametrize(
+    "executor",
+    [
+        ThreadPoolExecutor,
+        partial(ProcessPoolExecutor, mp_context=get_context("fork")),
+    ],
+)
+def test_wrap(executor: Callable[..., Executor]) -> None:
+    with executor(max_workers=1) as pool:
+        with pickled_ctx as ff:
+            ff.test = True
+            future = pool.submit(pickled_ctx.wrap(get_pickled_flags), 1)
+
+        assert future.result() == (1, {"test": True})
+        assert list(pool.map(pickled_ctx.wrap(get_pickled_flags), [2])) == [
+            (2, {"test": False})
+        ]
+
+
+def test_pickle_context() -> None:
+    assert pickle.loads(pickle.dumps(pickled_ctx)) is pickled_ctx
+
+    # Same variable name, different context.
+    other_ctx = FeatureFlagsContext(ContextVar("pickled_ff"), name="other")
+
+    assert pickle.loads(pickle.dumps(other_ctx)) is other_ctx
+
+    with raises(ValueError, match="already exists: other"):
+        FeatureFlagsContext(ContextVar("other"), name="other")
+
+    with raises(TypeError, match="without name"):
+        pickle.dumps(FeatureFlagsContext(ContextVar("pickled_ff")))
+
+
+def test_pickle_unknown_context() -> None:
+    ff_ctx = FeatureFlagsContext(ContextVar("unknown"), name="missing.unknown")
+    data = pickle.dumps(ff_ctx)
+
+    del ff_ctx
+    gc.collect()
+
+    with raises(LookupError, match="no feature flags context named"):
+        pickle.loads(data)
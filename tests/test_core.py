@@ -1,9 +1,16 @@
+import pickle
 from copy import copy
-from typing import Mapping, Tuple, get_type_hints
+from typing import Any, Dict, Mapping, Tuple, get_type_hints
 
-from pytest import mark, raises
+from pytest import MonkeyPatch, mark, raises
 
-from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha import core
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
 
 
 def make_fake_doc(m: Mapping[str, FeatureFlag]) -> str:
@@ -201,3 +208,479 @@ def test_merge_in_place(immutable: bool) -> None:
 
     assert ff_a.test
     assert ff_a.tset
+
+
+def test_packed() -> None:
+    class TestFeatureFlags(PackedFeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    ff = TestFeatureFlags({"test": True, "xxx": True})
+
+    assert TestFeatureFlags.__slots__ == ()
+    assert TestFeatureFlags.__flag_positions__ == {"test": 0, "tset": 1}
+    assert ff._bits == 1
+    assert ff.test
+    assert not ff.tset
+    assert repr(ff) == "TestFeatureFlags(test=True, tset=False)"
+
+    ff.tset = True
+    ff.test = False
+
+    assert ff._bits == 2
+    assert ff._dict() == {"test": False, "tset": True}
+    assert TestFeatureFlags({"all": True}, default_key="all")._bits == 3
+
+
+def test_packed_subclassing() -> None:
+    class Test1FeatureFlags(PackedFeatureFlags):
+        __slots__ = ("x",)
+        test = FeatureFlag("Enable test feature.")
+        x: int
+
+    class Test2FeatureFlags(Test1FeatureFlags):
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    ff = Test2FeatureFlags({"tset": True})
+    ff.x = 1
+
+    assert Test2FeatureFlags.__packed__
+    assert Test2FeatureFlags.__flag_positions__ == {"test": 0, "tset": 1}
+    assert ff._dict() == {"test": False, "tset": True}
+    assert ff.x == 1
+
+    with raises(TypeError, match="cannot disable packed storage"):
+
+        class Test3FeatureFlags(Test1FeatureFlags, packed=False):
+            pass
+
+
+def test_packed_copy_merge() -> None:
+    class TestFeatureFlags(PackedFeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    ff_a = TestFeatureFlags({"test": True}, immutable=True)
+    ff_b = TestFeatureFlags({"tset": True})
+    ff_c = copy(ff_a)
+
+    assert ff_c is not ff_a
+    assert ff_c == ff_a
+    assert ff_c._immutable
+    assert ff_a._copy({"test": False, "tset": True}) == ff_b
+    assert (ff_a | ff_b)._bits == 3
+    assert (ff_a | ff_b)._immutable
+
+    ff_a |= ff_b
+
+    assert ff_a._bits == 3
+    assert ff_a is not ff_c
+
+    ff_b |= ff_c
+
+    assert ff_b._bits == 3
+    assert not ff_b._immutable
+
+
+def test_packed_eq_hash() -> None:
+    class TestFeatureFlags(PackedFeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    ff_a = TestFeatureFlags({"test": True}, immutable=True)
+    ff_b = TestFeatureFlags({"test": True}, immutable=True)
+
+    assert ff_a == ff_b
+    assert ff_a != TestFeatureFlags(immutable=True)
+    assert ff_a != 1
+    assert hash(ff_a) == hash(ff_b)
+
+    with raises(TypeError, match="unhashable"):
+        hash(TestFeatureFlags())
+
+
+def test_packed_immutable() -> None:
+    class TestFeatureFlags(PackedFeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    ff = TestFeatureFlags(immutable=True)
+
+    with raises(RuntimeError, match="this instance is immutable"):
+        ff.test = True
+
+
+def test_generated_methods() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        tset = FeatureFlag("Erutaef tset elbane.")
+        test = FeatureFlag("Enable test feature.")
+
+    ff = TestFeatureFlags({"test": True}, immutable=True)
+
+    assert TestFeatureFlags._flags() == ("tset", "test")
+    assert TestFeatureFlags.__copy__ is TestFeatureFlags._copy
+    assert TestFeatureFlags._copy.__qualname__.endswith("TestFeatureFlags._copy")
+    assert TestFeatureFlags.__init__.__doc__ == FeatureFlags.__init__.__doc__
+    assert ff._dict() == {"test": True, "tset": False}
+    assert repr(ff) == "TestFeatureFlags(test=True, tset=False)"
+    assert ff._copy()._immutable
+    assert ff._copy({"tset": True})._dict() == {"test": True, "tset": True}
+
+
+def test_generated_methods_subclass() -> None:
+    class Test1FeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    class Test2FeatureFlags(Test1FeatureFlags):
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    ff = Test2FeatureFlags(default=True)
+
+    assert Test2FeatureFlags._flags() == ("test", "tset")
+    assert Test2FeatureFlags._copy is not Test1FeatureFlags._copy
+    assert copy(ff)._dict() == {"test": True, "tset": True}
+    assert repr(ff) == "Test2FeatureFlags(test=True, tset=True)"
+
+
+def test_generated_methods_user_defined() -> None:
+    class Test1FeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+        def __init__(self, test: bool = False) -> None:
+            super().__init__({"test": test})
+
+        def __repr__(self) -> str:
+            return "custom"
+
+    class Test2FeatureFlags(Test1FeatureFlags):
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    ff = Test2FeatureFlags(True)
+
+    assert Test2FeatureFlags.__init__ is Test1FeatureFlags.__init__
+    assert Test2FeatureFlags._copy is FeatureFlags._copy
+    assert repr(ff) == "custom"
+    assert ff._dict() == {"test": True, "tset": False}
+
+
+def test_generic_methods(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(core, "MAX_GENERATED_FLAGS", 2)
+
+    class Test1FeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    class Test2FeatureFlags(Test1FeatureFlags):
+        tets = FeatureFlag("Enable tets feature.")
+
+    class Test3FeatureFlags(FeatureFlags, generate=False):
+        test = FeatureFlag("Enable test feature.")
+
+    ff = Test2FeatureFlags({"tets": True})
+
+    assert getattr(Test1FeatureFlags._copy, "__generated__", False)
+
+    for name in core.GENERATED_METHODS:
+        assert getattr(Test2FeatureFlags, name) is FeatureFlags.__dict__[name]
+        assert getattr(Test3FeatureFlags, name) is FeatureFlags.__dict__[name]
+
+    assert copy(ff)._dict() == {"test": False, "tset": False, "tets": True}
+    assert repr(ff) == "Test2FeatureFlags(test=False, tets=True, tset=False)"
+    assert Test3FeatureFlags({"test": True}).test
+
+
+def test_generated_methods_subclass_init() -> None:
+    class Test1FeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    class Test2FeatureFlags(Test1FeatureFlags):
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, **kwargs)
+
+    ff = Test2FeatureFlags({"test": True, "tset": True})
+
+    assert ff.test
+    assert ff.tset
+    assert Test2FeatureFlags._copy is FeatureFlags.__dict__["_copy"]
+    assert Test2FeatureFlags.__copy__ is FeatureFlags.__dict__["__copy__"]
+    assert ff._copy()._dict() == {"test": True, "tset": True}
+    assert copy(ff)._dict() == {"test": True, "tset": True}
+
+
+def test_overlay() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    root = TestFeatureFlags({"test": True}, immutable=True)
+    ff = root._overlay(immutable=False)
+
+    assert ff is not root
+    assert ff._source is root
+    assert ff.__class__ is TestFeatureFlags
+    assert isinstance(ff, TestFeatureFlags)
+    assert type(ff) is TestFeatureFlags._overlay_class()
+    assert not ff._immutable
+    assert ff.test
+    assert ff._dict() == {"test": True, "tset": False}
+    assert repr(ff) == "TestFeatureFlags(test=True, tset=False)"
+    assert type(copy(ff)) is TestFeatureFlags
+
+    ff.tset = True
+
+    assert ff._source is None
+    assert ff._dict() == {"test": True, "tset": True}
+    assert root._dict() == {"test": True, "tset": False}
+    assert copy(ff)._dict() == {"test": True, "tset": True}
+
+    ff._freeze()
+
+    with raises(RuntimeError, match="this instance is immutable"):
+        ff.test = False
+
+
+def test_overlay_immutable() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    root = TestFeatureFlags(immutable=True)
+    ff_a = root._overlay()
+    ff_b = ff_a._overlay()
+
+    assert ff_a._immutable
+    assert ff_b._source is root
+
+    with raises(RuntimeError, match="this instance is immutable"):
+        ff_a.test = True
+
+
+def test_overlay_merge_in_place() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    root = TestFeatureFlags({"test": True}, immutable=True)
+    ff = root._overlay(immutable=False)
+    ff |= TestFeatureFlags({"tset": True})
+
+    assert ff._source is None
+    assert ff._dict() == {"test": True, "tset": True}
+    assert root._dict() == {"test": True, "tset": False}
+
+
+def test_overlay_mutable_source() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    root = TestFeatureFlags()
+    ff = root._overlay()
+
+    assert type(ff) is TestFeatureFlags
+    assert not ff._immutable
+
+    root.test = True
+
+    assert not ff.test
+
+
+def test_packed_overlay() -> None:
+    class TestFeatureFlags(PackedFeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    root = TestFeatureFlags({"test": True}, immutable=True)
+    ff = root._overlay(immutable=False)
+
+    assert type(ff) is TestFeatureFlags
+    assert ff == root
+    assert not ff._immutable
+
+
+@mark.parametrize("base", [FeatureFlags, PackedFeatureFlags, SparseFeatureFlags])
+def test_interned(base: type) -> None:
+    class TestFeatureFlags(base, interned=2):  # type: ignore
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    class SubFeatureFlags(TestFeatureFlags):
+        pass
+
+    cache = TestFeatureFlags.__interned__
+
+    assert cache is not None and cache.maxsize == 2
+    assert SubFeatureFlags.__interned__ is not cache
+    assert SubFeatureFlags.__interned__.maxsize == 2  # type: ignore
+
+    ff = TestFeatureFlags({"test": True}, immutable=True)._freeze()
+
+    assert TestFeatureFlags({"test": True})._freeze() is ff
+    assert TestFeatureFlags({"test": True})._copy(immutable=True) is ff
+    assert ff._copy() is ff
+    assert copy(ff) is ff
+    assert TestFeatureFlags(immutable=True)._copy({"test": True}) is ff
+    assert ff._overlay()._copy() is ff
+    assert ff._copy(immutable=False) is not ff
+    assert ff | TestFeatureFlags() is ff
+    assert TestFeatureFlags({"test": True}, immutable=True) is not ff
+
+    ff2 = ff._copy({"tset": True})
+
+    assert ff2 is not ff and ff2._dict() == {"test": True, "tset": True}
+    assert TestFeatureFlags(immutable=True)._freeze()._dict() == {
+        "test": False,
+        "tset": False,
+    }
+    assert len(cache) == 2
+    assert ff._copy() is not ff  # evicted
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_not_interned() -> None:
+    class TestFeatureFlags(PackedFeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+
+    ff = TestFeatureFlags(immutable=True)
+
+    assert TestFeatureFlags.__interned__ is None
+    assert ff._freeze() is ff
+    assert ff._copy() is not ff
+
+
+class PickledFeatureFlags(FeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+class PickledPackedFeatureFlags(PackedFeatureFlags, interned=8):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+class PickledSparseFeatureFlags(SparseFeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+@mark.parametrize(
+    "cls",
+    [PickledFeatureFlags, PickledPackedFeatureFlags, PickledSparseFeatureFlags],
+)
+@mark.parametrize("immutable", [False, True])
+def test_pickle(cls: type, immutable: bool) -> None:
+    ff = cls({"tset": True}, immutable=immutable)
+    data = pickle.dumps(ff)
+
+    # Sparse classes pickle names of the changed feature flags only.
+    assert (b"tset" in data) is (cls is PickledSparseFeatureFlags)
+
+    new_ff = pickle.loads(data)
+
+    assert type(new_ff) is cls
+    assert new_ff._dict() == {"test": False, "tset": True}
+    assert new_ff._immutable is immutable
+    assert pickle.loads(pickle.dumps(ff._overlay()))._dict() == ff._dict()
+
+
+def test_pickle_interned() -> None:
+    ff = PickledPackedFeatureFlags({"test": True}, immutable=True)._freeze()
+
+    assert pickle.loads(pickle.dumps(ff)) is ff
+
+
+@mark.parametrize("cls", [PickledFeatureFlags, PickledPackedFeatureFlags])
+def test_pickle_schema_changed(cls: type, monkeypatch: MonkeyPatch) -> None:
+    data = pickle.dumps(cls({"tset": True}))
+
+    class NewFeatureFlags(cls.__mro__[1]):  # type: ignore
+        kill = FeatureFlag("Disable everything.")
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    NewFeatureFlags.__qualname__ = cls.__qualname__
+    monkeypatch.setattr(f"{__name__}.{cls.__name__}", NewFeatureFlags)
+
+    with raises(ValueError, match="feature flags schema mismatch"):
+        pickle.loads(data)
+
+
+class ManyFeatureFlags(SparseFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+    d = FeatureFlag()
+
+
+class SubFeatureFlags(ManyFeatureFlags):
+    pass
+
+
+def test_sparse() -> None:
+    ff = ManyFeatureFlags({"a": True, "x": True})
+
+    assert ManyFeatureFlags.__slots__ == ()
+    assert ff._changed == {"a"} and not ff._default
+    assert ff._dict() == {"a": True, "b": False, "c": False, "d": False}
+    assert repr(ff) == "ManyFeatureFlags({'a': True}, default=False)"
+
+    ff.b = True
+    ff.c = True
+
+    assert ff._changed == {"d"} and ff._default
+    assert ff._dict() == {"a": True, "b": True, "c": True, "d": False}
+
+    ff.a = False
+
+    assert ff._changed == {"b", "c"} and not ff._default
+
+    other = ManyFeatureFlags({"all": True, "a": False}, default_key="all")
+
+    assert other._changed == {"a"} and other._default
+    assert ManyFeatureFlags(default=True)._changed == set()
+
+    with raises(TypeError, match="cannot combine packed and sparse storage"):
+
+        class PackedSparseFeatureFlags(PackedFeatureFlags, sparse=True):
+            pass
+
+    with raises(TypeError, match="cannot disable sparse storage"):
+
+        class DenseFeatureFlags(ManyFeatureFlags, sparse=False):
+            pass
+
+
+@mark.parametrize(
+    "a, b",
+    [
+        ({}, {}),
+        ({"a": True}, {"b": True}),
+        ({"all": True, "a": False}, {"c": True}),
+        ({"a": True}, {"all": True, "b": False, "c": False}),
+        ({"all": True, "a": False}, {"all": True, "a": False, "b": False}),
+    ],
+)
+def test_sparse_copy_merge(a: Dict[str, bool], b: Dict[str, bool]) -> None:
+    ff_a = ManyFeatureFlags(a, default_key="all", immutable=True)
+    ff_b = ManyFeatureFlags(b, default_key="all")
+    expected = {k: v or ff_b._dict()[k] for k, v in ff_a._dict().items()}
+
+    assert (ff_a | ff_b)._dict() == expected
+    assert (ff_a | ff_b)._immutable
+    assert (ff_a | ff_b) == ManyFeatureFlags(expected)
+    assert hash(ff_a | ff_b) == hash(ManyFeatureFlags(expected, immutable=True))
+    assert ff_a._copy(ff_b._dict())._dict() == ff_b._dict()
+    assert ff_a._copy(ff_b._dict()) == ff_b
+    assert ff_a._overlay(immutable=False) == ff_a
+
+    ff_b |= ff_a
+
+    assert ff_b._dict() == expected
+
+    ff_c = ManyFeatureFlags(b, default_key="all")
+    ff_c |= SubFeatureFlags(a, default_key="all")
+
+    assert ff_c._dict() == expected
+
+    with raises(TypeError, match="unhashable"):
+        hash(ff_b)
@@ -0,0 +1,63 @@
+from contextvars import ContextVar
+
+from fiicha.context import FeatureFlagsContext
+from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha.dispatch import Dispatch
+
+
+class MyFeatureFlags(FeatureFlags):
+    test = FeatureFlag()
+
+
+def new(x: int) -> str:
+    return f"new {x}"
+
+
+def old(x: int) -> str:
+    return f"old {x}"
+
+
+def test_dispatch() -> None:
+    root = MyFeatureFlags(immutable=True)
+    var = ContextVar("ff", default=root)
+    ff_ctx = FeatureFlagsContext(var)
+    dispatch = Dispatch(ff_ctx, "test", new, old)
+
+    assert dispatch(1) == "old 1"
+    assert dispatch._cache == (root, old)
+
+    with ff_ctx as ff:
+        assert ff is not root
+        assert dispatch(2) == "old 2"
+        assert dispatch._cache == (root, old)
+
+        # Overlay of another request shares the cache entry.
+        with ff_ctx:
+            dispatch.enabled = dispatch.disabled = new
+
+            assert dispatch(3) == "old 3"
+
+        dispatch.enabled = new
+        dispatch.disabled = old
+
+    token = var.set(MyFeatureFlags({"test": True}, immutable=True))
+
+    assert dispatch(4) == "new 4"
+
+    var.reset(token)
+
+    assert dispatch.resolve() is old
+
+
+def test_dispatch_mutable() -> None:
+    var = ContextVar("ff", default=MyFeatureFlags(immutable=True))
+    ff_ctx = FeatureFlagsContext(var, immutable=False)
+    dispatch = Dispatch(ff_ctx, "test", new, old)
+
+    with ff_ctx as ff:
+        assert dispatch(1) == "old 1"
+
+        ff.test = True
+
+        assert dispatch(2) == "new 2"
+        assert dispatch._cache[1] is None
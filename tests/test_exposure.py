@@ -0,0 +1,124 @@
+import json
+from functools import partial
+from pathlib import Path
+from typing import List, Sequence
+
+from pytest import LogCaptureFixture, raises
+
+from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha.exposure import Exposure, ExposureLogger, JSONLinesSink
+from fiicha.rollout import apply_rollouts
+from fiicha.targeting import apply_targeting
+from fiicha.tracking import track
+
+
+class MyFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+
+
+def test_exposure_logger(tmp_path: Path) -> None:
+    now = [0.0]
+    path = tmp_path / "exposures.jsonl"
+    exposures = ExposureLogger(
+        JSONLinesSink(path), window=10, batch_size=2, clock=lambda: now[0]
+    )
+    ff = MyFeatureFlags({"a": True})
+
+    assert exposures.get(ff, "a", "alice")
+    assert not exposures.get(ff, "b", "alice")
+    assert exposures.get(ff, "a", "alice")  # duplicate
+    assert exposures.log("bob", "a", True)
+    assert len(exposures) == 3
+
+    now[0] = 10
+
+    assert exposures.log("alice", "a", True)
+    assert exposures.flush() == 4
+    assert exposures.flush() == 0
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+
+    assert [(e["subject"], e["flag"], e["value"]) for e in lines] == [
+        ("alice", "a", True),
+        ("alice", "b", False),
+        ("bob", "a", True),
+        ("alice", "a", True),
+    ]
+    assert all(isinstance(e["timestamp"], float) for e in lines)
+
+    with raises(ValueError, match="unknown policy: block"):
+        ExposureLogger(JSONLinesSink(path), policy="block")
+
+
+def test_exposure_logger_backpressure() -> None:
+    drop_new = ExposureLogger(lambda batch: None, maxsize=2)
+    drop_old = ExposureLogger(lambda batch: None, maxsize=2, policy="drop_old")
+
+    for exposures in (drop_new, drop_old):
+        assert exposures.log("alice", "a", True)
+        assert exposures.log("bob", "a", True)
+
+    assert not drop_new.log("carol", "a", True)
+    assert drop_old.log("carol", "a", True)
+    assert [e.subject for e in drop_new.queue] == ["alice", "bob"]
+    assert [e.subject for e in drop_old.queue] == ["bob", "carol"]
+    assert drop_new.dropped == drop_old.dropped == 1
+
+    # Evicted exposure is not deduplicated.
+    drop_old.queue.clear()
+
+    assert drop_old.log("alice", "a", True)
+    assert not drop_old.log("bob", "a", True)
+
+
+def test_exposure_hooks() -> None:
+    class RolloutFeatureFlags(FeatureFlags):
+        full = FeatureFlag(rollout=100)
+        none = FeatureFlag(rollout=0)
+        targeted = FeatureFlag(rules=[{"plan": "pro"}])
+
+    exposures = ExposureLogger(lambda batch: None)
+    ff = RolloutFeatureFlags()
+    apply_rollouts(ff, "alice", expose=partial(exposures.log, "alice"))
+    apply_targeting(ff, {"plan": "pro"}, expose=partial(exposures.log, "alice"))
+
+    assert [(e.subject, e.flag, e.value) for e in exposures.queue] == [
+        ("alice", "full", True),
+        ("alice", "none", False),
+        ("alice", "targeted", True),
+    ]
+
+
+def test_exposure_logger_sink_errors(caplog: LogCaptureFixture) -> None:
+    batches: List[Sequence[Exposure]] = []
+
+    def sink(batch: Sequence[Exposure]) -> None:
+        batches.append(batch)
+
+        if len(batches) == 1:
+            raise OSError("disk full")
+
+    exposures = ExposureLogger(sink, batch_size=1)
+    exposures.log("alice", "a", True)
+    exposures.log("bob", "a", True)
+
+    assert exposures.flush() == 1
+    assert exposures.errors == 1
+    assert len(batches) == 2
+    assert "Failed to write 1 exposures" in caplog.text
+
+
+def test_exposure_logger_thread() -> None:
+    batches: List[Sequence[Exposure]] = []
+
+    with ExposureLogger(batches.append, interval=60) as exposures:
+        ff = track(MyFeatureFlags({"b": True}))
+        assert not ff.a
+        assert ff.b
+        exposures.log_reads(ff, "alice")
+
+    assert [(e.flag, e.value) for batch in batches for e in batch] == [
+        ("a", False),
+        ("b", True),
+    ]
@@ -0,0 +1,75 @@
+from pytest import raises
+
+from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha.layers import Layer, LayeredResolver
+from fiicha.parser import compile_feature_flags_string
+
+
+class MyFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+def test_resolve() -> None:
+    env = Layer({"a": True, "b": True}, name="env")
+    tenant = Layer({"b": False}, name="tenant")
+    user = Layer({"c": True, "x": True}, name="user")
+    resolver = LayeredResolver(MyFeatureFlags)
+
+    ff = resolver.resolve([env, tenant, user])
+
+    assert ff._immutable
+    assert ff._dict() == {"a": True, "b": False, "c": True}
+    assert resolver.resolve([env, tenant, user]) is ff
+    assert resolver.resolve([env, tenant])._dict() == {
+        "a": True,
+        "b": False,
+        "c": False,
+    }
+
+    with raises(TypeError):
+        tenant.values["a"] = False  # type: ignore
+
+    assert repr(tenant) == "Layer({'b': False}, name='tenant')"
+
+    tenant.update({"a": False})
+
+    assert resolver.resolve([env, tenant, user])._dict() == {
+        "a": False,
+        "b": True,
+        "c": True,
+    }
+
+
+def test_resolve_overrides() -> None:
+    env = Layer({"a": True})
+    resolver = LayeredResolver(MyFeatureFlags)
+    overrides = compile_feature_flags_string(MyFeatureFlags, "!a b")
+    expected = {"a": False, "b": True, "c": False}
+
+    assert resolver.resolve([env], overrides)._dict() == expected
+    assert resolver.resolve([env], {"a": False, "b": True})._dict() == expected
+    assert resolver.resolve([env])._dict() == {"a": True, "b": False, "c": False}
+
+
+def test_eviction() -> None:
+    layers = [Layer({"a": True}), Layer({"b": True}), Layer({"c": True})]
+    resolver = LayeredResolver(MyFeatureFlags, maxsize=2, default_key="all")
+
+    ff = resolver.resolve(layers[:1])
+
+    resolver.resolve(layers[1:2])
+    resolver.resolve(layers[2:])
+
+    assert len(resolver.cache) == 2
+    assert resolver.resolve(layers[:1]) is not ff
+
+    resolver.clear()
+
+    assert not resolver.cache
+    assert resolver.resolve([Layer({"all": True})])._dict() == {
+        "a": True,
+        "b": True,
+        "c": True,
+    }
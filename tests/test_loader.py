@@ -0,0 +1,69 @@
+from pathlib import Path
+from typing import Any
+
+from pytest import mark
+
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+from fiicha.loader import Loader, from_environ, from_file, from_mapping, from_string
+
+
+@mark.parametrize("base", [FeatureFlags, PackedFeatureFlags, SparseFeatureFlags])
+def test_loader(base: Any, tmp_path: Path) -> None:
+    class AppFeatureFlags(base):  # type: ignore
+        release_x = FeatureFlag()
+        shared = FeatureFlag()
+
+    class BillingFeatureFlags(base):  # type: ignore
+        invoices = FeatureFlag()
+        shared = FeatureFlag()
+
+    path = tmp_path / "features"
+    path.write_text("invoices  # enabled for everyone\n!release_x")
+    loader = Loader(
+        {"APP_FEATURE_": AppFeatureFlags, "APP_FEATURE_BILLING_": BillingFeatureFlags}
+    )
+    result = loader.load(
+        from_environ(
+            {
+                "APP_FEATURE_RELEASE_X": "yes",
+                "APP_FEATURE_Shared": "1",
+                "APP_FEATURE_BILLING_SHARED": " On ",
+                "APP_FEATURE_TYPO": "1",
+                "APP_FEATURE_BILLING_INVOICES": "maybe",
+                "HOME": "/root",
+            }
+        ),
+        from_file(path),
+        from_string("shared unknown"),
+        from_mapping({"invoices": False, "shared": 1}),
+    )
+    app = result[AppFeatureFlags]
+    billing = result[BillingFeatureFlags]
+
+    assert app._dict() == {"release_x": False, "shared": True}
+    assert billing._dict() == {"invoices": False, "shared": True}
+    assert app._immutable and billing._immutable
+    assert result.unknown == ["environ:APP_FEATURE_TYPO", "string:unknown"]
+    assert result.invalid == [
+        "environ:APP_FEATURE_BILLING_INVOICES",
+        "mapping:shared",
+    ]
+
+
+def test_loader_default_key() -> None:
+    class AppFeatureFlags(FeatureFlags):
+        a = FeatureFlag()
+        b = FeatureFlag()
+
+    loader = Loader({"APP_": AppFeatureFlags}, default_key="all")
+    result = loader.load(
+        from_environ({"APP_ALL": "1"}), from_mapping({"APP_b": "0"}, prefixed=True)
+    )
+
+    assert result[AppFeatureFlags]._dict() == {"a": True, "b": False}
+    assert not result.unknown and not result.invalid
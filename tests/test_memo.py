@@ -0,0 +1,90 @@
+from contextvars import ContextVar
+from typing import List
+
+from pytest import raises
+
+from fiicha.context import FeatureFlagsContext
+from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha.memo import memoize
+
+
+class MyFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+ff_ctx = FeatureFlagsContext(
+    ContextVar("ff", default=MyFeatureFlags(immutable=True)), immutable=False
+)
+
+
+def test_memoize() -> None:
+    calls: List[int] = []
+
+    @memoize(ff_ctx, "a", "b", maxsize=3)
+    def compute(x: int, y: int = 0) -> str:
+        calls.append(x)
+        ff = ff_ctx.current
+        return f"{x + y} {ff.a} {ff.b}"
+
+    assert compute(1) == "1 False False"
+    assert compute(1) == "1 False False"
+    assert compute(1, y=1) == "2 False False"
+    assert calls == [1, 1]
+
+    with ff_ctx as ff:
+        ff.a = True
+
+        assert compute(1) == "1 True False"
+
+        ff.c = True
+
+        assert compute(1) == "1 True False"
+
+    assert calls == [1, 1, 1]
+    assert compute(2) == "2 False False"
+    assert len(compute.cache) == 3  # type: ignore
+    assert compute(1, y=1) == "2 False False"
+    assert compute(1) == "1 False False"  # evicted
+    assert calls == [1, 1, 1, 2, 1]
+
+    compute.cache_clear()  # type: ignore
+
+    assert compute(1, y=1) == "2 False False"
+    assert calls == [1, 1, 1, 2, 1, 1]
+
+
+def test_memoize_ttl() -> None:
+    now = [0.0]
+    calls: List[int] = []
+
+    @memoize(ff_ctx, "a", ttl=10, clock=lambda: now[0])
+    def compute(x: int) -> int:
+        calls.append(x)
+        return x
+
+    compute(1)
+    now[0] = 9.9
+    compute(1)
+
+    assert calls == [1]
+
+    now[0] = 10.0
+    compute(1)
+
+    assert calls == [1, 1]
+
+
+def test_memoize_invalid() -> None:
+    with raises(ValueError, match="at least one feature flag is required"):
+        memoize(ff_ctx)
+
+    with raises(ValueError, match="maxsize must be positive"):
+        memoize(ff_ctx, "a", maxsize=0)
+
+    async def coro() -> None:
+        pass
+
+    with raises(TypeError, match="coroutine functions are not supported"):
+        memoize(ff_ctx, "a")(coro)
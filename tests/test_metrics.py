@@ -0,0 +1,134 @@
+import gc
+from threading import Thread
+from typing import Any
+
+from pytest import mark, raises
+
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+from fiicha.metrics import CountingFeatureFlag, FlagMetrics
+
+
+def make_class(base: Any) -> Any:
+    class TestFeatureFlags(base):  # type: ignore
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    return TestFeatureFlags
+
+
+@mark.parametrize("base", [FeatureFlags, PackedFeatureFlags, SparseFeatureFlags])
+def test_metrics(base: Any) -> None:
+    cls = make_class(base)
+    name = f"{cls.__module__}.{cls.__qualname__}"
+    metrics = FlagMetrics()
+    metrics.instrument(cls)
+    metrics.instrument(cls)
+    ff = cls({"test": True}, immutable=True)
+
+    assert ff.test
+    assert ff.test
+    assert not ff.tset
+    assert ff._copy()._dict() == {"test": True, "tset": False}
+    assert repr(ff | ff) == repr(cls({"test": True}))
+
+    overlay = ff._overlay(immutable=False)
+
+    assert overlay.test
+
+    overlay.test = False
+
+    assert not overlay.test
+    assert metrics.snapshot() == {
+        name: {
+            "test": {"reads": 4, "true": 3, "false": 1},
+            "tset": {"reads": 1, "true": 0, "false": 1},
+        }
+    }
+
+    metrics.uninstrument(cls)
+    metrics.uninstrument(cls)
+
+    assert ff.test
+    assert metrics.snapshot()[name]["test"]["reads"] == 4
+    assert not isinstance(cls.__dict__["test"], CountingFeatureFlag)
+    assert getattr(cls._copy, "__wrapped__", None) is None
+
+    metrics.reset()
+
+    assert metrics.snapshot() == {}
+
+
+def test_metrics_unread() -> None:
+    cls = make_class(FeatureFlags)
+    metrics = FlagMetrics()
+    metrics.instrument(cls)
+
+    assert list(metrics.snapshot().values()) == [
+        {
+            "test": {"reads": 0, "true": 0, "false": 0},
+            "tset": {"reads": 0, "true": 0, "false": 0},
+        }
+    ]
+
+
+def test_metrics_sample_threads() -> None:
+    cls = make_class(FeatureFlags)
+    metrics = FlagMetrics(sample=10)
+    metrics.instrument(cls)
+    ff = cls({"test": True})
+
+    def read() -> None:
+        for _ in range(1000):
+            ff.test
+
+    threads = [Thread(target=read) for _ in range(4)]
+
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    gc.collect()
+    (counts,) = metrics.snapshot().values()
+
+    # Counts of exited threads are kept, their counters are not.
+    assert len(metrics.threads) == 0
+    assert counts["test"] == {"reads": 4000, "true": 4000, "false": 0}
+
+    ff.test
+    (counts,) = metrics.snapshot().values()
+
+    assert len(metrics.threads) == 1
+    assert counts["test"]["reads"] == 4010
+
+    metrics.reset()
+    (counts,) = metrics.snapshot().values()
+
+    assert counts["test"]["reads"] == 0
+
+    with raises(ValueError, match="sample must be positive"):
+        FlagMetrics(sample=0)
+
+
+def test_prometheus() -> None:
+    cls = make_class(FeatureFlags)
+    metrics = FlagMetrics()
+    metrics.instrument(cls)
+    ff = cls({"test": True})
+    ff.test
+    labels = f'class="{cls.__module__}.{cls.__qualname__}"'
+
+    assert metrics.to_prometheus() == (
+        "# HELP fiicha_feature_flag_reads_total Number of feature flag reads"
+        " by returned value.\n"
+        "# TYPE fiicha_feature_flag_reads_total counter\n"
+        f'fiicha_feature_flag_reads_total{{{labels},flag="test",value="true"}} 1\n'
+        f'fiicha_feature_flag_reads_total{{{labels},flag="test",value="false"}} 0\n'
+        f'fiicha_feature_flag_reads_total{{{labels},flag="tset",value="true"}} 0\n'
+        f'fiicha_feature_flag_reads_total{{{labels},flag="tset",value="false"}} 0\n'
+    )
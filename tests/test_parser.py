@@ -1,4 +1,26 @@
-from fiicha.parser import feature_flags_from_environ, parse_feature_flags_string
+from typing import Type
+
+import pytest
+
+from fiicha.core import FeatureFlag, FeatureFlags, PackedFeatureFlags
+from fiicha.parser import (
+    FlagOverrides,
+    compile_feature_flags_string,
+    feature_flags_from_environ,
+    parse_feature_flags_string,
+)
+
+
+class SlottedFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class BitsFeatureFlags(PackedFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
 
 
 def test_parse_feature_flags_string() -> None:
@@ -21,6 +43,53 @@ def test_parse_feature_flags_string_custom() -> None:
     }
 
 
+@pytest.mark.parametrize("cls", [SlottedFeatureFlags, BitsFeatureFlags])
+def test_compile_feature_flags_string(cls: Type[FeatureFlags]) -> None:
+    overrides = compile_feature_flags_string(cls, "a !b x !y")
+
+    assert isinstance(overrides, FlagOverrides)
+    assert overrides == {"a": True, "b": False}
+    assert list(overrides.values()) == [True, False]
+    assert compile_feature_flags_string(cls, "a !b x !y") is overrides
+    assert compile_feature_flags_string(cls, "a,-b", ",", "-") == overrides
+    assert compile_feature_flags_string(cls, "a,-b", ",", "-") is not overrides
+
+    ff = cls({"b": True, "c": True}, immutable=True)
+    new_ff = overrides.apply(ff)
+
+    assert new_ff._dict() == {"a": True, "b": False, "c": True}
+    assert new_ff._immutable
+    assert not overrides.apply(ff, immutable=False)._immutable
+    assert ff._dict() == {"a": False, "b": True, "c": True}
+
+
+def test_flag_overrides_immutable() -> None:
+    overrides = compile_feature_flags_string(BitsFeatureFlags, "a !b")
+
+    with pytest.raises(TypeError):
+        overrides.overrides["c"] = True  # type: ignore
+
+    with pytest.raises(RuntimeError, match="this instance is immutable"):
+        overrides.set_mask = 0
+
+    with pytest.raises(RuntimeError, match="this instance is immutable"):
+        del overrides.overrides
+
+    assert compile_feature_flags_string(BitsFeatureFlags, "a !b") == {
+        "a": True,
+        "b": False,
+    }
+
+
+def test_compile_feature_flags_string_empty() -> None:
+    overrides = compile_feature_flags_string(BitsFeatureFlags, None)
+
+    assert not overrides
+    assert overrides.apply(BitsFeatureFlags({"a": True})) == BitsFeatureFlags(
+        {"a": True}
+    )
+
+
 def test_feature_flags_from_environ() -> None:
     true = [
         "1",
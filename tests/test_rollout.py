@@ -0,0 +1,101 @@
+from typing import Any, List
+
+from pytest import MonkeyPatch, importorskip, mark
+
+from fiicha import rollout
+from fiicha.core import FeatureFlag, FeatureFlags, PackedFeatureFlags
+from fiicha.rollout import (
+    apply_rollouts,
+    assignments,
+    bucket,
+    buckets,
+    in_rollout,
+    rolled_out,
+    rollouts,
+    threshold,
+)
+
+KEYS: List[Any] = [0, 1, -1, 2**63, 2**64 + 5, "alice", "bob", True]
+
+
+def test_bucket_stable() -> None:
+    assert bucket("test", "alice") == bucket("test", "alice")
+    assert bucket("test", 2**64 + 5) == bucket("test", 5)
+    assert [bucket("test", key) for key in KEYS] == [
+        bucket("test", key) for key in KEYS
+    ]
+    assert len({bucket("test", i) for i in range(1000)}) > 900
+    assert all(0 <= bucket("test", i) < rollout.BUCKETS for i in range(1000))
+
+
+def test_bucket_per_flag() -> None:
+    assert [bucket("test", i) for i in range(10)] != [
+        bucket("tset", i) for i in range(10)
+    ]
+
+
+@mark.parametrize("percentage", [0, 10, 50, 100])
+def test_in_rollout_distribution(percentage: float) -> None:
+    enabled = sum(in_rollout("test", i, percentage) for i in range(10_000))
+
+    assert abs(enabled - percentage * 100) <= 200
+
+
+def test_threshold() -> None:
+    assert threshold(-1) == 0
+    assert threshold(0.01) == 1
+    assert threshold(33.3) == 3330
+    assert threshold(200) == rollout.BUCKETS
+
+
+def test_batch_pure_python(monkeypatch: MonkeyPatch) -> None:
+    monkeypatch.setattr(rollout, "np", None)
+
+    expected = [bucket("test", key) for key in KEYS]
+
+    assert buckets("test", iter(KEYS)) == expected
+    assert assignments("test", KEYS, 50) == [b < 5000 for b in expected]
+
+
+def test_batch_numpy() -> None:
+    np = importorskip("numpy")
+    ints = list(range(-500, 500))
+
+    assert list(buckets("test", np.array(ints))) == [
+        bucket("test", key) for key in ints
+    ]
+    big = list(range(2**64 - 100, 2**64))
+
+    assert list(buckets("test", np.array(big, dtype=np.uint64))) == [
+        bucket("test", key) for key in big
+    ]
+    assert list(buckets("test", KEYS)) == [bucket("test", key) for key in KEYS]
+    assert list(buckets("test", ["alice", "bob"])) == [
+        bucket("test", "alice"),
+        bucket("test", "bob"),
+    ]
+    assert list(assignments("test", iter(ints), 30)) == [
+        in_rollout("test", key, 30) for key in ints
+    ]
+
+
+@mark.parametrize("base", [FeatureFlags, PackedFeatureFlags])
+def test_apply_rollouts(base: Any) -> None:
+    class TestFeatureFlags(base):  # type: ignore
+        test = FeatureFlag("Enable test feature.", rollout=50)
+        tset = FeatureFlag("Erutaef tset elbane.")
+        full = FeatureFlag("Enabled for everyone.", rollout=100)
+
+    assert rollouts(TestFeatureFlags) == {"test": 50, "full": 100}
+    assert rollouts(TestFeatureFlags) is rollouts(TestFeatureFlags)
+
+    for key in range(20):
+        ff = TestFeatureFlags()._overlay()
+        apply_rollouts(ff, key)
+
+        assert ff.test == in_rollout("test", key, 50)
+        assert not ff.tset
+        assert ff.full
+        assert rolled_out(TestFeatureFlags, key) == [
+            name for name in ("test", "full") if getattr(ff, name)
+        ]
@@ -0,0 +1,108 @@
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from math import inf
+from typing import Any, List
+
+from pytest import mark, raises
+
+from fiicha.context import FeatureFlagsContext
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+from fiicha.schedule import ScheduledSource, schedule
+
+
+def test_feature_flag_schedule() -> None:
+    launch = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    flag = FeatureFlag(active_from=launch, active_until=launch.timestamp() + 60)
+
+    assert flag.active_from == launch.timestamp()
+    assert flag.active_until == launch.timestamp() + 60
+
+    with raises(ValueError, match="active_from must be before active_until"):
+        FeatureFlag(active_from=10, active_until=10)
+
+    with raises(ValueError, match="active_until must be timezone-aware"):
+        FeatureFlag(active_until=datetime(2030, 1, 1))
+
+
+@mark.parametrize("base", [FeatureFlags, PackedFeatureFlags, SparseFeatureFlags])
+def test_scheduled_source(base: Any) -> None:
+    class TestFeatureFlags(base):  # type: ignore
+        launch = FeatureFlag(active_from=100)
+        kill = FeatureFlag(active_until=200)
+        window = FeatureFlag(active_from=150, active_until=300)
+        plain = FeatureFlag()
+
+    s = schedule(TestFeatureFlags)
+
+    assert s is schedule(TestFeatureFlags)
+    assert len(s) == 3
+    assert s.transitions == [100, 150, 200, 300]
+    assert s.next_transition(0) == 100
+    assert s.next_transition(100) == 150
+    assert s.next_transition(300) == inf
+
+    now = [0.0]
+    calls: List[float] = []
+
+    def clock() -> float:
+        calls.append(now[0])
+        return now[0]
+
+    base_ff = TestFeatureFlags({"plain": True}, immutable=True)
+    source = ScheduledSource(TestFeatureFlags, lambda: base_ff, clock=clock)
+    ff = source.get()
+
+    assert ff._dict() == {
+        "launch": False,
+        "kill": True,
+        "window": False,
+        "plain": True,
+    }
+    assert ff._immutable
+
+    now[0] = 99
+
+    assert source.get() is ff
+
+    now[0] = 160
+    ff = source.get()
+
+    assert (ff.launch, ff.kill, ff.window) == (True, True, True)
+
+    calls.clear()
+    assert ff.launch
+    assert not calls  # reads never call the clock
+
+    now[0] = 300
+    ff = source.get()
+
+    assert (ff.launch, ff.kill, ff.window) == (True, False, False)
+    assert source.state[1] == inf
+
+    base_ff = TestFeatureFlags(immutable=True)
+
+    assert not source.get().plain
+
+
+def test_scheduled_source_context() -> None:
+    class TestFeatureFlags(FeatureFlags):
+        launch = FeatureFlag(active_from=100)
+
+    now = [0.0]
+    source = ScheduledSource(TestFeatureFlags, clock=lambda: now[0])
+    ff_ctx = FeatureFlagsContext(ContextVar("ff"), source=source.get)
+
+    with ff_ctx as ff:
+        assert not ff.launch
+
+        now[0] = 100
+
+        assert not ff.launch
+
+    with ff_ctx as ff:
+        assert ff.launch
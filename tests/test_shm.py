@@ -0,0 +1,161 @@
+import multiprocessing
+from pathlib import Path
+from typing import Any
+
+from pytest import mark, raises
+
+from fiicha.core import FeatureFlag, FeatureFlags, PackedFeatureFlags
+from fiicha.shm import SEQUENCE, SEQUENCE_OFFSET, SharedFeatureFlags
+
+
+class MyFeatureFlags(FeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+class MyPackedFeatureFlags(PackedFeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+class SwappedFeatureFlags(FeatureFlags):
+    tset = FeatureFlag("Erutaef tset elbane.")
+    test = FeatureFlag("Enable test feature.")
+
+
+class OtherFeatureFlags(FeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+
+
+@mark.parametrize("cls", [MyFeatureFlags, MyPackedFeatureFlags])
+def test_shared(tmp_path: Path, cls: Any) -> None:
+    path = tmp_path / "flags"
+
+    with SharedFeatureFlags(path, cls, writer=True) as writer:
+        reader = SharedFeatureFlags(path, cls)
+        first = reader.get()
+
+        assert first._immutable
+        assert first._dict() == {"test": False, "tset": False}
+        assert reader.get() is first
+
+        writer.publish(cls({"tset": True}))
+
+        second = reader.get()
+
+        assert second is not first
+        assert second._dict() == {"test": False, "tset": True}
+        assert reader.get() is second
+        assert reader.sequence == 4
+
+        with raises(RuntimeError, match="read-only"):
+            reader.publish(cls())
+
+        reader.close()
+
+
+def test_writer_reopen(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    writer = SharedFeatureFlags(path, MyFeatureFlags, writer=True)
+    reader = SharedFeatureFlags(path, MyFeatureFlags)
+    writer.publish(MyFeatureFlags({"test": True}))
+
+    assert reader.get().test
+
+    writer.close()
+    writer = SharedFeatureFlags(path, MyFeatureFlags, writer=True)
+
+    # States of the previous writer are kept until the first publish.
+    assert reader.get()._dict() == {"test": True, "tset": False}
+    assert reader.sequence == 6
+
+    writer.publish(MyFeatureFlags({"tset": True}))
+
+    assert reader.get()._dict() == {"test": False, "tset": True}
+
+    writer.close()
+    writer = SharedFeatureFlags(
+        path, MyFeatureFlags, writer=True, initial=MyFeatureFlags({"test": True})
+    )
+
+    assert reader.get()._dict() == {"test": True, "tset": False}
+
+
+def test_writer_killed(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    writer = SharedFeatureFlags(path, MyFeatureFlags, writer=True)
+    reader = SharedFeatureFlags(path, MyFeatureFlags)
+    writer.publish(MyFeatureFlags({"test": True}))
+    last = reader.get()
+
+    # Writer killed between making sequence odd and even again.
+    SEQUENCE.pack_into(writer.mmap, SEQUENCE_OFFSET, writer.sequence + 1)
+
+    assert reader.get() is last
+    assert reader.get() is last
+
+    with raises(RuntimeError, match="being updated"):
+        SharedFeatureFlags(path, MyFeatureFlags).get()
+
+    writer = SharedFeatureFlags(path, MyFeatureFlags, writer=True)
+
+    assert writer.sequence % 2 == 0
+    assert reader.get()._dict() == {"test": True, "tset": False}
+
+
+def test_writer_schema_changed(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    writer = SharedFeatureFlags(path, MyFeatureFlags, writer=True)
+    reader = SharedFeatureFlags(path, MyFeatureFlags)
+    writer.publish(MyFeatureFlags({"test": True}))
+    last = reader.get()
+
+    writer.close()
+    writer = SharedFeatureFlags(path, SwappedFeatureFlags, writer=True)
+    writer.publish(SwappedFeatureFlags({"tset": True}))
+
+    assert reader.get() is last
+
+    with raises(ValueError, match="schema mismatch"):
+        SharedFeatureFlags(path, MyFeatureFlags)
+
+
+def test_schema_mismatch(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    path.write_bytes(b"x" * 64)
+
+    with raises(ValueError, match="not a shared feature flags file"):
+        SharedFeatureFlags(path, MyFeatureFlags)
+
+    SharedFeatureFlags(path, MyFeatureFlags, writer=True)
+
+    with raises(ValueError, match="schema mismatch"):
+        SharedFeatureFlags(path, OtherFeatureFlags)
+
+    path.write_bytes(b"")
+
+    with raises(ValueError, match="too small"):
+        SharedFeatureFlags(path, MyFeatureFlags)
+
+
+def publish(path: Path) -> None:
+    with SharedFeatureFlags(path, MyFeatureFlags, writer=True) as writer:
+        writer.publish(MyFeatureFlags({"test": True}))
+
+
+@mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(), reason="requires fork"
+)
+def test_cross_process(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    shared = SharedFeatureFlags(path, MyFeatureFlags, writer=True)
+
+    assert not shared.get().test
+
+    context = multiprocessing.get_context("fork")
+    process = context.Process(target=publish, args=(path,))
+    process.start()
+    process.join()
+
+    assert process.exitcode == 0
+    assert shared.get().test
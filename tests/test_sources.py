@@ -0,0 +1,247 @@
+import asyncio
+import os
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from threading import Thread
+from time import sleep
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+from urllib.error import HTTPError
+
+from pytest import LogCaptureFixture, fixture, raises
+
+from fiicha.changes import Subscriptions
+from fiicha.context import FeatureFlagsContext
+from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha.sources import FileSource, HTTPSource, PollingSource
+
+
+class MyFeatureFlags(FeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+def write(path: Path, text: str, mtime_ns: int) -> None:
+    path.write_text(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_file_source(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    write(path, "test  # comment\n!tset\n", 1_000_000_000)
+    source = FileSource(path, MyFeatureFlags)
+    first = source.get()
+
+    assert first._immutable
+    assert first._dict() == {"test": True, "tset": False}
+    assert not source.poll()
+    assert source.get() is first
+
+    write(path, "tset\n", 2_000_000_000)
+
+    assert source.poll()
+    assert source.get()._dict() == {"test": False, "tset": True}
+    assert first._dict() == {"test": True, "tset": False}
+
+    path.unlink()
+
+    assert not source.poll()
+    assert source.get()._dict() == {"test": False, "tset": True}
+
+
+def test_polling_source_abstract() -> None:
+    with raises(TypeError):
+        PollingSource(MyFeatureFlags)  # type: ignore
+
+
+def test_file_source_missing(tmp_path: Path) -> None:
+    source = FileSource(tmp_path / "flags", MyFeatureFlags, default_key="all")
+
+    assert source.get()._dict() == {"test": False, "tset": False}
+
+    write(tmp_path / "flags", "all !test", 1_000_000_000)
+
+    assert source.poll()
+    assert source.get()._dict() == {"test": False, "tset": True}
+
+
+def test_file_source_thread(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    write(path, "", 1_000_000_000)
+
+    with FileSource(path, MyFeatureFlags, interval=0.01) as source:
+        write(path, "test", 2_000_000_000)
+
+        for _ in range(500):
+            if source.get().test:
+                break
+            sleep(0.01)
+
+    assert source.get().test
+
+
+def test_file_source_context(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    write(path, "test", 1_000_000_000)
+    source = FileSource(path, MyFeatureFlags)
+    var: ContextVar[MyFeatureFlags] = ContextVar("test")
+    ff_ctx = FeatureFlagsContext(var, source=source.get)
+
+    assert ff_ctx.current is source.get()
+
+    with ff_ctx as ff:
+        write(path, "tset", 2_000_000_000)
+        source.poll()
+
+        assert ff.test
+        assert ff_ctx.current is ff
+
+    assert ff_ctx.current.tset
+
+
+def test_file_source_subscriptions(tmp_path: Path) -> None:
+    path = tmp_path / "flags"
+    write(path, "test\n", 1_000_000_000)
+    subscriptions = Subscriptions(MyFeatureFlags)
+    changes: List[Dict[str, bool]] = []
+    subscriptions.subscribe(changes.append, "tset")
+    source = FileSource(path, MyFeatureFlags, subscriptions=subscriptions)
+
+    assert changes == []
+
+    write(path, "test tset\n", 2_000_000_000)
+    source.poll()
+
+    assert changes == [{"tset": True}]
+
+
+class FlagServiceHandler(BaseHTTPRequestHandler):
+    responses: List[Tuple[int, str, bytes]]
+    requests: List[Optional[str]]
+
+    def do_GET(self) -> None:
+        self.requests.append(self.headers.get("If-None-Match"))
+        status, content_type, body = self.responses[0]
+        etag = f'"{len(self.responses)}"'
+
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@fixture
+def flag_service() -> Iterator[Tuple[str, Type[FlagServiceHandler]]]:
+    handler = type("Handler", (FlagServiceHandler,), {"responses": [], "requests": []})
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/flags", handler
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_http_source(
+    flag_service: Tuple[str, Type[FlagServiceHandler]], caplog: LogCaptureFixture
+) -> None:
+    url, handler = flag_service
+    handler.responses.append((200, "text/plain", b"test # comment\n!tset"))
+    source = HTTPSource(url, MyFeatureFlags)
+
+    assert source.staleness is None
+    assert not source.get().test
+    assert source.poll()
+
+    first = source.get()
+
+    assert first._immutable
+    assert first._dict() == {"test": True, "tset": False}
+    assert source.etag == '"1"'
+    assert source.latency is not None
+    assert not source.poll()
+    assert source.get() is first
+    assert handler.requests == [None, '"1"']
+
+    handler.responses.insert(0, (500, "text/plain", b"error"))
+
+    with raises(HTTPError):
+        source.poll()
+
+    assert source.errors == 1
+    assert source.get() is first
+    assert source.staleness is not None and source.staleness > 0
+
+    handler.responses[0] = (200, "application/json", b'{"tset": true}')
+
+    assert source.poll()
+    assert source.get()._dict() == {"test": False, "tset": True}
+    assert source.etag == '"2"'
+
+    handler.responses[0] = (
+        200,
+        "application/json",
+        b'{"test": " True", "tset": "off", "tste": 1, "etst": null}',
+    )
+    source.etag = None
+
+    assert source.poll()
+    assert source.get()._dict() == {"test": True, "tset": False}
+    assert "Ignoring invalid feature flag values" in caplog.text
+    assert "tste, etst" in caplog.text
+
+    handler.responses[0] = (200, "application/json", b"[]")
+    source.etag = None
+
+    with raises(ValueError, match="JSON object"):
+        source.poll()
+
+    assert source.errors == 2
+
+
+def test_http_source_thread(
+    flag_service: Tuple[str, Type[FlagServiceHandler]]
+) -> None:
+    url, handler = flag_service
+    handler.responses.append((200, "text/plain", b"test"))
+
+    with HTTPSource(url, MyFeatureFlags, interval=0.01) as source:
+        for _ in range(500):
+            if source.get().test:
+                break
+            sleep(0.01)
+
+    assert source.get().test
+
+
+def test_http_source_watch(
+    flag_service: Tuple[str, Type[FlagServiceHandler]]
+) -> None:
+    url, handler = flag_service
+    handler.responses.append((200, "text/plain", b"test"))
+    source = HTTPSource(url, MyFeatureFlags, interval=0.01)
+
+    async def main() -> None:
+        task = asyncio.ensure_future(source.watch())
+
+        for _ in range(500):
+            if len(handler.requests) > 1:
+                break
+            await asyncio.sleep(0.01)
+
+        task.cancel()
+
+    asyncio.run(main())
+
+    assert source.get().test
+    assert handler.requests[:2] == [None, '"1"']
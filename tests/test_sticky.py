@@ -0,0 +1,106 @@
+import asyncio
+from typing import List
+
+from pytest import raises
+
+from fiicha.changes import Subscriptions
+from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha.sticky import AssignmentCache
+
+
+class MyFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+
+
+def test_assignment_cache() -> None:
+    now = [0.0]
+    calls: List[str] = []
+    cache: AssignmentCache[MyFeatureFlags] = AssignmentCache(
+        maxsize=2, ttl=10, clock=lambda: now[0]
+    )
+
+    def resolve(key: str) -> MyFeatureFlags:
+        calls.append(key)
+        return MyFeatureFlags({"a": key == "alice"})
+
+    alice = cache.resolve("alice", resolve)
+
+    assert alice.a
+    assert alice._immutable
+
+    mutable = MyFeatureFlags()
+    cached = cache.set("dave", mutable)
+
+    assert not mutable._immutable
+    assert cached._immutable
+    assert cached is not mutable
+    assert cache.set("dave", cached) is cached
+
+    cache.discard("dave")
+    assert cache.resolve("alice", resolve) is alice
+    assert not cache.resolve("bob", resolve).a
+    assert calls == ["alice", "bob"]
+
+    cache.resolve("alice", resolve)
+    cache.resolve("carol", resolve)  # evicts bob
+
+    assert len(cache) == 2
+    assert cache.get("bob") is None
+
+    now[0] = 10
+
+    assert cache.get("alice") is None
+    assert len(cache) == 1
+
+    cache.discard("carol")
+
+    assert len(cache) == 0
+
+    with raises(ValueError, match="maxsize must be positive"):
+        AssignmentCache(maxsize=0)
+
+
+def test_assignment_cache_invalidate() -> None:
+    cache: AssignmentCache[MyFeatureFlags] = AssignmentCache()
+    subscriptions = Subscriptions(MyFeatureFlags)
+    subscriptions.subscribe(cache.invalidate, "b")
+    alice = cache.set("alice", MyFeatureFlags({"a": True}))
+
+    subscriptions.notify(MyFeatureFlags(), MyFeatureFlags({"a": True}))
+
+    assert cache.get("alice") is alice
+
+    generation = cache.generation
+    subscriptions.notify(MyFeatureFlags(), MyFeatureFlags({"b": True}))
+
+    assert cache.get("alice") is None
+
+    # Resolved before invalidation, never reused.
+    cache.set("alice", alice, generation)
+
+    assert cache.get("alice") is None
+
+    cache.set("alice", alice)
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_assignment_cache_async() -> None:
+    cache: AssignmentCache[MyFeatureFlags] = AssignmentCache()
+
+    async def resolve(key: str) -> MyFeatureFlags:
+        await asyncio.sleep(0)
+        return MyFeatureFlags({"b": True})
+
+    async def main() -> List[MyFeatureFlags]:
+        return await asyncio.gather(
+            *(cache.resolve_async(key, resolve) for key in ["a", "b", "a"])
+        )
+
+    a, b, _ = asyncio.run(main())
+
+    assert a.b and b.b
+    assert cache.get("a") is not None
+    assert asyncio.run(cache.resolve_async("b", resolve)) is b
@@ -0,0 +1,91 @@
+from typing import Any
+
+from pytest import mark, raises
+
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+from fiicha.targeting import Rule, Targeting, apply_targeting, targeting
+
+
+def test_targeting_conditions() -> None:
+    t = Targeting(
+        {
+            "eq": [{"tenant": "acme"}],
+            "member": [{"plan": ["pro", "enterprise"], "region": "eu"}],
+            "version": [{"app_version": {">=": (2, 3), "<": (3,)}}],
+            "mixed": [{"region": {"in": {"eu", "us"}, "!=": "us"}}],
+            "excluded": [{"region": {"not in": ["cn"]}}],
+        }
+    )
+
+    assert len(t) == 5
+    assert t.evaluate({}) == {}
+    assert t.evaluate({"tenant": "acme", "region": "us"}) == {
+        "eq": True,
+        "excluded": True,
+    }
+    assert t.evaluate({"plan": "pro", "region": "eu"}) == {
+        "member": True,
+        "mixed": True,
+        "excluded": True,
+    }
+    assert t.evaluate({"plan": "free", "region": "cn"}) == {}
+    assert t.evaluate({"app_version": (2, 3, 1)}) == {"version": True}
+    assert t.evaluate({"app_version": (3, 0)}) == {}
+    assert t.evaluate({"app_version": (2, 2)}) == {}
+
+
+def test_targeting_first_match() -> None:
+    t = Targeting(
+        {
+            "test": [
+                Rule({"tenant": "acme"}, enabled=False),
+                {"region": "eu"},
+                Rule({}, enabled=False),
+            ],
+            "tset": [{"tenant": ("acme", "initech")}],
+        }
+    )
+
+    assert t.evaluate({"tenant": "acme", "region": "eu"}) == {
+        "test": False,
+        "tset": True,
+    }
+    assert t.evaluate({"tenant": "initech", "region": "eu"}) == {
+        "test": True,
+        "tset": True,
+    }
+    assert t.evaluate({"region": "us"}) == {"test": False}
+
+
+def test_targeting_errors() -> None:
+    with raises(ValueError, match="unknown operator: ~"):
+        Targeting({"test": [{"tenant": {"~": "acme"}}]})
+
+
+@mark.parametrize("base", [FeatureFlags, PackedFeatureFlags, SparseFeatureFlags])
+def test_apply_targeting(base: Any) -> None:
+    class TestFeatureFlags(base):  # type: ignore
+        test = FeatureFlag("Enable test feature.", rules=[{"plan": "pro"}])
+        tset = FeatureFlag(
+            "Erutaef tset elbane.", rules=[Rule({"region": "cn"}, enabled=False)]
+        )
+
+    assert targeting(TestFeatureFlags) is targeting(TestFeatureFlags)
+    assert len(targeting(TestFeatureFlags)) == 2
+
+    ff = TestFeatureFlags({"tset": True})._overlay()
+    apply_targeting(ff, {"plan": "pro", "region": "cn"})
+
+    assert ff.test
+    assert not ff.tset
+
+    ff = TestFeatureFlags({"tset": True})._overlay()
+    apply_targeting(ff, {"plan": "free", "region": "eu"})
+
+    assert not ff.test
+    assert ff.tset
@@ -0,0 +1,86 @@
+from contextvars import ContextVar
+from typing import Type
+
+from pytest import mark, raises
+
+from fiicha.context import FeatureFlagsContext
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+from fiicha.tracking import cache_key, reads, track
+
+
+class SlottedFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class BitsFeatureFlags(PackedFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class SparseBitsFeatureFlags(SparseFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+@mark.parametrize(
+    "cls", [SlottedFeatureFlags, BitsFeatureFlags, SparseBitsFeatureFlags]
+)
+def test_track(cls: Type[FeatureFlags]) -> None:
+    root = cls({"a": True, "c": True})
+    ff = track(root)
+
+    assert isinstance(ff, cls)
+    assert ff.__class__ is cls
+    assert repr(ff) == repr(root)
+    assert ff._dict() == root._dict()
+    assert ff._copy()._dict() == root._dict()
+    assert (ff | cls())._dict() == root._dict()
+    assert reads(ff) == {}
+    assert cache_key(ff) == ""
+
+    assert ff.a
+    assert not ff.b
+
+    assert reads(ff) == {"a": True, "b": False}
+    assert cache_key(ff) == "a !b"
+
+    ff.b = True
+    ff |= cls({"c": True})
+
+    assert root.b
+    assert cache_key(ff) == "a !b"
+
+    ff._freeze()
+
+    assert root._immutable
+    with raises(RuntimeError, match="immutable"):
+        ff.a = False
+
+
+def test_not_tracked() -> None:
+    with raises(TypeError, match="not tracked"):
+        cache_key(SlottedFeatureFlags())
+
+
+def test_context() -> None:
+    var = ContextVar("ff", default=SlottedFeatureFlags({"a": True}, immutable=True))
+    ctx = FeatureFlagsContext(var, track=True)
+
+    with ctx as ff:
+        assert var.get() is ff
+
+        with ctx as inner_ff:
+            assert inner_ff.a
+
+        assert not ff.b
+        assert cache_key(inner_ff) == "a"
+        assert cache_key(ff) == "a !b"
@@ -0,0 +1,54 @@
+from typing import Any
+
+from pytest import mark
+
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+from fiicha.utils import flags_fingerprint, flags_from_int, flags_to_int, get_cookie
+
+
+def test_get_cookie() -> None:
+    header = 'a=1; ff="x !y"; b=; c'
+
+    assert get_cookie(header, "a") == "1"
+    assert get_cookie(header, "ff") == "x !y"
+    assert get_cookie(header, "b") == ""
+    assert get_cookie(header, "c") is None
+    assert get_cookie(header, "d") is None
+
+
+@mark.parametrize("base", [FeatureFlags, PackedFeatureFlags, SparseFeatureFlags])
+def test_flags_int(base: Any) -> None:
+    class TestFeatureFlags(base):  # type: ignore
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    ff = TestFeatureFlags({"tset": True})
+
+    assert flags_to_int(ff) == 2
+    assert flags_to_int(ff._copy(immutable=True)._overlay()) == 2
+    assert flags_from_int(TestFeatureFlags, 3)._dict() == {"test": True, "tset": True}
+    assert flags_from_int(TestFeatureFlags, 1, immutable=True)._immutable
+    # Bits past the last feature flag are ignored.
+    assert flags_from_int(TestFeatureFlags, 6)._dict() == {"test": False, "tset": True}
+
+
+def test_flags_fingerprint() -> None:
+    class Test1FeatureFlags(FeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    class Test2FeatureFlags(PackedFeatureFlags):
+        test = FeatureFlag("Enable test feature.")
+        tset = FeatureFlag("Erutaef tset elbane.")
+
+    class Test3FeatureFlags(FeatureFlags):
+        tset = FeatureFlag("Erutaef tset elbane.")
+        test = FeatureFlag("Enable test feature.")
+
+    assert flags_fingerprint(Test1FeatureFlags) == flags_fingerprint(Test2FeatureFlags)
+    assert flags_fingerprint(Test1FeatureFlags) != flags_fingerprint(Test3FeatureFlags)
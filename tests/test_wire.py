@@ -0,0 +1,93 @@
+from typing import Type
+
+import pytest
+
+from fiicha.core import (
+    FeatureFlag,
+    FeatureFlags,
+    PackedFeatureFlags,
+    SparseFeatureFlags,
+)
+from fiicha.wire import decode, encode, pack, unpack
+
+
+class SlottedFeatureFlags(FeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class BitsFeatureFlags(PackedFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class SparseBitsFeatureFlags(SparseFeatureFlags):
+    a = FeatureFlag()
+    b = FeatureFlag()
+    c = FeatureFlag()
+
+
+class NewFeatureFlags(FeatureFlags):
+    d = FeatureFlag()
+    a = FeatureFlag()
+    c = FeatureFlag()
+
+
+@pytest.mark.parametrize(
+    "cls", [SlottedFeatureFlags, BitsFeatureFlags, SparseBitsFeatureFlags]
+)
+def test_roundtrip(cls: Type[FeatureFlags]) -> None:
+    ff = cls({"a": True, "c": True})
+    s = encode(ff)
+
+    assert s.isascii() and "=" not in s
+    assert len(pack(ff)) == 10
+
+    new_ff = decode(cls, s)
+
+    assert new_ff._dict() == ff._dict()
+    assert new_ff._immutable
+    assert not decode(cls, s, immutable=False)._immutable
+
+
+def test_compatible_layouts() -> None:
+    data = pack(SlottedFeatureFlags({"a": True, "c": True}))
+
+    assert unpack(BitsFeatureFlags, data)._dict() == {"a": True, "b": False, "c": True}
+
+
+def test_schema_mismatch() -> None:
+    s = encode(SlottedFeatureFlags({"a": True, "b": True}))
+
+    with pytest.raises(ValueError, match="schema mismatch"):
+        decode(NewFeatureFlags, s)
+
+    ff = decode(NewFeatureFlags, s, schemas=[("x",), ("a", "b", "c")])
+
+    assert ff._dict() == {"a": True, "c": False, "d": False}
+
+    with pytest.raises(ValueError, match="bitmap size mismatch"):
+        data = pack(SlottedFeatureFlags()) + b"\x00"
+        unpack(NewFeatureFlags, data, schemas=[("a", "b", "c")])
+
+
+def test_malformed() -> None:
+    data = pack(SlottedFeatureFlags())
+
+    with pytest.raises(ValueError, match="truncated"):
+        unpack(SlottedFeatureFlags, data[:5])
+
+    with pytest.raises(ValueError, match="unsupported wire format version: 2"):
+        unpack(SlottedFeatureFlags, b"\x02" + data[1:])
+
+    with pytest.raises(ValueError, match="bitmap size mismatch"):
+        unpack(SlottedFeatureFlags, data + b"\x00")
+
+    for cls in (SlottedFeatureFlags, SparseBitsFeatureFlags):
+        with pytest.raises(ValueError, match="padding is not zero"):
+            unpack(cls, data[:-1] + b"\x08")
+
+    with pytest.raises(ValueError, match="padding is not zero"):
+        unpack(NewFeatureFlags, data[:-1] + b"\x08", schemas=[("a", "b", "c")])
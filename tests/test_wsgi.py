@@ -0,0 +1,59 @@
+from contextvars import ContextVar
+from typing import Any, Iterable, Iterator, List
+
+from pytest import fixture
+
+from fiicha.context import FeatureFlagsContext
+from fiicha.core import FeatureFlag, FeatureFlags
+from fiicha.wsgi import ContextIterable, Environ, FeatureFlagsMiddleware
+
+
+class MyFeatureFlags(FeatureFlags):
+    test = FeatureFlag("Enable test feature.")
+    tset = FeatureFlag("Erutaef tset elbane.")
+
+
+@fixture
+def ff_ctx() -> FeatureFlagsContext[MyFeatureFlags]:
+    root = MyFeatureFlags({"tset": True}, immutable=True)
+    var: ContextVar[MyFeatureFlags] = ContextVar("test", default=root)
+    return FeatureFlagsContext(var)
+
+
+def test_no_overrides(ff_ctx: FeatureFlagsContext[MyFeatureFlags]) -> None:
+    def app(environ: Environ, start_response: Any) -> Iterable[bytes]:
+        return [repr(ff_ctx.current).encode()]
+
+    environ: Environ = {}
+    response = FeatureFlagsMiddleware(app, ff_ctx)(environ, None)
+
+    assert response == [b"MyFeatureFlags(test=False, tset=True)"]
+    assert environ["fiicha.feature_flags"]._source is ff_ctx.current
+
+
+def test_overrides_streaming(ff_ctx: FeatureFlagsContext[MyFeatureFlags]) -> None:
+    closed: List[bool] = []
+
+    class Response:
+        def __iter__(self) -> Iterator[bytes]:
+            yield repr(ff_ctx.current).encode()
+            yield repr(ff_ctx.current).encode()
+
+        def close(self) -> None:
+            closed.append(ff_ctx.current.test)
+
+    def app(environ: Environ, start_response: Any) -> Iterable[bytes]:
+        return Response()
+
+    environ: Environ = {"HTTP_COOKIE": "ff=test,!tset"}
+    middleware = FeatureFlagsMiddleware(app, ff_ctx, cookie="ff", sep=",")
+    response = middleware(environ, None)
+
+    assert isinstance(response, ContextIterable)
+    assert not ff_ctx.current.test
+    assert list(response) == [b"MyFeatureFlags(test=True, tset=False)"] * 2
+
+    response.close()
+
+    assert closed == [True]
+    assert environ["fiicha.feature_flags"]._dict() == {"test": True, "tset": False}